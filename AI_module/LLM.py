@@ -1,49 +1,113 @@
-import google.generativeai as genai
-from AI_module.process_prompt import build_prompt
-import ast
+import os
+from AI_module.llm_client import LLMClient
+from AI_module.process_prompt import build_prompt, estimate_tokens
 import re
-from AI_module.preprocessLLM import preprocess_llm_response
+from AI_module.plan_parser import StreamingPlanParser, parse_plan
+from telemetry.log import get_logger
 
 
-def call_gemini():
-    API_KEY = ""  # Replace with your actual API key
+MODEL_NAME = "gemini-2.5-flash"
+
+log = get_logger("planner")
+
+
+def get_model():
+    import google.generativeai as genai  # Imported here so offline backends run without it
+
+    API_KEY = os.environ.get("GEMINI_API_KEY", "")  # Or replace with your actual API key
+    if not API_KEY:
+        print("[WARN] GEMINI_API_KEY is not set")
     genai.configure(api_key=API_KEY)
+    return genai.GenerativeModel(MODEL_NAME)
+
+
+def get_client(**kwargs):
+    """Gemini model wrapped in an LLMClient (timeout, retries, metrics file); see llm_client.LLMClient"""
+    return LLMClient(get_model(), **kwargs)
+
+
+def generate_text(prompt, model=None, cache=None, generation_config=None):
+    """
+    Send a prompt to Gemini (or a stand-in model) and return the raw response text.
+
+    Args:
+        prompt: Prompt text
+        model: Object with generate_content(prompt), default: Gemini through
+            an LLMClient (timeout, retries, latency/token metrics)
+        cache: Optional AI_module.llm_cache.LLMCache; unchanged prompts are
+            answered from disk without an API call
+        generation_config: Generation parameters passed to generate_content
+    """
+    def generate():
+        active_model = model or get_client()
+        if generation_config:
+            response = active_model.generate_content(prompt, generation_config=generation_config)
+        else:
+            response = active_model.generate_content(prompt)
+        return response.text
+
+    if cache is None:
+        return generate()
 
-    model = genai.GenerativeModel("gemini-2.5-flash")
+    model_name = getattr(model, "model_name", MODEL_NAME) if model else MODEL_NAME
+    return cache.get_or_generate(model_name, prompt, generate, generation_config)
+
+
+def count_tokens(prompt, model=None):
+    """
+    Prompt token count from the model's tokenizer when it offers one
+    (Gemini count_tokens), otherwise process_prompt.estimate_tokens.
+    """
+    if model is not None and hasattr(model, "count_tokens"):
+        try:
+            return model.count_tokens(prompt).total_tokens
+        except Exception as e:
+            print(f"[WARN] count_tokens failed, using estimate: {e}")
+    return estimate_tokens(prompt)
+
+
+def stream_plan(prompt, model=None):
+    """
+    Stream a plan from the LLM, yielding TaskRecords as soon as each tuple is
+    complete, while the rest of the response is still generating.
+
+    Args:
+        prompt: Prompt from build_prompt
+        model: Object with generate_content(prompt, stream=True), e.g. a Gemini
+            GenerativeModel or AI_module.stub_model.StubModel (default: Gemini
+            through an LLMClient)
+    """
+    model = model or get_client()
+    parser = StreamingPlanParser()
+    for chunk in model.generate_content(prompt, stream=True):
+        for task in parser.feed(chunk.text):
+            log.info("Streamed task %d: %s | %s | %s", task.index, task.agent, task.action, task.node)
+            yield task
+    for task in parser.close():
+        log.info("Streamed task %d: %s | %s | %s", task.index, task.agent, task.action, task.node)
+        yield task
+
+
+def call_gemini(cache=None):
     prompt = build_prompt()
-    response = model.generate_content(prompt)
+    return plan_from_prompt(prompt, cache=cache)
 
-    response_text = response.text
-    print("Raw LLM Response:", response_text)
 
-    preprocessed_response = preprocess_llm_response(response_text)
-    print("Preprocessed LLM Response:", preprocessed_response)
+def plan_from_prompt(prompt, model=None, cache=None):
+    """Generate a plan for an already built prompt and parse it into TaskRecords (plan_parser.parse_plan)"""
+    response_text = generate_text(prompt, model=model, cache=cache)
+    print("Raw LLM Response:", response_text)
 
-    return parse_task_plan(preprocessed_response)
+    return parse_plan(response_text)
 
 
 def parse_task_plan(text):
+    """
+    Parse preprocessed LLM text into a list of (agent, action, node) tuples.
+    Uses the single-pass plan_parser tokenizer; malformed tuples are skipped.
+    """
     try:
-        # Regex to extract 3 elements, including when 3rd element has commas (like node[4,8])
-        pattern = r'\("([^"]+)",\s*"([^"]+)",\s*"([^"]+)"\)'
-        matches = re.findall(pattern, text)
-
-        if matches:
-            # Return list of tuples (agent, action, node)
-            return matches
-
-        # Fallback if Regex fails, use ast.literal_eval line by line
-        task_list = []
-        for line in text.split('\n'):
-            line = line.strip().rstrip(',')
-            if not line: continue
-            try:
-                task_tuple = ast.literal_eval(line)
-                if len(task_tuple) == 3:
-                    task_list.append(task_tuple)
-            except:
-                continue
-        return task_list
+        return [(record.agent, record.action, record.node) for record in parse_plan(text, legacy=False)]
 
     except Exception as e:
         print(f"Error parsing task plan: {e}")
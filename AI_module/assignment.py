@@ -0,0 +1,208 @@
+"""
+Object Assignment Module
+Load-balanced assignment of objects to robots for the prompt's reachability
+status: reach, travel to the destination and per-robot workload are weighed
+together, instead of sending every object to its closest robot.
+
+Workload is the estimated arm time in simulation steps (plan_analysis
+ACTION_DURATIONS). The primitives take the same number of steps at any
+distance, so the solver minimizes the summed finish time of the items, which
+spreads them over the robots that reach them; travel distance only breaks
+ties between robots with equal load. Where only one robot reaches an item
+(every cube of Task1-5), reach decides and the result equals the
+closest-agent analysis.
+"""
+
+import math
+from graph.plan_analysis import ACTION_DURATIONS
+from robot.reachability import UR5_REACH, can_reach, planar_distance
+
+# Names that mark an object as a destination (container/surface), not a workload item
+CONTAINER_KEYWORDS = ("bowl", "plate", "box", "drawer", "basket", "tray", "shelf")
+
+DIRECT_WORK = ACTION_DURATIONS["pick"] + ACTION_DURATIONS["place"]
+# Handoff: pick and move by the robot, then pick and place by the receiving one
+HANDOFF_WORK = ACTION_DURATIONS["pick"] + ACTION_DURATIONS["move"] + DIRECT_WORK
+STEPS_PER_METER = 100    # Travel tie-break, in steps per meter (far below one primitive)
+UNREACHABLE_COST = 1e9   # Cost of assigning an object the robot cannot reach
+HUNGARIAN_MAX_OBJECTS = 40  # Above this, use the greedy solver
+
+
+def is_container(name):
+    return any(keyword in name.lower() for keyword in CONTAINER_KEYWORDS)
+
+
+def infer_destinations(object_names):
+    """
+    Guess each item's destination from the scene: an item goes to the
+    container sharing its first name token (red_cube_1 -> red_bowl), or to the
+    only container if there is just one.
+
+    Returns:
+        Dict item name -> container name (items without a guess are omitted)
+    """
+    containers = [name for name in object_names if is_container(name)]
+    destinations = {}
+    for name in object_names:
+        if name in containers:
+            continue
+        prefix = name.split("_")[0]
+        matches = [c for c in containers if c.split("_")[0] == prefix]
+        if len(matches) == 1:
+            destinations[name] = matches[0]
+        elif len(containers) == 1:
+            destinations[name] = containers[0]
+    return destinations
+
+
+def assignment_cost(base, obj_pos, dest_pos=None, reach=UR5_REACH):
+    """
+    Cost of one robot handling one item.
+
+    Returns:
+        (work, travel): arm time in steps (DIRECT_WORK, or HANDOFF_WORK when
+        the robot cannot reach the destination) and travel in steps
+        (STEPS_PER_METER); None if the robot cannot reach the item
+    """
+    if not can_reach(base, obj_pos, reach):
+        return None
+    travel = planar_distance(base, obj_pos)
+    work = DIRECT_WORK
+    if dest_pos is not None:
+        if can_reach(base, dest_pos, reach):
+            travel += planar_distance(obj_pos, dest_pos)
+        else:
+            work = HANDOFF_WORK
+    return work, travel * STEPS_PER_METER
+
+
+def hungarian(cost):
+    """
+    Minimum-cost assignment of every row to a distinct column
+    (rows <= columns), O(rows^2 * columns).
+
+    Returns:
+        List: column index assigned to each row
+    """
+    n, m = len(cost), len(cost[0]) if cost else 0
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    match = [0] * (m + 1)  # match[column] = row (1-based), 0 = free
+    way = [0] * (m + 1)
+    for row in range(1, n + 1):
+        match[0] = row
+        col0 = 0
+        min_v = [math.inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[col0] = True
+            row0, delta, col1 = match[col0], math.inf, 0
+            for col in range(1, m + 1):
+                if used[col]:
+                    continue
+                reduced = cost[row0 - 1][col - 1] - u[row0] - v[col]
+                if reduced < min_v[col]:
+                    min_v[col], way[col] = reduced, col0
+                if min_v[col] < delta:
+                    delta, col1 = min_v[col], col
+            for col in range(m + 1):
+                if used[col]:
+                    u[match[col]] += delta
+                    v[col] -= delta
+                else:
+                    min_v[col] -= delta
+            col0 = col1
+            if match[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            match[col0] = match[col1]
+            col0 = col1
+
+    result = [0] * n
+    for col in range(1, m + 1):
+        if match[col]:
+            result[match[col] - 1] = col - 1
+    return result
+
+
+def _slot_cost(cost, slot):
+    # An item in the slot-th position from the end of a robot's queue delays
+    # slot items (itself included) by its work: summed over the queue, the
+    # total finish time (minimum-cost assignment solves R||sum C exactly)
+    if cost is None:
+        return UNREACHABLE_COST
+    work, travel = cost
+    return slot * work + travel
+
+
+def _solve_hungarian(items, agents, costs):
+    columns = [(agent, slot) for agent in agents for slot in range(1, len(items) + 1)]
+    matrix = [[_slot_cost(costs[item][agent], slot) for agent, slot in columns] for item in items]
+    return {item: columns[col][0] for item, col in zip(items, hungarian(matrix))}
+
+
+def _solve_greedy(items, agents, costs):
+    # Most constrained items first (largest gap between best and second-best robot),
+    # each to the robot that would finish it first
+    def regret(item):
+        ranked = sorted(_slot_cost(cost, 1) for cost in costs[item].values())
+        return ranked[1] - ranked[0] if len(ranked) > 1 else math.inf
+
+    load = {agent: 0 for agent in agents}
+    result = {}
+    for item in sorted(items, key=regret, reverse=True):
+        agent = min(agents, key=lambda a: (load[a] + _slot_cost(costs[item][a], 1), a))
+        result[item] = agent
+        load[agent] += costs[item][agent][0]
+    return result
+
+
+def assign_objects(objects, agent_positions, destinations=None, reach=UR5_REACH, method="auto"):
+    """
+    Assign scene objects to robots.
+
+    Items (everything that is not a container) are assigned to exactly one
+    robot that reaches them, minimizing the summed finish time of the items
+    (arm work per robot queue, with a handoff when the robot cannot reach the
+    destination) and then travel. Items no robot reaches, and containers,
+    which are destinations rather than work, are listed under their closest
+    robot, as in the closest-agent analysis.
+
+    Args:
+        objects: Dict name -> (x, y, z)
+        agent_positions: Dict agent -> base position
+        destinations: Dict item -> container name (default: infer_destinations)
+        reach: Robot reach radius (meters)
+        method: "hungarian", "greedy", or "auto" (Hungarian up to
+            HUNGARIAN_MAX_OBJECTS items)
+
+    Returns:
+        Dict agent -> list of object names, in scene order
+    """
+    agents = list(agent_positions)
+    if destinations is None:
+        destinations = infer_destinations(list(objects))
+
+    items, costs = [], {}
+    for name in objects:
+        if is_container(name):
+            continue
+        dest = destinations.get(name)
+        dest_pos = objects.get(dest) if dest else None
+        item_costs = {agent: assignment_cost(agent_positions[agent], objects[name], dest_pos, reach)
+                      for agent in agents}
+        if any(cost is not None for cost in item_costs.values()):
+            items.append(name)
+            costs[name] = item_costs
+
+    if method == "auto":
+        method = "hungarian" if len(items) <= HUNGARIAN_MAX_OBJECTS else "greedy"
+    solver = _solve_hungarian if method == "hungarian" else _solve_greedy
+    assigned = solver(items, agents, costs) if items and agents else {}
+
+    agent_objects = {agent: [] for agent in agents}
+    for name, pos in objects.items():
+        agent = assigned.get(name) or min(agents, key=lambda a: math.dist(pos, agent_positions[a]))
+        agent_objects[agent].append(name)
+    return agent_objects
@@ -88,4 +88,13 @@ def call_gemini_5():
         ("robot2torobot1", "move green_cube to robot1", "node[8]"),
         ("robot1", "pick green_cube", "node[10]"),
         ("robot1", "place green_cube into green_bowl", "node[11]")
-    ]
\ No newline at end of file
+    ]
+
+# Task number -> ground-truth plan function
+GROUND_TRUTH = {
+    1: call_gemini_1,
+    2: call_gemini_2,
+    3: call_gemini_3,
+    4: call_gemini_4,
+    5: call_gemini_5,
+}
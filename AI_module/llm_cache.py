@@ -0,0 +1,217 @@
+"""
+LLM Response Cache Module
+Content-addressed on-disk cache for LLM planning calls.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from paths import PROJECT_ROOT
+
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, ".llm_cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+MODEL_PREFIX = "models/"  # genai.GenerativeModel.model_name carries it, MODEL_NAME does not
+
+
+class CacheMissError(KeyError):
+    """Raised in replay-only mode when a prompt has no cached response"""
+
+
+class LLMCache:
+    """
+    On-disk cache of LLM responses.
+
+    Entries are keyed by a SHA-256 hash of the model name (without the
+    "models/" prefix, so lookups by genai model and by LLM.MODEL_NAME share
+    entries), the prompt and the generation parameters, so an unchanged
+    task/scene/agent config never hits the API twice. The least recently used entries are evicted once the cache
+    grows past max_bytes.
+
+    Usage:
+        cache = LLMCache()
+        text = generate_text(prompt, cache=cache)
+        cache.print_stats()
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, replay_only=False):
+        """
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Size bound; least recently used entries are evicted above it
+            replay_only: Never call the model, raise CacheMissError on a miss
+                (offline runs and batch evaluation)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index = self._scan()  # path -> (size, last access time)
+
+    @staticmethod
+    def normalize_model_name(model_name):
+        """'models/gemini-2.5-flash' -> 'gemini-2.5-flash'"""
+        if model_name and model_name.startswith(MODEL_PREFIX):
+            return model_name[len(MODEL_PREFIX):]
+        return model_name
+
+    @staticmethod
+    def make_key(model_name, prompt, generation_config=None):
+        """Hash of everything that determines the response"""
+        payload = json.dumps(
+            {"model": LLMCache.normalize_model_name(model_name), "prompt": prompt, "config": generation_config or {}},
+            sort_keys=True, ensure_ascii=False, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _scan(self):
+        index = {}
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    index[path] = (stat.st_size, stat.st_mtime)
+        return index
+
+    def get(self, key):
+        """Return cached response text, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        now = time.time()
+        os.utime(path, (now, now))  # Mark as recently used for LRU eviction
+        with self.lock:
+            self.hits += 1
+            if path in self._index:
+                self._index[path] = (self._index[path][0], now)
+        return entry["response"]
+
+    def put(self, key, response_text, model_name=None, prompt=None, generation_config=None):
+        """Store a response, then evict old entries if the cache is over its size bound"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "key": key,
+            "model": model_name,
+            "generation_config": generation_config,
+            "created": time.time(),
+            "prompt": prompt,
+            "response": response_text,
+        }
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)  # Atomic, so readers never see partial entries
+
+        with self.lock:
+            self._index[path] = (os.path.getsize(path), time.time())
+            self.writes += 1
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes (caller holds lock)"""
+        total = sum(size for size, _ in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for path, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            del self._index[path]
+            total -= size
+            self.evictions += 1
+
+    def get_or_generate(self, model_name, prompt, generate_fn, generation_config=None):
+        """
+        Return the cached response or call generate_fn() and cache its result.
+
+        Args:
+            model_name: Model identifier (part of the key)
+            prompt: Prompt text (part of the key)
+            generate_fn: Zero-argument callable returning the response text
+            generation_config: Generation parameters (part of the key)
+
+        Raises:
+            CacheMissError: On a miss in replay-only mode
+        """
+        model_name = self.normalize_model_name(model_name)
+        key = self.make_key(model_name, prompt, generation_config)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        if self.replay_only:
+            raise CacheMissError(f"No cached response for key {key} (replay-only mode)")
+
+        response_text = generate_fn()
+        self.put(key, response_text, model_name, prompt, generation_config)
+        return response_text
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "entries": len(self._index),
+                "bytes": sum(size for size, _ in self._index.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+    def print_stats(self):
+        stats = self.stats()
+        print("\n" + "=" * 60)
+        print(" LLM CACHE STATISTICS")
+        print("=" * 60)
+        print(f"  Directory: {self.cache_dir}")
+        print(f"  Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']:.1%}")
+        print(f"  Writes: {stats['writes']}  Evictions: {stats['evictions']}")
+        print(f"  Entries: {stats['entries']}  Size: {stats['bytes'] / 1024:.1f} KB / {stats['max_bytes'] / 1024:.0f} KB")
+        print("=" * 60 + "\n")
+
+    def clear(self):
+        with self.lock:
+            for path in list(self._index):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._index.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the LLM response cache")
+    parser.add_argument("--dir", default=DEFAULT_CACHE_DIR, help="Cache directory")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached responses")
+    args = parser.parse_args()
+
+    cache = LLMCache(args.dir)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {args.dir}")
+    cache.print_stats()
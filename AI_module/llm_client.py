@@ -0,0 +1,356 @@
+"""
+LLM Client Module
+Wraps a model's generate_content with a timeout, retries with jittered
+backoff, optional hedged duplicate requests, and per-call latency/token
+metrics appended to a JSON-lines file.
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.process_prompt import estimate_tokens
+from paths import PROJECT_ROOT
+
+DEFAULT_METRICS_PATH = os.path.join(PROJECT_ROOT, "llm_metrics.jsonl")
+DEFAULT_TIMEOUT = 60.0     # Seconds to wait for one attempt
+DEFAULT_RETRIES = 2        # Extra attempts after the first
+DEFAULT_BACKOFF = 1.0      # Base delay before the first retry (seconds)
+DEFAULT_MAX_BACKOFF = 16.0 # Cap on a single retry delay (seconds)
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})  # Rate limits and server-side failures
+
+UsageMetadata = namedtuple("UsageMetadata", "prompt_token_count candidates_token_count")
+
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when an attempt gets no response within the client timeout"""
+
+
+class LLMRequestError(RuntimeError):
+    """Raised when every attempt of a call failed, or by HTTPModel for an HTTP error status"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class LLMResponse:
+    """Response with .text (and .usage_metadata when the backend reports token counts)"""
+
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class LLMMetrics:
+    """
+    Collects one record per LLM call and appends it to a JSON-lines file.
+
+    Record fields: time, model, status, latency (seconds, successful attempt
+    included), attempts, hedged (a duplicate request was sent), hedge_won,
+    prompt_tokens, response_tokens, tokens_estimated, error.
+    """
+
+    def __init__(self, path=DEFAULT_METRICS_PATH):
+        """
+        Args:
+            path: JSON-lines file the records are appended to (None = memory only)
+        """
+        self.path = path
+        self.records = []
+        self.lock = threading.Lock()
+
+    def record(self, **fields):
+        fields.setdefault("time", round(time.time(), 3))
+        with self.lock:
+            self.records.append(fields)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(fields) + "\n")
+        return fields
+
+    def summary(self):
+        """Aggregate latency percentiles, token totals, retries and hedges"""
+        with self.lock:
+            records = list(self.records)
+        ok = [r for r in records if r["status"] == "ok"]
+        latencies = sorted(r["latency"] for r in ok)
+
+        def percentile(q):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+        return {
+            "calls": len(records),
+            "errors": len(records) - len(ok),
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+            "prompt_tokens": sum(r.get("prompt_tokens") or 0 for r in records),
+            "response_tokens": sum(r.get("response_tokens") or 0 for r in ok),
+            "retries": sum(max(r["attempts"] - 1, 0) for r in records),
+            "hedged": sum(1 for r in records if r.get("hedged")),
+            "hedge_wins": sum(1 for r in records if r.get("hedge_won")),
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        print(f"[INFO] LLM calls: {s['calls']} ({s['errors']} failed), "
+              f"latency p50 {s['latency_p50']:.2f}s p95 {s['latency_p95']:.2f}s max {s['latency_max']:.2f}s")
+        print(f"[INFO] LLM tokens: {s['prompt_tokens']} prompt, {s['response_tokens']} response; "
+              f"{s['retries']} retries, {s['hedge_wins']}/{s['hedged']} hedges won")
+
+
+def load_metrics(path=DEFAULT_METRICS_PATH):
+    """Read the records of a metrics file"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def token_counts(prompt, response):
+    """
+    (prompt_tokens, response_tokens, estimated) from the response's
+    usage_metadata, or from process_prompt.estimate_tokens when it has none.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    response_tokens = getattr(usage, "candidates_token_count", None)
+    if prompt_tokens and response_tokens is not None:
+        return prompt_tokens, response_tokens, False
+    return estimate_tokens(prompt), estimate_tokens(response.text), True
+
+
+def is_transient(error):
+    """
+    Whether a failed attempt is worth retrying: timeouts, connection errors
+    and rate-limit/server HTTP statuses. Auth and invalid-argument errors
+    (HTTP 400/401/403/404, Gemini InvalidArgument/PermissionDenied) and
+    programming errors fail the same way on every attempt.
+    """
+    status = getattr(error, "status", None)
+    if status is None:
+        status = getattr(error, "code", None)  # urllib HTTPError, google.api_core exceptions
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS
+    return isinstance(error, (TimeoutError, ConnectionError, urllib.error.URLError))
+
+
+class LLMClient:
+    """
+    Timeout, retry, hedging and metrics around any object with
+    generate_content(prompt, ...) (Gemini GenerativeModel, StubModel, HTTPModel).
+
+    The client exposes generate_content itself, so it can be passed wherever a
+    model is expected (generate_text, stream_plan, plan_sampler.sample_plans, Replanner).
+
+    Each attempt runs on a daemon thread; an attempt that misses the timeout is
+    abandoned (its thread finishes in the background) and retried after an
+    exponential backoff with full jitter. Only transient failures are retried
+    (is_transient); any other error ends the call at once. With hedge_after set, a duplicate
+    request is sent when the first has not answered within hedge_after
+    seconds, and whichever answers first is used.
+
+    Usage:
+        client = LLMClient(get_model(), timeout=30, retries=2, hedge_after=8)
+        text = generate_text(prompt, model=client)
+        client.metrics.print_summary()
+    """
+
+    def __init__(self, model, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF,
+                 hedge_after=None, metrics=DEFAULT_METRICS_PATH, seed=None):
+        """
+        Args:
+            model: Object with generate_content(prompt, ...)
+            timeout: Seconds to wait for one attempt (hedge included); None = no limit
+            retries: Extra attempts after a timed-out or transiently failed one
+            backoff: Base retry delay; attempt k waits uniform(0, backoff * 2**k)
+            max_backoff: Cap on a single retry delay
+            hedge_after: Seconds before sending a hedged duplicate (None = never)
+            metrics: LLMMetrics instance or metrics file path (None = keep the
+                records in memory only)
+            seed: Seed for the retry jitter
+        """
+        self.model = model
+        self.model_name = getattr(model, "model_name", type(model).__name__)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_after = hedge_after
+        self.metrics = metrics if isinstance(metrics, LLMMetrics) else LLMMetrics(metrics)
+        self.rng = random.Random(seed)
+
+    def retry_delay(self, attempt):
+        """Full-jitter exponential backoff before retry number attempt (0-based)"""
+        return self.rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _launch(self, results, index, prompt, kwargs):
+        def run():
+            try:
+                results.put((index, self.model.generate_content(prompt, **kwargs), None))
+            except Exception as e:
+                results.put((index, None, e))
+
+        threading.Thread(target=run, daemon=True, name=f"llm-request-{index}").start()
+
+    def _attempt(self, prompt, kwargs):
+        """
+        One attempt, hedged if configured.
+
+        Returns:
+            (response, hedged, hedge_won)
+        """
+        results = queue.Queue()
+        start = time.monotonic()
+        deadline = start + self.timeout if self.timeout is not None else None
+        hedge_at = start + self.hedge_after if self.hedge_after is not None else None
+        self._launch(results, 0, prompt, kwargs)
+        launched, failures = 1, []
+
+        while True:
+            now = time.monotonic()
+            waits = [t - now for t in (deadline, hedge_at if launched == 1 else None) if t is not None]
+            try:
+                index, response, error = results.get(timeout=max(min(waits), 0) if waits else None)
+            except queue.Empty:
+                if launched == 1 and hedge_at is not None and time.monotonic() >= hedge_at \
+                        and (deadline is None or time.monotonic() < deadline):
+                    self._launch(results, 1, prompt, kwargs)
+                    launched = 2
+                    continue
+                raise LLMTimeoutError(f"no response from {self.model_name} within {self.timeout}s")
+
+            if error is None:
+                return response, launched > 1, index == 1
+            failures.append(error)
+            if len(failures) == launched:
+                raise error
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        """Drop-in for model.generate_content; streaming calls are passed through and timed"""
+        if stream:
+            return self._stream(prompt, kwargs)
+
+        start = time.monotonic()
+        prompt_text = prompt if isinstance(prompt, str) else str(prompt)
+        attempts, last_error = 0, None
+        for attempt in range(self.retries + 1):
+            attempts += 1
+            try:
+                response, hedged, hedge_won = self._attempt(prompt, kwargs)
+            except Exception as e:
+                last_error = e
+                if not is_transient(e):
+                    break
+                if attempt < self.retries:
+                    delay = self.retry_delay(attempt)
+                    print(f"[WARN] LLM attempt {attempts} failed ({type(e).__name__}: {e}); "
+                          f"retrying in {delay:.2f}s")
+                    time.sleep(delay)
+                continue
+
+            prompt_tokens, response_tokens, estimated = token_counts(prompt_text, response)
+            self.metrics.record(model=self.model_name, status="ok",
+                                latency=round(time.monotonic() - start, 4), attempts=attempts,
+                                hedged=hedged, hedge_won=hedge_won, prompt_tokens=prompt_tokens,
+                                response_tokens=response_tokens, tokens_estimated=estimated, error=None)
+            return response
+
+        self.metrics.record(model=self.model_name, status="error",
+                            latency=round(time.monotonic() - start, 4), attempts=attempts,
+                            hedged=False, hedge_won=False, prompt_tokens=estimate_tokens(prompt_text),
+                            response_tokens=0, tokens_estimated=True,
+                            error=f"{type(last_error).__name__}: {last_error}")
+        raise LLMRequestError(f"{self.model_name} failed after {attempts} attempts: {last_error}",
+                              status=getattr(last_error, "status", None)) from last_error
+
+    def _stream(self, prompt, kwargs):
+        # No retry once chunks have been handed out; record time to first chunk and total
+        start = time.monotonic()
+        first_chunk, parts, status, error = None, [], "ok", None
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True, **kwargs):
+                if first_chunk is None:
+                    first_chunk = round(time.monotonic() - start, 4)
+                parts.append(chunk.text)
+                yield chunk
+        except Exception as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            prompt_text = prompt if isinstance(prompt, str) else str(prompt)
+            self.metrics.record(model=self.model_name, status=status,
+                                latency=round(time.monotonic() - start, 4), first_chunk=first_chunk,
+                                attempts=1, hedged=False, hedge_won=False,
+                                prompt_tokens=estimate_tokens(prompt_text),
+                                response_tokens=estimate_tokens("".join(parts)),
+                                tokens_estimated=True, error=error)
+
+    def count_tokens(self, prompt):
+        return self.model.count_tokens(prompt)
+
+    def __getattr__(self, name):
+        # Anything else (e.g. start_chat) goes straight to the wrapped model
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+
+class HTTPModel:
+    """
+    Model that POSTs prompts to an HTTP endpoint speaking the
+    AI_module.stub_server protocol:
+
+        request:  {"prompt": str, "generation_config": dict | null}
+        response: {"text": str, "usage_metadata": {"prompt_token_count": int,
+                                                   "candidates_token_count": int}}
+    """
+
+    def __init__(self, url, model_name="http", timeout=None):
+        """
+        Args:
+            url: Endpoint URL, e.g. http://127.0.0.1:8765/generate
+            model_name: Name reported to caches and metrics
+            timeout: Socket timeout in seconds (None = wait indefinitely; the
+                LLMClient timeout applies on top)
+        """
+        self.url = url
+        self.model_name = model_name
+        self.timeout = timeout
+
+    def generate_content(self, prompt, stream=False, generation_config=None, **kwargs):
+        body = json.dumps({"prompt": prompt, "generation_config": generation_config}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as reply:
+                payload = json.loads(reply.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            raise LLMRequestError(f"{self.url} returned HTTP {e.code}", status=e.code) from e
+
+        usage = payload.get("usage_metadata")
+        response = LLMResponse(payload["text"], UsageMetadata(**usage) if usage else None)
+        return iter([response]) if stream else response
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize an LLM metrics file")
+    parser.add_argument("path", nargs="?", default=DEFAULT_METRICS_PATH)
+    args = parser.parse_args()
+
+    metrics = LLMMetrics(path=None)
+    metrics.records = load_metrics(args.path)
+    metrics.print_summary()
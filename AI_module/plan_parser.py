@@ -0,0 +1,372 @@
+"""
+Plan Parser Module
+Single-pass tokenizer and parser for the ("agent", "action", "node[...]") plan grammar.
+
+One lexer (_TOKEN_PATTERN) and one token state machine (StreamingPlanParser)
+read every plan: parse_plan feeds it the whole LLM response at once, the
+streaming planner feeds it chunks as they arrive. Each tuple becomes a
+TaskRecord with agent, verb, object, destination, handoff source/target and
+dependency IDs already resolved, so later stages never re-split the same strings.
+
+Tuples keep their position in the response as step ID: a malformed tuple is
+skipped with a warning (or raises PlanSyntaxError in strict mode) but still
+uses up its step, so node[...] references to later steps stay valid.
+"""
+
+import re
+from collections import namedtuple
+
+from telemetry.log import get_logger
+
+log = get_logger("parser")
+
+# Plan lexer: every match is one token, identified by its group number.
+# Trailing blanks belong to the token, so they cost no extra match.
+_TOKEN_PATTERN = re.compile(r'''
+    "([^"\n]*)"[ \t\r]*                    # 1: string in double quotes
+  | “([^”\n]*)”[ \t\r]*                   # 2: string in curly quotes
+  | (?:(?<=[(,\s])|^)'([^'\n]*)'[ \t\r]*  # 3: string in single quotes (not an apostrophe)
+  | (\()[ \t\r]*                          # 4: opening parenthesis
+  | (\))[ \t\r]*                          # 5: closing parenthesis
+  | ([,.])[ \t\r]*                        # 6: separator ("." is tolerated)
+  | (\n)[ \t\r]*                          # 7: newline
+  | ([^\s"“”'(),.]+)[ \t\r]*              # 8: word
+  | ([^ \t\r])[ \t\r]*                    # 9: any other character
+  | [ \t\r]+                               # blanks at the start of a line (no group)
+''', re.VERBOSE)
+
+_STRING, _LPAREN, _RPAREN, _SEP, _NEWLINE, _OTHER = 3, 4, 5, 6, 7, 9
+
+# Token kind the tuple grammar expects in each state: ( "agent" , "action" , "node" )
+_EXPECTED = (None, _STRING, _SEP, _STRING, _SEP, _STRING, _RPAREN)
+_EXPECTED_NAMES = (None, "quoted string", "','", "quoted string", "','", "quoted string", "')'")
+_FIELDS = ("agent", "action", "node")
+_QUOTES = ('"', '“', "'")
+
+_HANDOFF_PATTERN = re.compile(r'^(robot\d+)to(robot\d+)$')
+_DIGITS = re.compile(r'\d+')
+_PLACE_PREPOSITIONS = ("into", "onto", "in", "on", "at")
+
+TaskRecord = namedtuple('TaskRecord', [
+    'index',         # 1-based position in the plan (step ID)
+    'agent',         # Lower-cased agent label, e.g. "robot1" or "robot1torobot2"
+    'action',        # Action text as written by the LLM
+    'verb',          # pick / place / move / sweep / unknown
+    'object',        # Manipulated object
+    'destination',   # Place destination, or handoff receiver for move
+    'dependencies',  # Tuple of dependency step IDs
+    'node',          # Dependency string as written, e.g. "node[1, 3]"
+    'source',        # Handoff source robot ("" if not a handoff)
+    'target',        # Handoff target robot ("" if not a handoff)
+    'line',          # 1-based line of the tuple in the response
+    'column',        # 1-based column of the tuple in the response
+])
+
+
+class PlanSyntaxError(ValueError):
+    """Malformed plan text, with the position of the offending token"""
+
+    def __init__(self, message, line, column):
+        super().__init__(f"{message} (line {line}, column {column})")
+        self.line = line
+        self.column = column
+
+
+def parse_dependencies(node_str):
+    """Parse 'node[1, 3]' into [1, 3] (numbers between the brackets)"""
+    start = node_str.find('[')
+    if start == -1:
+        return []
+    end = node_str.find(']', start)
+    inner = node_str[start + 1:] if end == -1 else node_str[start + 1:end]
+    if not inner or inner.isspace():
+        return []
+    try:
+        return [int(d) for d in inner.split(',')]
+    except ValueError:
+        # Stray words, trailing commas or space-separated IDs
+        return [int(d) for d in _DIGITS.findall(inner)]
+
+
+def parse_action_text(action):
+    """
+    Split an action into (verb, object, destination) in one pass over its words.
+
+    Examples:
+        "pick red_cube"                  -> ("pick", "red_cube", "")
+        "place apple on the plate"       -> ("place", "apple", "plate")
+        "place apple plate"              -> ("place", "apple", "plate")
+        "move green_cube_1 to robot1"    -> ("move", "green_cube_1", "robot1")
+        "sweep the table"                -> ("sweep", "the table", "")
+    """
+    words = action.lower().split()
+    if not words:
+        return "unknown", "", ""
+    verb = words[0]
+
+    # Fast paths for the common one-word forms: "pick X", "place X in Y", "move X to Y"
+    if len(words) == 2 and verb in ("pick", "sweep"):
+        return verb, words[1], ""
+    if len(words) == 4 and ((verb == "place" and words[2] in _PLACE_PREPOSITIONS)
+                            or (verb == "move" and words[2] == "to")):
+        return verb, words[1], words[3]
+
+    rest = words[1:]
+    if verb == "pick":
+        return "pick", " ".join(rest), ""
+
+    if verb in ("place", "move"):
+        separators = _PLACE_PREPOSITIONS if verb == "place" else ("to",)
+        for i, word in enumerate(rest):
+            if word in separators and i > 0:
+                obj, raw_dest = rest[:i], rest[i + 1:]
+                break
+        else:
+            # "place apple plate" (missing preposition): object is the first word
+            if verb == "place" and len(rest) >= 2:
+                obj, raw_dest = rest[:1], rest[1:]
+            else:
+                obj, raw_dest = rest, []
+        return verb, " ".join(obj), raw_dest[-1] if raw_dest else ""
+
+    if verb == "sweep":
+        return "sweep", " ".join(rest), ""
+
+    return "unknown", action.lower().strip(), ""
+
+
+def handoff_agents(agent):
+    """Return (source, target) for 'robotXtorobotY', else ("", "")"""
+    match = _HANDOFF_PATTERN.match(agent)
+    return (match.group(1), match.group(2)) if match else ("", "")
+
+
+def _legacy_line(line_text):
+    """Parse a legacy 'agent: action' line, or return None"""
+    if ':' not in line_text or '(' in line_text:
+        return None
+    agent, action = (part.strip().strip('"\'') for part in line_text.split(':', 1))
+    if not agent or not action or ' ' in agent:
+        return None
+    return agent, action, "node[]"
+
+
+class StreamingPlanParser:
+    """
+    Token state machine over the plan grammar, fed with the whole response
+    (parse_plan) or with chunks of a streamed one.
+
+    A TaskRecord is returned as soon as the closing parenthesis of its tuple
+    arrives; legacy "agent: action" lines are returned when their line ends.
+    Scan state is kept between chunks, so every character is tokenized once
+    and the buffer only holds the unfinished line or tuple.
+
+    Usage:
+        parser = StreamingPlanParser()
+        for chunk in chunks:
+            for record in parser.feed(chunk):
+                ...
+        records = parser.close()
+    """
+
+    def __init__(self, strict=False, legacy=True):
+        """
+        Args:
+            strict: Raise PlanSyntaxError at the first malformed tuple instead
+                of skipping it
+            legacy: Also accept lines without a tuple in the legacy
+                "agent: action" form (with node "node[]")
+        """
+        self.strict = strict
+        self.legacy = legacy
+        self.skipped = []         # (step ID, line, column, reason) of every skipped tuple
+        self._buffer = ""
+        self._pos = 0             # Scan position in the buffer
+        self._line = 1
+        self._line_start = 0      # Buffer offset of the current line
+        self._line_tuple = False  # Current line holds (part of) a tuple
+        self._state = 0           # 0 = outside a tuple, 1..6 = index into _EXPECTED
+        self._fields = []
+        self._tuple_start = 0     # Buffer offset of the open tuple's "("
+        self._tuple_position = (0, 0)
+        self._index = 0           # Last step ID used
+        self._agents = {}         # Agent as written -> (label, source, target)
+        self._dependencies = {}   # Node string -> dependency tuple
+
+    def feed(self, chunk):
+        """Add a text chunk, return the list of newly completed TaskRecords"""
+        self._buffer += chunk
+        return self._scan(final=False)
+
+    def close(self):
+        """Flush the rest of the stream, return the remaining TaskRecords"""
+        return self._scan(final=True)
+
+    def _scan(self, final):
+        text = self._buffer
+        records = []
+        state, fields = self._state, self._fields
+        line, line_start, line_tuple = self._line, self._line_start, self._line_tuple
+        expected = _EXPECTED
+        pos = len(text)
+        for match in _TOKEN_PATTERN.finditer(text, self._pos):
+            kind = match.lastindex
+            if state == 0:
+                if kind == _LPAREN:
+                    state, fields, line_tuple = 1, [], True
+                    start = self._tuple_start = match.start()
+                    self._tuple_position = (line, start - line_start + 1)
+                elif kind == _NEWLINE:
+                    start = match.start()
+                    if not line_tuple and self.legacy:
+                        self._legacy(text[line_start:start], line, records)
+                    line, line_start, line_tuple = line + 1, start + 1, False
+                elif kind == _OTHER and not final and match.group(_OTHER) in _QUOTES \
+                        and text.find('\n', match.end()) == -1:
+                    pos = match.start()  # A string whose closing quote has not arrived yet
+                    break
+                continue
+
+            if kind is None:
+                continue  # Blanks at the start of a line
+            if kind <= _STRING:
+                fields.append(match.group(kind))
+                kind = _STRING
+            if kind == expected[state]:
+                if state < 6:
+                    state += 1
+                    continue
+                state = 0
+                self._emit(fields, records)
+                continue
+            if kind == _NEWLINE:
+                # Tuples may span lines
+                line, line_start = line + 1, match.start() + 1
+                continue
+            if kind == _OTHER and not final and match.group(_OTHER) in _QUOTES \
+                    and text.find('\n', match.end()) == -1:
+                pos = match.start()
+                break
+
+            # The token breaks the open tuple
+            start = match.start()
+            self._malformed(state, f"expected {_EXPECTED_NAMES[state]}, got {match.group().rstrip()!r}",
+                            (line, start - line_start + 1))
+            state = 0
+            if kind == _LPAREN:
+                state, fields = 1, []
+                self._tuple_start = start
+                self._tuple_position = (line, start - line_start + 1)
+
+        if final:
+            if state:
+                self._malformed(state, "unterminated tuple", self._tuple_position)
+                state = 0
+            if self.legacy and not line_tuple and line_start < len(text):
+                self._legacy(text[line_start:], line, records)
+            text, pos, line_start = "", 0, 0
+        else:
+            # Keep only the unfinished line or tuple
+            keep = min(line_start, self._tuple_start) if state else line_start
+            if keep:
+                text, pos, line_start = text[keep:], pos - keep, line_start - keep
+                self._tuple_start -= keep
+
+        self._buffer, self._pos = text, pos
+        self._state, self._fields = state, fields
+        self._line, self._line_start, self._line_tuple = line, line_start, line_tuple
+        return records
+
+    def _emit(self, fields, records):
+        """Append the TaskRecord of a complete tuple"""
+        self._index += 1
+        agent, action, node = fields
+        entry = self._agents.get(agent)
+        if entry is None:
+            label = agent.strip().lower()
+            entry = self._agents[agent] = (label,) + handoff_agents(label)
+        action = action.strip()
+        if not entry[0] or not action or not node.strip():
+            empty = _FIELDS[(entry[0], action, node.strip()).index("")]
+            self._skip(f"empty {empty}", self._tuple_position)
+            return
+
+        verb, obj, dest = parse_action_text(action)
+        if entry[2] and verb == "move":
+            dest = entry[2]
+        deps = self._dependencies.get(node)
+        if deps is None:
+            deps = self._dependencies[node] = tuple(parse_dependencies(node))
+        records.append(TaskRecord(self._index, entry[0], action, verb, obj, dest, deps, node,
+                                  entry[1], entry[2], *self._tuple_position))
+
+    def _legacy(self, line_text, line, records):
+        """Append the TaskRecord of a legacy 'agent: action' line, if it is one"""
+        if ':' not in line_text:
+            return
+        task = _legacy_line(line_text)
+        if task:
+            self._index += 1
+            records.append(make_record(self._index, *task, line=line, column=1))
+
+    def _malformed(self, state, reason, position):
+        """
+        Handle a tuple broken in the given state. Once its agent string has
+        been read it counts as a step; a "(" not followed by a string is prose.
+        """
+        if state > 1:
+            self._index += 1
+            self._skip(reason, position)
+        elif self.strict:
+            raise PlanSyntaxError(reason, *position)
+
+    def _skip(self, reason, position):
+        if self.strict:
+            raise PlanSyntaxError(reason, *position)
+        self.skipped.append((self._index, *position, reason))
+        log.warning("Skipping step %d at line %d, column %d: %s", self._index, *position, reason)
+
+
+def parse_plan(text, strict=False, legacy=True):
+    """
+    Parse an LLM response into TaskRecords.
+
+    Malformed tuples and tuples with an empty agent, action or node string
+    are skipped with a warning; the records after them keep their step ID.
+
+    Args:
+        text: LLM response text
+        strict: Raise PlanSyntaxError (with line and column) at the first
+            malformed tuple instead of skipping it
+        legacy: Also accept legacy "agent: action" lines
+
+    Returns:
+        List of TaskRecord in plan order
+    """
+    parser = StreamingPlanParser(strict=strict, legacy=legacy)
+    return parser.feed(text) + parser.close()
+
+
+def make_record(index, agent, action, node, line=0, column=0):
+    """
+    Build the TaskRecord of one (agent, action, node) tuple.
+
+    Args:
+        index: 1-based step ID
+        agent, action, node: Tuple strings as written
+        line, column: Position in the response (0 when not parsed from text)
+    """
+    agent = agent.strip().lower()
+    action = action.strip()
+    verb, obj, dest = parse_action_text(action)
+    source, target = handoff_agents(agent)
+    if target and verb == "move":
+        dest = target
+    return TaskRecord(index, agent, action, verb, obj, dest, tuple(parse_dependencies(node or "")),
+                      node, source, target, line, column)
+
+
+def as_records(task_plan):
+    """TaskRecords for a plan given as TaskRecords (kept) or (agent, action, node) tuples"""
+    return [task if isinstance(task, TaskRecord) else make_record(i, *task)
+            for i, task in enumerate(task_plan, start=1)]
@@ -0,0 +1,297 @@
+"""
+Planner Backend Module
+Interchangeable sources of task plans (Gemini, ground truth, recorded
+responses, a local HTTP stand-in), picked by configuration instead of
+editing imports, so the prompt -> plan -> execute pipeline can run offline
+and deterministically.
+
+Configuration is a spec string, a dict or a JSON file:
+    "gemini"                        Gemini through an LLMClient
+    "truth:3"                       Ground-truth plan call_gemini_3 (no prompt, no network)
+    "heuristic:1"                   Rule-based planner on the Task1 scene for the prompt's
+                                    goal, falling back to Gemini for goals it cannot handle
+    "heuristic:1:sort the cubes"    The same with a fixed goal (no prompt needed)
+    "replay:.llm_cache"             Recorded responses: LLMCache directory, response
+                                    files (.txt or cache entry .json), comma separated
+    "http" / "http://host:port/generate"   Local stand-in (AI_module/stub_server.py)
+    {"backend": "http", "url": "...", "timeout": 5, "hedge_after": 1}
+    planner.json                    The same dict stored as JSON
+
+The PLANNER_BACKEND environment variable holds the default spec.
+"""
+
+import importlib
+import json
+import os
+from AI_module.call_gemini_test_truth import GROUND_TRUTH
+from AI_module.heuristic_planner import HeuristicUnsupported, plan_for_environment
+from AI_module.llm_cache import LLMCache
+from AI_module.llm_client import LLMClient, HTTPModel
+from AI_module.LLM import MODEL_NAME, generate_text, get_client, stream_plan
+from AI_module.plan_parser import as_records, parse_plan
+from AI_module.process_prompt import Environment, build_prompt, task_from_prompt
+from AI_module.stub_model import StubModel, plan_to_text
+
+PLANNER_BACKEND_ENV = "PLANNER_BACKEND"
+DEFAULT_BACKEND = "gemini"
+DEFAULT_HTTP_URL = "http://127.0.0.1:8765/generate"  # stub_server.py default port
+
+# Keywords that the ":"-separated parts after "name:" in a spec string fill in
+SPEC_ARGUMENT = {"truth": ("task",), "heuristic": ("task", "goal"), "replay": ("source",), "http": ("url",)}
+
+
+class PlannerBackend:
+    """
+    Base class: turns a prompt into a plan (TaskRecords, or (agent, action, node)
+    tuples for backends that hold a fixed plan).
+
+    Subclasses implement generate(prompt) -> raw response text; backends
+    that ignore the prompt set needs_prompt = False and override plan().
+    Backends that generate through a model set self.model, which stream() uses.
+    """
+
+    name = None
+    needs_prompt = True
+    model = None  # Object with generate_content(prompt, stream=True), if the backend has one
+
+    def generate(self, prompt):
+        raise NotImplementedError
+
+    def plan(self, prompt=None):
+        """
+        Plan for a prompt (built from the task Environment when None).
+
+        Returns:
+            List of TaskRecords (plan_parser.parse_plan)
+        """
+        if prompt is None:
+            prompt = build_prompt()
+        return parse_plan(self.generate(prompt))
+
+    def stream(self, prompt=None):
+        """
+        Plan for a prompt as a stream of TaskRecords, each yielded as soon as
+        its tuple has been generated (LLM.stream_plan). Backends without a
+        model yield their whole plan at once.
+        """
+        if self.model is None:
+            yield from as_records(self.plan(prompt))
+            return
+        if prompt is None:
+            prompt = build_prompt()
+        yield from stream_plan(prompt, model=self.model)
+
+    def describe(self):
+        return self.name
+
+    def close(self):
+        pass
+
+
+class GeminiBackend(PlannerBackend):
+    """Gemini through an LLMClient (timeout, retries, hedging, metrics), optionally cached"""
+
+    name = "gemini"
+
+    def __init__(self, cache_dir=None, **client_options):
+        """
+        Args:
+            cache_dir: LLMCache directory (None = no cache)
+            **client_options: LLMClient options (timeout, retries, hedge_after, metrics, ...)
+        """
+        self.client = self.model = get_client(**client_options)
+        self.cache = LLMCache(cache_dir) if cache_dir else None  # Not used by stream()
+
+    def generate(self, prompt):
+        return generate_text(prompt, model=self.client, cache=self.cache)
+
+    def describe(self):
+        return f"gemini ({MODEL_NAME})"
+
+
+class GroundTruthBackend(PlannerBackend):
+    """Hand-written plan from call_gemini_test_truth; ignores the prompt"""
+
+    name = "truth"
+    needs_prompt = False
+
+    def __init__(self, task=1):
+        task = int(task)
+        if task not in GROUND_TRUTH:
+            raise ValueError(f"No ground-truth plan for task {task} (available: {sorted(GROUND_TRUTH)})")
+        self.task = task
+
+    def plan(self, prompt=None):
+        return list(GROUND_TRUTH[self.task]())
+
+    def generate(self, prompt):
+        return plan_to_text(self.plan())
+
+    def describe(self):
+        return f"truth (call_gemini_{self.task})"
+
+
+class HeuristicBackend(PlannerBackend):
+    """
+    Rule-based plan (AI_module/heuristic_planner.py) in milliseconds; goals
+    it cannot handle go to the fallback backend with the same prompt.
+
+    The goal is the configured one, else the task line of the prompt (built
+    from the Environment when None, as for the LLM backends).
+    """
+
+    name = "heuristic"
+
+    def __init__(self, task=None, goal=None, fallback=DEFAULT_BACKEND):
+        """
+        Args:
+            task: Task number whose Environment is planned (default: the
+                Environment process_prompt builds prompts for)
+            goal: Goal text checked against the supported goal types
+                (default: the task of the prompt passed to plan())
+            fallback: Backend spec used when the heuristic declines (None = raise)
+        """
+        self.task = int(task) if task is not None else None
+        self.goal = goal
+        self.fallback = fallback
+        self._fallback_backend = None
+
+    def _environment(self):
+        if self.task is None:
+            return Environment()
+        return importlib.import_module(f"Task{self.task}.environment").Environment()
+
+    def plan(self, prompt=None):
+        goal = self.goal
+        if goal is None:
+            if prompt is None:
+                prompt = build_prompt()
+            goal = task_from_prompt(prompt)
+        try:
+            return plan_for_environment(self._environment(), goal)
+        except HeuristicUnsupported as e:
+            if self.fallback is None:
+                raise
+            print(f"[INFO] Heuristic planner declined ({e}); using {self.fallback}")
+        if self._fallback_backend is None:
+            self._fallback_backend = load_backend(self.fallback)
+        return self._fallback_backend.plan(prompt)
+
+    def generate(self, prompt):
+        return plan_to_text(self.plan(prompt))
+
+    def describe(self):
+        scene = f"Task{self.task}" if self.task is not None else "prompt Environment"
+        return f"heuristic ({scene}, fallback {self.fallback})"
+
+
+class ReplayBackend(PlannerBackend):
+    """
+    Recorded responses, never calls a model.
+
+    An LLMCache directory is looked up by prompt (replay-only, so an unknown
+    prompt raises CacheMissError). Response files are returned in order,
+    cycling, whatever the prompt.
+    """
+
+    name = "replay"
+
+    def __init__(self, source, model_name=MODEL_NAME):
+        """
+        Args:
+            source: LLMCache directory, or response file path(s) (list or
+                comma-separated string; .txt raw text or cache entry .json)
+            model_name: Model name the cache entries were recorded under
+        """
+        if isinstance(source, str) and os.path.isdir(source):
+            self.cache = LLMCache(source, replay_only=True)
+            self.model = None
+        else:
+            paths = source.split(",") if isinstance(source, str) else list(source)
+            self.cache = None
+            self.model = StubModel([self._read(path) for path in paths], model_name=model_name)
+        self.source = source
+        self.model_name = model_name
+
+    @staticmethod
+    def _read(path):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        return json.loads(text)["response"] if path.endswith(".json") else text
+
+    def generate(self, prompt):
+        if self.cache is not None:
+            return self.cache.get_or_generate(self.model_name, prompt, None)
+        return self.model.generate_content(prompt).text
+
+    def describe(self):
+        return f"replay ({self.source})"
+
+
+class HTTPBackend(PlannerBackend):
+    """Local HTTP stand-in (stub_server.py or any server speaking its protocol)"""
+
+    name = "http"
+
+    def __init__(self, url=DEFAULT_HTTP_URL, **client_options):
+        """
+        Args:
+            url: Endpoint URL
+            **client_options: LLMClient options (timeout, retries, hedge_after, metrics, ...)
+        """
+        self.url = url
+        self.client = self.model = LLMClient(HTTPModel(url), **client_options)
+
+    def generate(self, prompt):
+        return generate_text(prompt, model=self.client)
+
+    def describe(self):
+        return f"http ({self.url})"
+
+
+BACKENDS = {backend.name: backend for backend in
+            (GeminiBackend, GroundTruthBackend, HeuristicBackend, ReplayBackend, HTTPBackend)}
+
+
+def parse_backend_spec(spec):
+    """
+    Backend configuration dict from a spec string, dict or JSON file path
+    (None = PLANNER_BACKEND environment variable, else DEFAULT_BACKEND).
+    """
+    if spec is None:
+        spec = os.environ.get(PLANNER_BACKEND_ENV, DEFAULT_BACKEND)
+    if isinstance(spec, dict):
+        return dict(spec)
+    if spec.endswith(".json") and os.path.isfile(spec):
+        with open(spec, encoding="utf-8") as f:
+            return json.load(f)
+    if spec.startswith(("http://", "https://")):
+        return {"backend": "http", "url": spec}
+
+    name, _, argument = spec.partition(":")
+    config = {"backend": name}
+    if argument:
+        if name not in SPEC_ARGUMENT:
+            raise ValueError(f"Backend '{name}' takes no argument (got '{spec}')")
+        keywords = SPEC_ARGUMENT[name]
+        config.update(zip(keywords, argument.split(":", len(keywords) - 1)))
+    return config
+
+
+def load_backend(spec=None):
+    """
+    Create the configured planner backend.
+
+    Args:
+        spec: Spec string, config dict or JSON file path (see module docstring)
+
+    Returns:
+        PlannerBackend instance
+    """
+    config = parse_backend_spec(spec)
+    name = config.pop("backend", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown planner backend '{name}' (available: {', '.join(BACKENDS)})")
+    backend = BACKENDS[name](**config)
+    print(f"[INFO] Planner backend: {backend.describe()}")
+    return backend
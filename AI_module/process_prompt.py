@@ -1,4 +1,13 @@
 from Task4.environment import Environment #Use different environment path base on your task
+from AI_module.assignment import assign_objects
+from robot.handoff_points import handoff_points_for_environment
+import re
+
+# Words, numbers and single punctuation marks, for estimate_tokens
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+# The 'Task: "<goal>"' line of the full and compact prompts
+TASK_LINE_PATTERN = re.compile(r'^\s*(?:\d\) )?Task: "(.*)"\s*$', re.MULTILINE)
 
 AGENT_CONFIG = {
     "robot1": {
@@ -22,10 +31,53 @@ AGENT_CONFIG = {
 }
 
 
+def estimate_tokens(text):
+    """
+    Approximate LLM token count: words, numbers and punctuation marks count as
+    one token each, long words as one token per 4 characters.
+    """
+    return sum(max(1, len(token) // 4) if token[0].isalnum() else 1
+               for token in TOKEN_PATTERN.findall(text))
+
+
+def compress_names(names):
+    """
+    Collapse numbered names into one entry: green_cube_1, green_cube_2 ->
+    green_cube_{1,2}. Order of first appearance is kept.
+    """
+    groups = {}
+    for name in names:
+        base, sep, suffix = name.rpartition("_")
+        key = base if sep and suffix.isdigit() else name
+        groups.setdefault(key, []).append(suffix if key == base else None)
+    parts = []
+    for key, suffixes in groups.items():
+        numbered = [suffix for suffix in suffixes if suffix is not None]
+        if len(numbered) > 1:
+            parts.append(f"{key}_{{{','.join(numbered)}}}")
+        elif numbered:
+            parts.append(f"{key}_{numbered[0]}")
+        if None in suffixes:
+            parts.append(key)
+    return ", ".join(parts)
+
+
 class PromptBuilder:
-    def __init__(self, agent_config=None):
+    def __init__(self, agent_config=None, balanced=True, compact=False, env=None):
+        """
+        Args:
+            agent_config: Agent name -> capabilities (default: AGENT_CONFIG)
+            balanced: Assign objects with the load-balanced solver
+                (AI_module/assignment.py) instead of to the closest agent
+            compact: Build compact prompts (generic handoff rule, shared
+                capabilities listed once, compressed object table), whose size
+                grows linearly with robots and objects
+            env: Environment instance (default: the imported task Environment)
+        """
         self.agent_config = agent_config or AGENT_CONFIG
-        self.env = Environment()
+        self.balanced = balanced
+        self.compact = compact
+        self.env = env or Environment()
         self.agent_names = list(self.agent_config.keys())
         self._load_positions_from_environment()
 
@@ -41,10 +93,9 @@ class PromptBuilder:
             raise AttributeError("Environment does not have 'agent_positions' attribute")
 
         if hasattr(self.env, 'handoff_points'):
-            self.handoff_points = self.env.handoff_points
             print("[INFO] Loaded handoff points from Environment")
-        else:
-            raise AttributeError("Environment does not have 'handoff_points' attribute")
+        # Pairs without a hand-typed point are generated from the robot bases
+        self.handoff_points = handoff_points_for_environment(self.env)
 
     def get_handoff_point(self, agent1, agent2):
 
@@ -61,6 +112,12 @@ class PromptBuilder:
     def reachability_analysis(self, objects):
         import math
 
+        if self.balanced:
+            positions = {name: pos for name, pos in objects.items()
+                         if isinstance(pos, tuple) and len(pos) >= 3}
+            agent_positions = {name: self.agent_config[name]["position"] for name in self.agent_names}
+            return assign_objects(positions, agent_positions)
+
         agent_objects = {agent: [] for agent in self.agent_names}
 
         for obj_name, obj_pos in objects.items():
@@ -113,6 +170,27 @@ class PromptBuilder:
             lines.append(f"        {display_name}: {capabilities}")
         return "\n".join(lines)
 
+    def _format_capabilities_compact(self):
+        """Capabilities grouped by agents sharing the same text, each listed once"""
+        groups = {}
+        for agent_name, agent_info in self.agent_config.items():
+            text = "\n".join(line.strip() for line in agent_info["capabilities"].strip().splitlines())
+            groups.setdefault(text, []).append(agent_name.upper())
+        lines = []
+        for text, agents in groups.items():
+            label = "ALL AGENTS" if len(agents) == len(self.agent_names) and len(agents) > 1 else ", ".join(agents)
+            lines.append(f"        {label}:")
+            lines.extend(f"        {line}" for line in text.splitlines())
+        return "\n".join(lines)
+
+    def _format_object_table_compact(self, agent_objects):
+        """One line per agent with its objects, numbered names collapsed"""
+        lines = []
+        for agent_name in self.agent_names:
+            objects = agent_objects.get(agent_name, [])
+            lines.append(f"        {agent_name.upper()}: {compress_names(objects) if objects else 'None'}")
+        return "\n".join(lines)
+
     def _generate_label_description(self):
         """Generate mô tả về các labels có thể dùng"""
         agent_list = ", ".join(self.agent_names)
@@ -157,23 +235,68 @@ class PromptBuilder:
     ("{agent1}", "pick sponge". "node[]"),
     ("{agent1}", "sweep the table","node[7]),"""
 
-    def build_prompt(self, task=None):
-        """Build prompt based on Environment"""
+    def _format_progress(self, snapshot):
+        """Format execution progress (completed actions, holding state) for a re-planning prompt"""
+        completed = snapshot.get("completed_actions") or ["None"]
+        lines = ["    Progress so far (already executed, do NOT repeat):"]
+        lines.extend(f"        - {action}" for action in completed)
+
+        lines.append("    Holding state:")
+        for agent_name in self.agent_names:
+            held = snapshot.get("holding", {}).get(agent_name)
+            state = f"holding {held} (may place/move it without picking again)" if held else "hands empty"
+            lines.append(f"        {agent_name.upper()}: {state}")
+        return "\n".join(lines)
+
+    def build_replan_prompt(self, task, snapshot):
+        """
+        Build a prompt for re-planning only the remaining part of a task.
+
+        Args:
+            task: Original task goal
+            snapshot: RobotExecutor.snapshot() with current object positions,
+                holding state and completed actions
+        """
+        objects = {name: tuple(pos) for name, pos in snapshot["objects"].items()}
+        progress = self._format_progress(snapshot)
+        remaining_task = (f"{task} Plan ONLY the remaining steps needed to finish this task "
+                          f"from the current state below. Step IDs restart from 1.")
+        return self.build_prompt(remaining_task, objects=objects, progress=progress)
+
+    def build_prompt(self, task=None, objects=None, progress=None, compact=None):
+        """
+        Build prompt based on Environment
+
+        Args:
+            task: Task goal (asked on stdin if None)
+            objects: Dict of object name -> (x, y, z), defaults to Environment.objects
+            progress: Optional execution progress section (used for re-planning)
+            compact: Build the compact prompt (defaults to the builder's setting)
+        """
         if task is None:
             task = input("Input task: ")
+        if objects is None:
+            objects = self.env.objects
+        if compact is None:
+            compact = self.compact
+        if compact:
+            prompt = self._build_compact_prompt(task, objects, progress)
+            self._report_size(prompt, "compact")
+            return prompt
 
         # Get object names from environment
-        object_names = [name for name in self.env.objects.keys()]
-        objects = ", ".join(object_names)
+        object_names = [name for name in objects.keys()]
+        objects_str = ", ".join(object_names)
 
         # Analyze reachability based on positions from environment
-        agent_objects = self.reachability_analysis(self.env.objects)
+        agent_objects = self.reachability_analysis(objects)
 
         # Build prompt sections
         reachability_status = self._format_reachability_status(agent_objects)
         capabilities = self._format_capabilities()
         label_description = self._generate_label_description()
         example = self._generate_example(agent_objects)
+        progress_section = f"\n{progress}" if progress else ""
 
         prompt_template = f"""
         You are an intelligent collaborative planner capable of coordinating multiple agents based on their manipulation capabilities and reachable workspaces.
@@ -181,9 +304,9 @@ class PromptBuilder:
 
     Environment description:
     1) Task: "{task}"
-    2) Objects: {objects}
+    2) Objects: {objects_str}
     3) Reachability status: 
-{reachability_status}
+{reachability_status}{progress_section}
 
     Capabilities:
 {capabilities}
@@ -222,8 +345,57 @@ class PromptBuilder:
     {example}
     """
 
+        self._report_size(prompt_template, "full")
         return prompt_template
 
+    def _build_compact_prompt(self, task, objects, progress=None):
+        """
+        Compact prompt: the handoff label is described once as a pattern instead
+        of listing every robot pair, identical capabilities are merged, and the
+        object list is folded into the per-agent reachability table.
+        """
+        agent_objects = self.reachability_analysis(objects)
+        agents = ", ".join(self.agent_names)
+        first = self.agent_names[0]
+        second = self.agent_names[1] if len(self.agent_names) > 1 else first
+        progress_section = f"\n{progress}" if progress else ""
+
+        return f"""
+    You plan tasks for {len(self.agent_names)} collaborating robot agents ({agents}).
+
+    Task: "{task}"
+    Objects by reachable agent (name_{{1,2}} means name_1, name_2):
+{self._format_object_table_compact(agent_objects)}{progress_section}
+
+    Capabilities:
+{self._format_capabilities_compact()}
+
+    Output one tuple per step: ("<label>", "<action>", "node[<step IDs>]")
+    - <label> is an agent name ({agents}) for its own action, or "<X>to<Y>"
+      (e.g. "{first}to{second}") for a handoff from agent X to agent Y (any two
+      different agents), whose action is always "move <object> to <Y>".
+    Rules:
+    1) Every place follows a pick of the same object by the same agent.
+    2) An agent may hold an object across steps; it holds one object at a time.
+    3) An agent only handles objects it reaches; otherwise the reaching agent
+       picks it and hands it over with "<X>to<Y>", then Y picks it.
+    4) Prefer independent work per agent; hand over only when necessary.
+    5) node[...] lists the minimal step IDs (from 1, in output order) a step
+       depends on; node[] if none.
+    6) No redundant steps. Output ONLY the plan.
+    Example:
+    ("{second}", "pick lemon", "node[]"),
+    ("{second}", "place lemon on the plate", "node[1]"),
+    ("{first}", "pick apple", "node[]"),
+    ("{first}to{second}", "move apple to {second}", "node[3]"),
+    ("{second}", "pick apple", "node[4]"),
+    ("{second}", "place apple on the plate", "node[5]")
+    """
+
+    def _report_size(self, prompt, mode):
+        print(f"[INFO] Prompt ({mode}): {len(self.agent_names)} agents, "
+              f"{len(prompt)} chars, ~{estimate_tokens(prompt)} tokens")
+
     def print_agent_summary(self):
         print("\n" + "=" * 60)
         print(" AGENT CONFIGURATION SUMMARY")
@@ -244,6 +416,18 @@ class PromptBuilder:
         print("=" * 60 + "\n")
 
 
-def build_prompt(task=None, agent_config=None):
-    builder = PromptBuilder(agent_config)
-    return builder.build_prompt(task)
\ No newline at end of file
+def agent_config_for(env):
+    """AGENT_CONFIG entry for every robot of an Environment (all robots share the capabilities)"""
+    capabilities = AGENT_CONFIG["robot1"]["capabilities"]
+    return {agent: {"capabilities": capabilities} for agent in env.agent_positions}
+
+
+def build_prompt(task=None, agent_config=None, compact=False):
+    builder = PromptBuilder(agent_config, compact=compact)
+    return builder.build_prompt(task)
+
+
+def task_from_prompt(prompt):
+    """Task goal a prompt from build_prompt was built for, or None if it has no task line"""
+    match = TASK_LINE_PATTERN.search(prompt)
+    return match.group(1) if match else None
\ No newline at end of file
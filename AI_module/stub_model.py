@@ -0,0 +1,69 @@
+"""
+Local stand-in for the Gemini GenerativeModel.
+Returns canned responses (optionally streamed in chunks) so the planning
+pipeline can be exercised without network access or an API key.
+"""
+
+import time
+
+from AI_module.plan_parser import as_records
+
+
+class StubResponse:
+    """Minimal response object exposing .text like a Gemini response"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """
+    Drop-in replacement for genai.GenerativeModel.generate_content.
+
+    Usage:
+        model = StubModel(plan_to_text(call_gemini_1()), chunk_size=8, delay=0.05)
+        for task in stream_plan(prompt, model=model):
+            ...
+    """
+
+    def __init__(self, responses, chunk_size=16, delay=0.0, model_name="stub"):
+        """
+        Args:
+            responses: Canned response text, a list of texts (cycled through on
+                successive calls) or a callable prompt -> text
+            chunk_size: Characters per streamed chunk
+            delay: Seconds to wait before each chunk (simulates generation latency)
+            model_name: Name reported to caches and metrics
+        """
+        if isinstance(responses, str):
+            responses = [responses]
+        self.responses = responses
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.model_name = model_name
+        self.calls = 0
+
+    def _next_text(self, prompt):
+        if callable(self.responses):
+            text = self.responses(prompt)
+        else:
+            text = self.responses[self.calls % len(self.responses)]
+        self.calls += 1
+        return text
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        text = self._next_text(prompt)
+        if stream:
+            return self._stream(text)
+        time.sleep(self.delay)
+        return StubResponse(text)
+
+    def _stream(self, text):
+        for start in range(0, len(text), self.chunk_size):
+            time.sleep(self.delay)
+            yield StubResponse(text[start:start + self.chunk_size])
+
+
+def plan_to_text(task_plan):
+    """Render a list of TaskRecords or (agent, action, node) tuples as LLM response text"""
+    return ",\n".join(f'("{task.agent}", "{task.action}", "{task.node}")' for task in as_records(task_plan))
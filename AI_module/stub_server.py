@@ -0,0 +1,167 @@
+"""
+Local LLM Stand-in Server
+Small HTTP server that answers planning prompts with canned plans, with
+configurable latency, failures and stalls, so the LLM client's timeouts,
+retries and hedging can be exercised without network access.
+
+Protocol (see llm_client.HTTPModel):
+    POST /generate  {"prompt": str, "generation_config": dict | null}
+    -> 200 {"text": str, "usage_metadata": {"prompt_token_count": int,
+                                            "candidates_token_count": int}}
+    -> 500 {"error": str} on an injected failure
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.process_prompt import estimate_tokens
+from AI_module.stub_model import plan_to_text
+
+
+class StubLLMServer:
+    """
+    Usage:
+        with StubLLMServer(plan_to_text(call_gemini_1()), latency=0.2, failure_rate=0.1) as server:
+            client = LLMClient(HTTPModel(server.url), timeout=2, hedge_after=0.5)
+            text = generate_text(prompt, model=client)
+    """
+
+    def __init__(self, responses, latency=0.0, jitter=0.0, failure_rate=0.0,
+                 stall_rate=0.0, stall_time=30.0, host="127.0.0.1", port=0, seed=None):
+        """
+        Args:
+            responses: Response text, a list of texts (cycled through) or a
+                callable prompt -> text
+            latency: Base seconds before answering
+            jitter: Extra uniform(0, jitter) seconds per request
+            failure_rate: Fraction of requests answered with HTTP 500
+            stall_rate: Fraction of requests held for stall_time seconds
+                (simulates a hung model)
+            stall_time: Seconds a stalled request is held
+            host, port: Bind address (port 0 = any free port)
+            seed: Seed for the latency/failure draws
+        """
+        if isinstance(responses, str):
+            responses = [responses]
+        self.responses = responses
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.stall_rate = stall_rate
+        self.stall_time = stall_time
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/generate"
+
+    def _draw(self, prompt):
+        # Response and fault injection for one request, drawn under the lock
+        # so a seeded server is reproducible request by request
+        with self.lock:
+            index = self.requests
+            self.requests += 1
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            roll = self.rng.random()
+        if roll < self.failure_rate:
+            return None, delay
+        if roll < self.failure_rate + self.stall_rate:
+            delay = self.stall_time
+        if callable(self.responses):
+            return self.responses(prompt), delay
+        return self.responses[index % len(self.responses)], delay
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.rstrip("/") != "/generate":
+                    self._reply(404, {"error": f"unknown path {self.path}"})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length).decode("utf-8"))
+                    prompt = request["prompt"]
+                except (ValueError, KeyError) as e:
+                    self._reply(400, {"error": f"bad request: {e}"})
+                    return
+
+                text, delay = server._draw(prompt)
+                time.sleep(delay)
+                if text is None:
+                    self._reply(500, {"error": "injected failure"})
+                    return
+                self._reply(200, {"text": text, "usage_metadata": {
+                    "prompt_token_count": estimate_tokens(prompt),
+                    "candidates_token_count": estimate_tokens(text)}})
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client gave up (timeout or hedge won)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="stub-llm-server")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve ground-truth plans as a local LLM stand-in")
+    parser.add_argument("--task", type=int, default=1, help="Ground-truth plan to serve (call_gemini_N)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-time", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    truth = importlib.import_module("AI_module.call_gemini_test_truth")
+    text = plan_to_text(getattr(truth, f"call_gemini_{args.task}")())
+    server = StubLLMServer(text, args.latency, args.jitter, args.failure_rate,
+                           args.stall_rate, args.stall_time, port=args.port, seed=args.seed)
+    print(f"[INFO] Serving Task{args.task} ground truth at {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
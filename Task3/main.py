@@ -8,12 +8,15 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 # Add the parent directory (project root) to sys.path so we can import 'graph'
 sys.path.append(os.path.join(SCRIPT_DIR, ".."))
 
+from AI_module.planner_backend import load_backend
 from graph.execute_command import run_from_json
+from graph.graph_command import plan_and_run, task_arguments
+from graph.replan import load_replanner
 from Task3 import environment
 
-#Sort the cubes in the correct bowl
+GOAL = "Clean the table: put the fruits on the plate and the cups and the spoon into the drawer"  # Prompt goal when planning with --backend or --replan
 
-def main():
+def main(args):
     p.connect(p.GUI)
     p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0)
     p.setRealTimeSimulation(0)
@@ -31,11 +34,19 @@ def main():
     p.resetDebugVisualizerCamera(camera_distance, camera_yaw, camera_pitch, camera_target_pos)
 
 
-    run_from_json(
-        os.path.join(SCRIPT_DIR, "../task_plan_truth/commands_task_3.json"), #Define the command file to run
-        robot_ids,
-        object_map
-    )
+    replanner = load_replanner(args.replan, env, args.goal) if args.replan else None
+    if args.backend:
+        # Plan with the LLM (or another planner backend) instead of the ground-truth file
+        plan_and_run(load_backend(args.backend), env, robot_ids, object_map, args.goal, stream=args.stream,
+                     replanner=replanner)
+    else:
+        run_from_json(
+            os.path.join(SCRIPT_DIR, "../task_plan_truth/commands_task_3.json"), #Define the command file to run
+            robot_ids,
+            object_map,
+            replanner=replanner,
+            optimize=True  # Rewrite the plan with graph/plan_optimizer.py before running it
+        )
 
     cv2.destroyAllWindows()
     p.disconnect()
@@ -43,4 +54,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(task_arguments("Run Task 3 in the PyBullet GUI", GOAL).parse_args())
\ No newline at end of file
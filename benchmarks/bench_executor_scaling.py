@@ -0,0 +1,166 @@
+"""
+Executor Scaling Benchmark
+Runs RobotExecutor on synthetic plans (graph/plan_generator.py) with a no-op
+robot backend, so everything measured is scheduling: task selection, the
+polling sleep, dependency checks and lock traffic.
+
+Per run:
+    overhead/task   Wall time per task (no task does any work)
+    select          Time spent in _get_next_available_task (pool scan), summed over workers
+    empty polls     Selections that found nothing eligible (each costs a poll sleep)
+    lock wait       Time threads spent blocked acquiring the executor locks, summed
+    contended       Share of lock acquisitions that had to wait
+    threads         Peak live threads (workers, main, log writer), sampled every 10 ms
+
+The pool is a list scanned under task_pool_lock for every selection, so
+select time and lock wait grow with the square of the plan size (about 1.3 s
+at 5k tasks and 26 s at 20k tasks with 2 robots); idle workers poll with a
+50 ms sleep, which dominates small plans.
+
+Usage:
+    python benchmarks/bench_executor_scaling.py --tasks 10 100 1000 10000
+    python benchmarks/bench_executor_scaling.py --tasks 1000 --robots 2 8 32 --density 2 --handoff-ratio 0.5
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from graph.execute_command import RobotExecutor
+from graph.plan_generator import generate_plan, robot_names, synthetic_handoff_points
+from telemetry import log as dag_log
+
+LOCKS = ("task_pool_lock", "completion_lock", "holding_lock", "constraint_lock")
+
+
+class TimedLock:
+    """threading.Lock that counts acquisitions, contended acquisitions and time spent waiting"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_time = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self.lock.acquire(False):
+            self.acquisitions += 1
+            return True
+        if not blocking:
+            return False
+        start = time.perf_counter()
+        acquired = self.lock.acquire(True, timeout)
+        if acquired:
+            # Counters are only updated while holding the lock
+            self.acquisitions += 1
+            self.contended += 1
+            self.wait_time += time.perf_counter() - start
+        return acquired
+
+    def release(self):
+        self.lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+class NoOpExecutor(RobotExecutor):
+    """RobotExecutor whose tasks complete instantly (pick returns a dummy constraint)"""
+
+    def __init__(self, agents, handoff_points):
+        super().__init__({agent: None for agent in agents}, {}, handoff_points)
+        for name in LOCKS:
+            setattr(self, name, TimedLock())
+        self.select_time = 0.0
+        self.selections = 0
+        self.empty_polls = 0
+        self.stats_lock = threading.Lock()
+
+    def _execute_task(self, task, constraint):
+        return 1 if task["action"] == "pick" else None
+
+    def _get_next_available_task(self, agent):
+        start = time.perf_counter()
+        task = super()._get_next_available_task(agent)
+        elapsed = time.perf_counter() - start
+        with self.stats_lock:
+            self.select_time += elapsed
+            self.selections += 1
+            if task is None:
+                self.empty_polls += 1
+        return task
+
+
+def run(num_tasks, num_robots, density, handoff_ratio, seed=0):
+    """Execute one synthetic plan on the no-op executor and collect the statistics"""
+    commands = generate_plan(num_tasks, num_robots, density, handoff_ratio, seed=seed)
+    executor = NoOpExecutor(robot_names(num_robots), synthetic_handoff_points(num_robots))
+
+    peak_threads = threading.active_count()
+    done = threading.Event()
+
+    def sample_threads():
+        nonlocal peak_threads
+        while not done.wait(0.01):
+            peak_threads = max(peak_threads, threading.active_count())
+
+    sampler = threading.Thread(target=sample_threads, name="thread-sampler", daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    ok = executor.run_commands(commands)
+    wall = time.perf_counter() - start
+    done.set()
+    sampler.join()
+
+    locks = [getattr(executor, name) for name in LOCKS]
+    acquisitions = sum(lock.acquisitions for lock in locks)
+    return {
+        "tasks": len(commands),
+        "robots": num_robots,
+        "ok": ok,
+        "wall": wall,
+        "per_task_us": wall / len(commands) * 1e6 if commands else 0.0,
+        "select": executor.select_time,
+        "selections": executor.selections,
+        "empty_polls": executor.empty_polls,
+        "lock_wait": sum(lock.wait_time for lock in locks),
+        "contended": sum(lock.contended for lock in locks) / acquisitions if acquisitions else 0.0,
+        "threads": peak_threads - 1,  # Without the sampler
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark RobotExecutor scheduling overhead on synthetic plans")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--robots", type=int, nargs="+", default=[2, 8])
+    parser.add_argument("--density", type=float, default=0.5, help="Extra dependencies per item")
+    parser.add_argument("--handoff-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=120.0,
+                        help="Skip larger plans for a robot count once a run takes longer (seconds)")
+    args = parser.parse_args()
+
+    dag_log.configure(level="WARNING")  # Per-task INFO lines would dominate at these sizes
+
+    print(f"{'robots':>6} {'tasks':>7} | {'wall s':>8} {'overhead/task':>14} {'select s':>9} {'empty polls':>12} "
+          f"{'lock wait s':>12} {'contended':>10} {'threads':>8}")
+    print("-" * 100)
+    for num_robots in args.robots:
+        for num_tasks in sorted(args.tasks):
+            r = run(num_tasks, num_robots, args.density, args.handoff_ratio, args.seed)
+            print(f"{r['robots']:>6} {r['tasks']:>7} | {r['wall']:>8.2f} {r['per_task_us']:>12.0f}us "
+                  f"{r['select']:>9.3f} {r['empty_polls']:>12} {r['lock_wait']:>12.4f} {r['contended']:>10.1%} "
+                  f"{r['threads']:>8}" + ("" if r["ok"] else "  FAILED"))
+            if r["wall"] > args.budget:
+                print(f"[INFO] {r['wall']:.0f}s exceeds the {args.budget:.0f}s budget; "
+                      f"skipping larger plans for {num_robots} robots")
+                break
@@ -0,0 +1,92 @@
+"""
+Plan Format Benchmark
+Load time of the binary plan format (graph/plan_format.py) against the JSON
+export for large synthetic plans.
+
+Usage:
+    python benchmarks/bench_plan_format.py --tasks 1000 100000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.plan_parser import parse_plan, parse_dependencies
+from graph.plan_format import write_plan, load_plan
+from bench_plan_parser import synthetic_response
+
+
+def synthetic_commands(num_tasks):
+    """Command dicts (export_json format) for a synthetic plan"""
+    commands = []
+    for record in parse_plan(synthetic_response(num_tasks)):
+        handoff = bool(record.source)
+        commands.append({
+            "id": record.index,
+            "agent": record.source if handoff else record.agent,
+            "action": record.verb,
+            "object": record.object.replace(" ", "_"),
+            "destination": record.destination.replace(" ", "_"),
+            "lane": "transfer" if handoff else record.agent,
+            "node": record.node,
+        })
+    return commands
+
+
+def load_json(path):
+    """JSON path used by RobotExecutor.run_from_json: load, then parse every node string"""
+    with open(path) as f:
+        commands = json.load(f)
+    deps = {cmd["id"]: parse_dependencies(cmd["node"]) for cmd in commands}
+    return commands, deps
+
+
+def open_binary(path):
+    """Map the file and read one dependency slice (what a zero-copy consumer pays)"""
+    with load_plan(path) as plan:
+        return len(plan), plan.dependencies(len(plan) - 1).tolist()
+
+
+def load_binary(path):
+    """Full materialization for RobotExecutor.run_from_binary"""
+    with load_plan(path) as plan:
+        return plan.commands(), plan.dependency_map()
+
+
+def bench(fn, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark binary vs JSON plan loading")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'json KB':>9} {'plan KB':>9} | {'json load':>10} {'binary open':>12} {'binary full':>12}")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_tasks in args.tasks:
+            commands = synthetic_commands(num_tasks)
+            json_path = os.path.join(tmp, "plan.json")
+            plan_path = os.path.join(tmp, "plan.plan")
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(commands, f, indent=2, ensure_ascii=False)
+            write_plan(commands, plan_path)
+
+            assert load_binary(plan_path)[0] == load_json(json_path)[0]
+            t_json = bench(load_json, json_path, args.repeat)
+            t_open = bench(open_binary, plan_path, args.repeat)
+            t_full = bench(load_binary, plan_path, args.repeat)
+            print(f"{num_tasks:>8} {os.path.getsize(json_path) / 1024:>9.1f} {os.path.getsize(plan_path) / 1024:>9.1f} | "
+                  f"{t_json * 1e3:>8.2f}ms {t_open * 1e6:>10.1f}us {t_full * 1e3:>10.2f}ms")
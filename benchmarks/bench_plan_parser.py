@@ -0,0 +1,110 @@
+"""
+Plan Parser Benchmark
+Throughput of the single-pass plan_parser on very large synthetic LLM responses,
+compared with the previous per-line regex pipeline.
+
+Usage:
+    python benchmarks/bench_plan_parser.py --tasks 1000 10000 100000
+"""
+
+import argparse
+import gc
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.plan_parser import parse_plan
+
+_TUPLE = re.compile(r'\(\s*"([^"]*)"\s*,\s*"([^"]*)"\s*,\s*"([^"]*)"\s*\)')
+_PARSE = re.compile(r'\("([^"]+)",\s*"([^"]+)",\s*"([^"]+)"\)')
+_DEPS = re.compile(r'node\[([\d,\s]+)\]')
+
+
+def synthetic_response(num_tasks, num_robots=3, seed=0):
+    """LLM-style response with pick/place/handoff tuples and node[...] dependencies"""
+    rng = random.Random(seed)
+    lines = []
+    step = 0
+    while step < num_tasks:
+        agent = f"robot{rng.randint(1, num_robots)}"
+        obj = f"cube_{step}"
+        step += 1
+        lines.append(f'("{agent}", "pick {obj}", "node[]")')
+        pick_id = step
+        if rng.random() < 0.3 and step < num_tasks:
+            receiver = f"robot{rng.randint(1, num_robots)}"
+            step += 1
+            lines.append(f'("{agent}to{receiver}", "move {obj} to {receiver}", "node[{pick_id}]")')
+            step += 1
+            lines.append(f'("{receiver}", "pick {obj}", "node[{step - 1}]")')
+            pick_id = step
+        if step < num_tasks:
+            step += 1
+            extra = f", {rng.randint(1, pick_id)}" if rng.random() < 0.2 else ""
+            lines.append(f'("{agent}", "place {obj} into bowl_{step % 7}", "node[{pick_id}{extra}]")')
+    return ",\n".join(lines[:num_tasks])
+
+
+def legacy_pipeline(text):
+    """Previous approach: regex per line, regex over the text, then re-split every action"""
+    lines = []
+    for line in text.strip().split('\n'):
+        match = _TUPLE.search(line.strip())
+        if match:
+            lines.append(f'("{match.group(1).lower()}", "{match.group(2)}", "{match.group(3)}")')
+    records = []
+    for agent, action, node in _PARSE.findall(',\n'.join(lines)):
+        action = action.lower().strip()
+        verb = action.split(" ", 1)[0]
+        rest = action[len(verb):].strip()
+        for sep in (" into ", " in ", " on ", " onto ", " to "):
+            if sep in f" {rest} ":
+                obj, _, dest = rest.partition(sep.strip())
+                break
+        else:
+            obj, dest = rest, ""
+        match = _DEPS.search(node)
+        deps = [int(x) for x in match.group(1).split(',') if x.strip()] if match else []
+        records.append((agent, verb, obj.strip(), dest.strip(), deps))
+    return records
+
+
+def bench(fns, text, repeat):
+    """Best time and result size per function; runs alternate so both see the same machine load"""
+    best = [float("inf")] * len(fns)
+    sizes = [0] * len(fns)
+    for _ in range(repeat):
+        for i, fn in enumerate(fns):
+            gc.collect()  # Garbage of the previous run is not charged to this one
+            start = time.perf_counter()
+            result = fn(text)
+            best[i] = min(best[i], time.perf_counter() - start)
+            sizes[i] = len(result)
+    return list(zip(best, sizes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark plan parsing throughput")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'MB':>7} | {'parser':>24} | {'legacy regex':>24}")
+    print("-" * 72)
+    for num_tasks in args.tasks:
+        text = synthetic_response(num_tasks)
+        size_mb = len(text.encode("utf-8")) / 1e6
+        (new_time, new_count), (old_time, old_count) = bench([parse_plan, legacy_pipeline], text, args.repeat)
+        if new_count != old_count:
+            print(f"  warning: parser found {new_count} tasks, legacy found {old_count}")
+        print(f"{num_tasks:>8} {size_mb:>7.2f} | "
+              f"{new_time * 1e3:>8.1f} ms {size_mb / new_time:>7.1f} MB/s | "
+              f"{old_time * 1e3:>8.1f} ms {size_mb / old_time:>7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Prompt Size Benchmark
+Prompt length (characters and estimated tokens) of the full and compact
+PromptBuilder modes as the fleet and the scene grow.
+
+Usage:
+    python benchmarks/bench_prompt_size.py --robots 2 4 8 16 --objects-per-robot 4
+"""
+
+import argparse
+import math
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.process_prompt import PromptBuilder, AGENT_CONFIG, estimate_tokens
+
+COLORS = ("red", "green", "yellow", "blue")
+
+
+class SyntheticEnvironment:
+    """Robots on a circle around a table, numbered cubes and one bowl per color"""
+
+    def __init__(self, num_robots, objects_per_robot, radius=0.8):
+        self.agent_positions = {
+            f"robot{i + 1}": [radius * math.cos(2 * math.pi * i / num_robots),
+                              radius * math.sin(2 * math.pi * i / num_robots), 0.8]
+            for i in range(num_robots)
+        }
+        self.objects = {f"{color}_bowl": (0.3 * math.cos(k), 0.3 * math.sin(k), 0.8)
+                        for k, color in enumerate(COLORS)}
+        for i in range(num_robots * objects_per_robot):
+            angle = 2 * math.pi * i / (num_robots * objects_per_robot)
+            self.objects[f"{COLORS[i % len(COLORS)]}_cube_{i // len(COLORS) + 1}"] = (
+                0.55 * math.cos(angle), 0.55 * math.sin(angle), 0.8)
+
+
+def build(num_robots, objects_per_robot, compact):
+    capabilities = AGENT_CONFIG["robot1"]["capabilities"]
+    agent_config = {f"robot{i + 1}": {"capabilities": capabilities} for i in range(num_robots)}
+    env = SyntheticEnvironment(num_robots, objects_per_robot)
+    builder = PromptBuilder(agent_config, compact=compact, env=env)
+    return builder.build_prompt("Sort every cube into the bowl of its color")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare full and compact prompt sizes")
+    parser.add_argument("--robots", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--objects-per-robot", type=int, default=4)
+    args = parser.parse_args()
+
+    rows = []
+    for num_robots in args.robots:
+        full = build(num_robots, args.objects_per_robot, compact=False)
+        compact = build(num_robots, args.objects_per_robot, compact=True)
+        rows.append((num_robots, num_robots * args.objects_per_robot,
+                     estimate_tokens(full), estimate_tokens(compact)))
+
+    print(f"\n{'robots':>7} {'objects':>8} | {'full tokens':>12} {'compact tokens':>15} {'ratio':>6}")
+    print("-" * 56)
+    for num_robots, num_objects, full_tokens, compact_tokens in rows:
+        print(f"{num_robots:>7} {num_objects:>8} | {full_tokens:>12} {compact_tokens:>15} "
+              f"{compact_tokens / full_tokens:>6.2f}")
@@ -0,0 +1,267 @@
+"""
+Robustness Sweep
+Monte-Carlo runs of the ground-truth task plans on randomized scenes: every
+episode shifts and rotates the items, the containers and the robot bases
+within the given bounds, then executes the plan headless in deterministic
+mode (robot/determinism.py). Episodes run across a process pool, one PyBullet
+DIRECT server per worker.
+
+An episode succeeds when the final scene meets the task goal (every item in
+or on its destination, robot/success_eval.py), not merely when the executor
+reports every task done. Reported per task: success rate, executor
+completion rate and the makespan distribution; per primitive (pick, place,
+move, sweep): plan tasks, primitive attempts (pick retries included),
+attempt failure rate, tasks never attempted (skipped or rejected) and sim
+steps per attempt.
+An episode is reproducible from (task, seed, bounds), so failing seeds are
+saved and can be re-run with --seeds; with --log-dir their replay logs
+(robot/replay_log.py) are written too.
+
+Usage:
+    python benchmarks/robustness_sweep.py --tasks 1 5 --episodes 1000 --workers 8
+    python benchmarks/robustness_sweep.py --tasks 5 --seeds 17 42 --log-dir failures/
+    python robot/replay_log.py failures/task5_seed17.rlog --task 5 --gui
+"""
+
+import argparse
+import importlib
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from run_tasks import plan_path
+
+DEFAULT_BOUNDS = {
+    "item_xy": 0.02,       # Item position noise, uniform +-meters in x and y
+    "container_xy": 0.02,  # Container position noise
+    "robot_xy": 0.01,      # Robot base position noise
+    "yaw": 0.1,            # Item and robot base yaw noise, uniform +-radians
+}
+DEFAULT_OUTPUT = "sweep_results.json"
+
+
+def perturb_scene(env, rng, bounds):
+    """
+    Randomize a set-up scene in place.
+
+    Args:
+        env: Task Environment after setup_simulation()
+        rng: random.Random
+        bounds: Dict like DEFAULT_BOUNDS
+
+    Returns:
+        Dict body name -> [dx, dy, dyaw] applied
+    """
+    import pybullet as p
+    from AI_module.assignment import is_container
+
+    def shift(body, xy, yaw):
+        pos, orn = p.getBasePositionAndOrientation(body)
+        dx, dy, dyaw = rng.uniform(-xy, xy), rng.uniform(-xy, xy), rng.uniform(-yaw, yaw)
+        roll, pitch, base_yaw = p.getEulerFromQuaternion(orn)
+        p.resetBasePositionAndOrientation(body, [pos[0] + dx, pos[1] + dy, pos[2]],
+                                          p.getQuaternionFromEuler([roll, pitch, base_yaw + dyaw]))
+        return [round(dx, 5), round(dy, 5), round(dyaw, 5)]
+
+    applied = {}
+    for name in sorted(env.objects):
+        if is_container(name):
+            applied[name] = shift(env.objects[name], bounds["container_xy"], 0.0)
+        else:
+            applied[name] = shift(env.objects[name], bounds["item_xy"], bounds["yaw"])
+    for agent in sorted(env.robot_id):
+        applied[agent] = shift(env.robot_id[agent].id, bounds["robot_xy"], bounds["yaw"])
+    return applied
+
+
+def _init_worker():
+    import pybullet as p
+    from robot import robot_action
+    from telemetry import log as dag_log
+
+    p.connect(p.DIRECT)
+    robot_action.DEFAULT_SLEEP = 0
+    dag_log.configure(level="CRITICAL")  # Thousands of episodes; failures are aggregated instead
+
+
+def run_episode(task, seed, bounds, log_dir=None):
+    """
+    One randomized headless episode (in a worker with a PyBullet connection).
+
+    Returns:
+        Dict with seed, success (goal met), executed (all tasks completed),
+        makespan, sim steps, failed task IDs, unmet goals, per-primitive
+        [tasks, attempts, failed attempts, tasks not attempted, steps] and
+        the applied perturbation
+    """
+    import pybullet as p
+    from graph.execute_command import RobotExecutor
+    from robot import determinism, replay_log, success_eval
+    from robot.handoff_points import handoff_points_for_environment
+
+    p.resetSimulation()
+    env = importlib.import_module(f"Task{task}.environment").Environment()
+    env.setup_simulation()
+    perturbation = perturb_scene(env, random.Random(seed), bounds)
+    # Every episode starts from reset poses, recorded or not, so a logged seed replays the same run
+    initial_poses = replay_log.reset_poses()
+    determinism.configure_physics(seed)
+    if log_dir:
+        replay_log.start_recording(meta={"task": task, "seed": seed, "bounds": bounds,
+                                         "initial_poses": initial_poses})
+
+    start = time.perf_counter()
+    executor = RobotExecutor(env.robot_id, dict(env.objects), handoff_points_for_environment(env),
+                             deterministic=True)
+    try:
+        executed = executor.run_from_json(plan_path(task))
+    finally:
+        recorder = replay_log.stop_recording()
+    report = executor.run_report()
+    goals = success_eval.evaluate(success_eval.goals_for_task(task), env.objects)
+    success = goals["success"]
+
+    if log_dir and not success:
+        recorder.write(os.path.join(log_dir, f"task{task}_seed{seed}.rlog"))
+
+    # Every plan task counts, including skipped ones the report has no record of
+    records = {record["id"]: record for record in report["tasks"]}
+    primitives = defaultdict(lambda: [0, 0, 0, 0, 0])  # action -> [tasks, attempts, failed, not attempted, steps]
+    for task_id, command in executor.task_map.items():
+        entry = primitives[command["action"]]
+        entry[0] += 1
+        record = records.get(task_id)
+        if record is None:
+            entry[3] += 1
+            continue
+        entry[1] += record["attempts"]
+        entry[2] += record["attempts"] - (record["status"] == "completed")
+        entry[4] += record["steps"]
+    return {
+        "task": task,
+        "seed": seed,
+        "success": success,
+        "executed": executed,
+        "makespan": report["run"]["makespan"],
+        "sim_steps": report["run"]["sim_steps"],
+        "failed": sorted(executor.failed_tasks),
+        "skipped": sorted(executor.skipped_tasks),
+        "unmet": [" ".join(goal) for goal in goals["unmet"]],
+        "primitives": dict(primitives),
+        "perturbation": perturbation,
+        "wall_time": time.perf_counter() - start,
+    }
+
+
+def _run(args):
+    return run_episode(*args)
+
+
+def sweep(tasks, seeds, bounds, workers=None, log_dir=None):
+    """Run every (task, seed) episode across a process pool; results in completion order"""
+    jobs = [(task, seed, bounds, log_dir) for task in tasks for seed in seeds]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for i, result in enumerate(pool.map(_run, jobs, chunksize=1), start=1):
+            results.append(result)
+            if i % max(1, len(jobs) // 20) == 0 or i == len(jobs):
+                print(f"[INFO] {i}/{len(jobs)} episodes")
+    return results
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)] if ordered else 0.0
+
+
+def aggregate(results):
+    """Per-task success rates and makespan distribution, per-primitive failure rates, unmet goal counts"""
+    by_task = defaultdict(list)
+    for result in results:
+        by_task[result["task"]].append(result)
+
+    summary = {}
+    for task, episodes in sorted(by_task.items()):
+        makespans = [e["makespan"] for e in episodes if e["success"]]
+        primitives = defaultdict(lambda: [0, 0, 0, 0, 0])
+        for episode in episodes:
+            for action, counts in episode["primitives"].items():
+                primitives[action] = [total + count for total, count in zip(primitives[action], counts)]
+        summary[f"task_{task}"] = {
+            "episodes": len(episodes),
+            "success_rate": sum(e["success"] for e in episodes) / len(episodes),
+            "executed_rate": sum(e["executed"] for e in episodes) / len(episodes),
+            "makespan": {
+                "mean": statistics.fmean(makespans) if makespans else 0.0,
+                "stdev": statistics.pstdev(makespans) if makespans else 0.0,
+                "p5": _percentile(makespans, 0.05),
+                "p50": _percentile(makespans, 0.5),
+                "p95": _percentile(makespans, 0.95),
+            },
+            "primitives": {
+                action: {"tasks": tasks, "attempts": attempts,
+                         "failure_rate": failures / attempts if attempts else 0.0,
+                         "not_attempted": not_attempted,
+                         "mean_steps": steps / attempts if attempts else 0.0}
+                for action, (tasks, attempts, failures, not_attempted, steps) in sorted(primitives.items())
+            },
+            "unmet_goals": dict(Counter(goal for e in episodes for goal in e["unmet"]).most_common()),
+            "failing_seeds": sorted(e["seed"] for e in episodes if not e["success"]),
+        }
+    return summary
+
+
+def print_summary(summary):
+    for task, entry in summary.items():
+        makespan = entry["makespan"]
+        print(f"\n{task}: {entry['episodes']} episodes, success {entry['success_rate']:.1%} "
+              f"(executor {entry['executed_rate']:.1%}), makespan (successful) mean {makespan['mean']:.2f}s sd {makespan['stdev']:.2f}s "
+              f"p5 {makespan['p5']:.2f}s p50 {makespan['p50']:.2f}s p95 {makespan['p95']:.2f}s")
+        print(f"  {'primitive':<10} {'tasks':>7} {'attempts':>9} {'failed':>8} {'not run':>8} {'mean steps':>11}")
+        for action, stats in entry["primitives"].items():
+            print(f"  {action:<10} {stats['tasks']:>7} {stats['attempts']:>9} {stats['failure_rate']:>8.1%} "
+                  f"{stats['not_attempted']:>8} {stats['mean_steps']:>11.1f}")
+        for goal, count in list(entry["unmet_goals"].items())[:5]:
+            print(f"  Unmet '{goal}' in {count} episodes")
+        if entry["failing_seeds"]:
+            seeds = entry["failing_seeds"]
+            print(f"  Failing seeds: {seeds[:20]}{' ...' if len(seeds) > 20 else ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte-Carlo robustness sweep over randomized task scenes")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1, 2, 3, 4, 5])
+    parser.add_argument("--episodes", type=int, default=100, help="Episodes per task")
+    parser.add_argument("--seed", type=int, default=0, help="First seed (episodes use seed, seed + 1, ...)")
+    parser.add_argument("--seeds", type=int, nargs="+", default=None, help="Run exactly these seeds")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    for key, value in DEFAULT_BOUNDS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=value, dest=key,
+                            help=f"Noise bound (default {value})")
+    parser.add_argument("--log-dir", default=None, help="Write replay logs of failing episodes here")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Results JSON (episodes, summary, failing seeds)")
+    args = parser.parse_args()
+
+    bounds = {key: getattr(args, key) for key in DEFAULT_BOUNDS}
+    seeds = args.seeds if args.seeds is not None else list(range(args.seed, args.seed + args.episodes))
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    results = sweep(args.tasks, seeds, bounds, args.workers, args.log_dir)
+    elapsed = time.perf_counter() - start
+    summary = aggregate(results)
+    print_summary(summary)
+    print(f"\n[INFO] {len(results)} episodes in {elapsed:.1f}s ({len(results) / elapsed * 60:.1f} episodes/min)")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"bounds": bounds, "summary": summary, "episodes": results}, f, indent=2)
+    print(f"[INFO] Results written to {args.output}")
@@ -0,0 +1,230 @@
+"""
+Task Benchmark Suite
+Executes the ground-truth plans task_plan_truth/commands_task_N.json headless
+in deterministic mode (PyBullet DIRECT, no step sleep, seeded, fixed physics
+parameters, robots taking turns; see robot/determinism.py) and records per task:
+
+    wall_time      Executor wall-clock time (seconds)
+    sim_steps      Simulation steps taken by all robots
+    makespan       Simulated time from the first task start to the last task end (seconds)
+    success_rate   Completed tasks / plan tasks
+    goal_rate      Goal predicates met in the final scene (robot/success_eval.py)
+    peak_memory    Peak resident memory of the run (MB)
+
+Each task runs in its own process so PyBullet state and peak memory do not
+leak between tasks. Results can be saved as baselines and later runs compared
+against them.
+
+Sim steps, makespan, success and goal rates are exact at a fixed seed (the
+final world state digest is checked to match across repeats), so only these
+are gated: any of them worse than the tolerance is reported as a regression
+and the exit status is 1. Wall time and peak memory vary with machine load
+and are reported against the baseline without failing the check; use
+--repeat 3 (median) for numbers attached to a change.
+
+Usage:
+    python benchmarks/run_tasks.py --save                  # Record baselines
+    python benchmarks/run_tasks.py --check                 # Compare, exit 1 on regression
+    python benchmarks/run_tasks.py --tasks 1 5 --repeat 3 --tolerance 0.15 --check
+"""
+
+import argparse
+import importlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(PROJECT_ROOT)
+
+TASKS = (1, 2, 3, 4, 5)
+DEFAULT_SEED = 0
+DEFAULT_TOLERANCE = 0.10  # Allowed relative slowdown / growth before flagging
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+RESULT_MARKER = "BENCH_RESULT "
+TASK_TIMEOUT = 600  # Seconds before a run counts as hung
+
+# Metric -> direction that counts as better ("lower" or "higher")
+METRICS = {
+    "wall_time": "lower",
+    "sim_steps": "lower",
+    "makespan": "lower",
+    "success_rate": "higher",
+    "goal_rate": "higher",
+    "peak_memory": "lower",
+}
+GATED_METRICS = ("sim_steps", "makespan", "success_rate", "goal_rate")  # Exact at a fixed seed
+
+
+def plan_path(task):
+    return os.path.join(PROJECT_ROOT, "task_plan_truth", f"commands_task_{task}.json")
+
+
+def run_task(task, seed=DEFAULT_SEED):
+    """
+    Execute one task plan headless in this process.
+
+    Returns:
+        Dict with the benchmark metrics (see module docstring)
+    """
+    import pybullet as p
+    from graph.execute_command import RobotExecutor
+    from robot import determinism, robot_action, success_eval
+    from robot.handoff_points import handoff_points_for_environment
+
+    robot_action.DEFAULT_SLEEP = 0
+
+    p.connect(p.DIRECT)
+    try:
+        env = importlib.import_module(f"Task{task}.environment").Environment()
+        env.setup_simulation()
+        determinism.configure_physics(seed)
+        # Handoff points of this task's scene (the executor defaults to the prompt Environment's)
+        executor = RobotExecutor(env.robot_id, dict(env.objects), handoff_points_for_environment(env),
+                                 deterministic=True)
+        start = time.perf_counter()
+        executor.run_from_json(plan_path(task))
+        wall_time = time.perf_counter() - start
+        report = executor.run_report()
+        goals = success_eval.evaluate(success_eval.goals_for_task(task), env.objects)
+        digest = determinism.world_digest()
+    finally:
+        p.disconnect()
+
+    total = len(executor.task_map)
+    completed = total - len(executor.failed_tasks) - len(executor.skipped_tasks)
+    return {
+        "wall_time": round(wall_time, 3),
+        "sim_steps": report["run"]["sim_steps"],
+        "makespan": round(report["run"]["makespan"], 3),
+        "success_rate": round(completed / total, 4) if total else 0.0,
+        "goal_rate": round(goals["met"] / goals["total"], 4) if goals["total"] else 0.0,
+        "peak_memory": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "digest": digest,
+    }
+
+
+def run_isolated(task, seed=DEFAULT_SEED, timeout=TASK_TIMEOUT):
+    """run_task in a fresh interpreter; executor output is reduced to warnings"""
+    env = dict(os.environ, DAG_LOG_LEVEL="WARNING")
+    try:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", str(task), "--seed", str(seed)],
+                              capture_output=True, text=True, env=env, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"Task{task} benchmark did not finish within {timeout}s") from None
+    for line in proc.stdout.splitlines():
+        # PyBullet's C-level warnings are not newline-terminated, so the marker can start mid-line
+        _, marker, result = line.partition(RESULT_MARKER)
+        if marker:
+            return json.loads(result)
+    raise RuntimeError(f"Task{task} benchmark failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+
+
+def run_suite(tasks, repeat=1, seed=DEFAULT_SEED):
+    """Median of each metric over `repeat` isolated runs per task"""
+    results = {}
+    for task in tasks:
+        runs = []
+        for i in range(repeat):
+            runs.append(run_isolated(task, seed))
+            print(f"[INFO] Task{task} run {i + 1}/{repeat}: {runs[-1]}")
+        if len({run["digest"] for run in runs}) > 1:
+            print(f"[WARN] Task{task} runs ended in different world states; the run is not deterministic")
+        results[f"task_{task}"] = {metric: round(statistics.median(run[metric] for run in runs), 4) for metric in METRICS}
+    return results
+
+
+def compare(results, baselines, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regressions of results against baselines, for the deterministic metrics
+    (GATED_METRICS) only.
+
+    Returns:
+        List of (task, metric, baseline, current) that got worse than allowed
+    """
+    regressions = []
+    for task, metrics in sorted(results.items()):
+        base = baselines.get(task)
+        if base is None:
+            continue
+        for metric in GATED_METRICS:
+            direction = METRICS[metric]
+            if metric not in base:
+                continue
+            if direction == "lower":
+                worse = metrics[metric] > base[metric] * (1 + tolerance)
+            else:
+                worse = metrics[metric] < base[metric] * (1 - tolerance)
+            if worse:
+                regressions.append((task, metric, base[metric], metrics[metric]))
+    return regressions
+
+
+def load_baselines(path=BASELINE_FILE):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["tasks"]
+
+
+def save_baselines(results, path=BASELINE_FILE, seed=DEFAULT_SEED, repeat=1):
+    baselines = {}
+    if os.path.exists(path):
+        baselines = load_baselines(path)
+    baselines.update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"seed": seed, "repeat": repeat, "python": sys.version.split()[0],
+                   "tasks": dict(sorted(baselines.items()))}, f, indent=2)
+        f.write("\n")
+    print(f"[INFO] Baselines for {', '.join(sorted(results))} written to {path}")
+
+
+def print_results(results, baselines=None):
+    baselines = baselines or {}
+    print(f"\n{'task':<8} {'wall s':>8} {'sim steps':>10} {'makespan s':>11} {'success':>8} {'goals':>6} {'peak MB':>8}")
+    print("-" * 65)
+    for task, metrics in sorted(results.items()):
+        print(f"{task:<8} {metrics['wall_time']:>8.2f} {metrics['sim_steps']:>10} {metrics['makespan']:>11.2f} "
+              f"{metrics['success_rate']:>8.0%} {metrics['goal_rate']:>6.0%} {metrics['peak_memory']:>8.1f}")
+        base = baselines.get(task)
+        if base:
+            deltas = [f"{metric} {(metrics[metric] - base[metric]) / base[metric]:+.1%}"
+                      for metric in METRICS if base.get(metric)]
+            print(f"{'':<8} vs baseline: {', '.join(deltas)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ground-truth task plans headless")
+    parser.add_argument("--tasks", type=int, nargs="+", default=list(TASKS))
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per task (median is reported)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--baselines", default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Store the results as baselines")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any metric regressed")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative regression (default 0.10)")
+    parser.add_argument("--child", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(RESULT_MARKER + json.dumps(run_task(args.child, args.seed)), flush=True)
+        sys.exit(0)
+
+    results = run_suite(args.tasks, args.repeat, args.seed)
+    baselines = load_baselines(args.baselines) if os.path.exists(args.baselines) else {}
+    print_results(results, baselines)
+
+    if args.save:
+        save_baselines(results, args.baselines, args.seed, args.repeat)
+    if args.check:
+        if not baselines:
+            print(f"[WARN] No baselines at {args.baselines}; run with --save first")
+            sys.exit(1)
+        regressions = compare(results, baselines, args.tolerance)
+        for task, metric, base, current in regressions:
+            print(f"[WARN] Regression in {task} {metric}: {base} -> {current}")
+        if regressions:
+            sys.exit(1)
+        print(f"[INFO] No regressions beyond {args.tolerance:.0%} in {', '.join(GATED_METRICS)}")
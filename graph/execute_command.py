@@ -6,10 +6,33 @@ Handles multi-robot task execution with parallel processing and dependency manag
 import threading
 from collections import defaultdict
 import json
+import logging
+import os
+import queue
 import time
-from robot import robot_action
+from robot import determinism, replay_log, robot_action
+from telemetry import profiling, tracing
+from telemetry.log import get_logger, flush as flush_log
+from telemetry.run_metrics import RunMetrics, REPORT_ENV
+from graph import plan_format
+from graph.plan_optimizer import optimize_plan, print_optimization_report
+from robot.handoff_points import handoff_points_for_environment
 from Task1.environment import Environment  # Define your environment class here ( Modify)
 
+MAX_PICK_RETRIES = 2  # Extra pick attempts (with re-perceived object pose) before giving up
+MAX_REPLANS = 2       # Re-planning rounds allowed per run when a replanner is attached
+REPLAN_TURN = "re-plan"  # Turn ring member of the re-plan thread in deterministic mode
+
+log = get_logger("executor")
+
+
+class TaskExecutionError(Exception):
+    """Raised when a task cannot be executed. Carries the failing task dict."""
+
+    def __init__(self, task, message):
+        super().__init__(message)
+        self.task = task
+
 
 class RobotExecutor:
     """
@@ -20,9 +43,16 @@ class RobotExecutor:
     - Task dependency management
     - Handoff point coordination between robots
     - Thread-safe state tracking
+    - Failure propagation: a failed task and its dependent sub-DAG are
+      dropped from the pool while unaffected tasks keep running
+    - Incremental re-planning: the failed sub-DAG can be replaced by a new
+      sub-plan spliced into the running DAG without restarting robots
+    - Deterministic mode: workers take turns in fixed agent order
+      (robot/determinism.py), so runs are reproducible
     """
     
-    def __init__(self, robot_ids, object_map, transfer_positions=None):
+    def __init__(self, robot_ids, object_map, transfer_positions=None, replanner=None, tracer=None,
+                 deterministic=False):
         """
         Initialize executor with robots and environment.
         
@@ -30,18 +60,52 @@ class RobotExecutor:
             robot_ids: Dict mapping agent names to robot instances
             object_map: Dict mapping object names to PyBullet IDs
             transfer_positions: Dict of handoff points (optional)
+            replanner: Callable snapshot -> list of commands (export_json format),
+                called when a task fails (optional)
+            tracer: telemetry.tracing.Tracer recording task, wait and primitive
+                spans (default: the global tracer, disabled unless enabled)
+            deterministic: Run one worker at a time in robot_ids order, handing
+                the turn on after every simulation step batch and instead of
+                polling sleeps (see robot/determinism.py; streamed plans still
+                arrive in real time)
         """
         self.robot_ids = robot_ids
         self.object_map = object_map
+        self.replanner = replanner
+        self.tracer = tracer if tracer is not None else tracing.get_tracer()
+        self.metrics = RunMetrics(robot_ids)  # Replaced at the start of every run
+        self.deterministic = deterministic
+        self.scheduler = None  # determinism.TurnScheduler during a deterministic run
 
         # Agent state: tracks if agent is holding an object (thread-safe)
         self.agent_holding = {agent: False for agent in robot_ids.keys()}
+        self.held_objects = {agent: None for agent in robot_ids.keys()}
         self.holding_lock = threading.Lock()
 
         # Task completion tracking (thread-safe)
+        self.task_map = {}
+        self.dependency_map = defaultdict(list)
         self.completed_tasks = set()
+        self.failed_tasks = {}        # Task ID -> failure reason
+        self.skipped_tasks = set()    # Dependents of failed tasks
+        self.superseded_tasks = set() # Failed/skipped tasks replaced by a re-plan
         self.completion_lock = threading.Lock()
 
+        # Streaming state: workers keep running while the plan is still arriving
+        self.stream_open = False
+
+        # Re-planning state: failures queue requests for the re-plan thread, so the
+        # failing worker goes on with its independent tasks during the LLM call
+        self.replan_count = 0
+        self.pending_replans = 0
+        self.replan_requests = queue.Queue()
+        self.replan_thread = None
+
+        # Worker threads by agent; an agent leaves active_agents (under completion_lock) when
+        # its worker decides to exit, so a re-plan can restart it
+        self.worker_threads = {}
+        self.active_agents = set()
+
         # Constraint tracking for pick/place operations (thread-safe)
         self.task_constraints = {}
         self.constraint_lock = threading.Lock()
@@ -59,15 +123,15 @@ class RobotExecutor:
         self._validate_robots()
 
     def _get_transfer_positions_from_env(self, env):
-        if not hasattr(env, 'handoff_points') or not env.handoff_points:
+        if not getattr(env, 'handoff_points', None) and not getattr(env, 'agent_positions', None):
             raise ValueError(
-                "[ERROR] Environment does not have 'handoff_points'. "
-                "Please define handoff_points in Environment"
+                "[ERROR] Environment has neither 'handoff_points' nor 'agent_positions'. "
+                "Please define one of them in Environment"
             )
-        transfer_pos = env.handoff_points
-        print("[INFO] Handoff points loaded from Environment:")
-        for key, pos in sorted(transfer_pos.items()):
-            print(f"  {key}: {pos}")
+        # Hand-typed points are kept; missing robot pairs are generated from the bases
+        transfer_pos = handoff_points_for_environment(env)
+        log.info("Handoff points loaded from Environment:\n%s",
+                 "\n".join(f"  {key}: {pos}" for key, pos in sorted(transfer_pos.items())))
         return transfer_pos
 
     def _validate_robots(self):
@@ -87,19 +151,16 @@ class RobotExecutor:
             )
 
     def print_transfer_positions(self):
-        print("\n" + "=" * 60)
-        print(" HANDOFF POINTS (for move action)")
-        print("=" * 60)
-        for key, pos in sorted(self.transfer_positions.items()):
-            print(f"{key}: {pos}")
-        print("=" * 60 + "\n")
-
-    def set_agent_holding(self, agent, holding=True):
-        """Set agent's holding state"""
+        lines = [f"{key}: {pos}" for key, pos in sorted(self.transfer_positions.items())]
+        log.info("\n%s\n HANDOFF POINTS (for move action)\n%s\n%s\n%s\n",
+                 "=" * 60, "=" * 60, "\n".join(lines), "=" * 60)
+
+    def set_agent_holding(self, agent, holding=True, obj=None):
+        """Set agent's holding state (and which object is held)"""
         with self.holding_lock:
             self.agent_holding[agent] = holding
-            status = "HOLDING object" if holding else "FREE (hands empty)"
-            print(f"  [{agent}]: {status}")
+            self.held_objects[agent] = obj if holding else None
+        log.debug("  [%s]: %s", agent, "HOLDING object" if holding else "FREE (hands empty)")
 
     def is_agent_holding(self, agent):
         """Check if agent is holding an object"""
@@ -109,12 +170,23 @@ class RobotExecutor:
     def mark_task_completed(self, task_id):
         with self.completion_lock:
             self.completed_tasks.add(task_id)
-            print(f"  [Task {task_id}] Completed")
+        log.info("  [Task %d] Completed", task_id, extra={"fields": {"event": "completed", "task": task_id}})
 
     def is_task_completed(self, task_id):
         with self.completion_lock:
             return task_id in self.completed_tasks
 
+    def is_task_failed(self, task_id):
+        """True if the task failed or was skipped because a dependency failed"""
+        with self.completion_lock:
+            return task_id in self.failed_tasks or task_id in self.skipped_tasks
+
+    def get_failed_subdag(self):
+        """Return task dicts of failed tasks and their skipped dependents, by ID"""
+        with self.completion_lock:
+            affected = set(self.failed_tasks) | self.skipped_tasks
+        return [self.task_map[task_id] for task_id in sorted(affected)]
+
     def set_task_constraint(self, task_id, constraint):
         with self.constraint_lock:
             self.task_constraints[task_id] = constraint
@@ -123,66 +195,222 @@ class RobotExecutor:
         with self.constraint_lock:
             return self.task_constraints.get(task_id)
 
-    def run_from_json(self, json_file):
+    def run_from_json(self, json_file, optimize=False):
         with open(json_file) as f:
             commands = json.load(f)
+        if optimize:
+            commands = self.optimize_commands(commands)
+        return self.run_commands(commands)
 
+    def optimize_commands(self, commands):
+        """
+        Run graph/plan_optimizer.py on a command list, with robot base and
+        object positions read from the running simulation.
+
+        Returns:
+            Optimized command list
+        """
+        agent_positions = {agent: robot_action.get_position(robot.id) for agent, robot in self.robot_ids.items()}
+        object_positions = {name: robot_action.get_position(obj_id) for name, obj_id in self.object_map.items()}
+        commands, report = optimize_plan(commands, agent_positions, object_positions)
+        print_optimization_report(report)
+        return commands
+
+    def run_from_binary(self, plan_file):
+        """
+        Execute a binary plan (graph/plan_format.py). Dependencies come
+        pre-resolved from the file, so node[...] strings are not re-parsed.
+        """
+        with plan_format.load_plan(plan_file) as plan:
+            commands = plan.commands()
+            dependency_map = plan.dependency_map()
+        return self.run_commands(commands, dependency_map)
+
+    def run_commands(self, commands, dependency_map=None):
+        """
+        Execute a list of command dicts (export_json format).
+
+        Args:
+            commands: List of command dicts
+            dependency_map: Pre-resolved task ID -> dependency IDs (optional,
+                parsed from the node[...] strings if omitted)
+        """
         self.task_map = {cmd["id"]: cmd for cmd in commands}
-        self.dependency_map = self._build_dependency_map(commands)
+        if dependency_map is None:
+            self.dependency_map = self._build_dependency_map(commands)
+        else:
+            self.dependency_map = defaultdict(list, dependency_map)
+            self._print_dependency_map(self.dependency_map)
 
-        print("\n" + "=" * 70)
-        print("EXECUTION PLAN - OPTIMIZED PARALLEL EXECUTION")
-        print("=" * 70)
-        print(f"Total tasks: {len(commands)}")
-        print(f"Agents: {list(self.robot_ids.keys())}")
-        print("=" * 70 + "\n")
+        log.info("\n%s\nEXECUTION PLAN - OPTIMIZED PARALLEL EXECUTION\n%s\nTotal tasks: %d\nAgents: %s\n%s\n",
+                 "=" * 70, "=" * 70, len(commands), list(self.robot_ids.keys()), "=" * 70)
 
         # Populate task pool
         with self.task_pool_lock:
             self.available_tasks = commands.copy()
 
-        print(f"[Task Pool] {len(self.available_tasks)} tasks loaded\n")
+        log.info("[Task Pool] %d tasks loaded\n", len(commands))
 
-        # Start worker thread for each agent
-        threads = []
-        for agent in self.robot_ids.keys():
-            t = threading.Thread(target=self._agent_worker, args=(agent,))
-            threads.append(t)
-            t.start()
+        threads = self._start_workers()
+        self._fail_dangling_dependencies()  # e.g. node[...] IDs of tuples the parser skipped
+        return self._join_workers(threads)
 
-        # Wait for all threads
-        for t in threads:
-            t.join()
+    def run_stream(self, command_stream):
+        """
+        Execute commands while the plan is still being generated.
+
+        Worker threads start immediately and pick up each task as soon as it
+        arrives, so tasks with node[] begin executing before the LLM has
+        finished the rest of the plan.
+
+        Args:
+            command_stream: Iterable of command dicts (export_json format),
+                e.g. graph_command.stream_commands(LLM.stream_plan(prompt))
+        """
+        log.info("\n%s\nEXECUTION PLAN - STREAMING EXECUTION\n%s\nAgents: %s\n%s\n",
+                 "=" * 70, "=" * 70, list(self.robot_ids.keys()), "=" * 70)
+
+        with self.completion_lock:
+            self.stream_open = True
 
-        print("\nAll tasks completed!")
+        threads = self._start_workers()
+        try:
+            for cmd in command_stream:
+                self.add_task(cmd)
+        finally:
+            self._fail_dangling_dependencies()
+            with self.completion_lock:
+                self.stream_open = False
+
+        log.info("[Task Pool] Stream closed, %d tasks received\n", len(self.task_map))
+        return self._join_workers(threads)
+
+    def add_task(self, cmd):
+        """Add a single command to the running DAG and task pool"""
+        deps = self._parse_node_dependencies(cmd.get("node", "node[]"))
+        with self.task_pool_lock:
+            with self.completion_lock:
+                self.task_map[cmd["id"]] = cmd
+                if deps:
+                    self.dependency_map[cmd["id"]] = deps
+            self.available_tasks.append(cmd)
+        log.debug("[Task Pool] Task %d added: %s %s %s deps=%s",
+                  cmd["id"], cmd["agent"], cmd["action"], cmd["object"], deps)
+
+    def _fail_dangling_dependencies(self):
+        """Fail tasks whose dependencies never arrived (invalid node[...] IDs)"""
+        for task_id, deps in list(self.dependency_map.items()):
+            missing = [d for d in deps if d not in self.task_map]
+            if missing and not self.is_task_failed(task_id):
+                self._handle_task_failure(self.task_map[task_id],
+                                          TaskExecutionError(self.task_map[task_id], f"unknown dependencies {missing}"))
+
+    def _start_workers(self):
+        """Start worker thread for each agent"""
+        self.metrics = RunMetrics(self.robot_ids)
+        if self.deterministic:
+            self.scheduler = determinism.set_scheduler(determinism.TurnScheduler(self.robot_ids))
+        self.worker_threads = {}
+        if self.replanner is not None:
+            self.replan_thread = threading.Thread(target=self._replan_worker, name=REPLAN_TURN, daemon=True)
+            self.replan_thread.start()
+        for agent in self.robot_ids.keys():
+            self._start_worker(agent)
+        return self.worker_threads
+
+    def _start_worker(self, agent):
+        """Start (or restart, after it exited) the worker thread of agent"""
+        with self.completion_lock:
+            self.active_agents.add(agent)
+            if self.scheduler is not None:
+                self.scheduler.add(agent)
+            t = threading.Thread(target=self._run_worker, args=(agent,), name=agent)
+            self.worker_threads[agent] = t
+        t.start()
+        return t
+
+    def _join_workers(self, threads):
+        """Wait for all worker threads, including ones restarted by a re-plan, and report the outcome"""
+        while True:
+            with self.completion_lock:
+                alive = [t for t in threads.values() if t.is_alive()]
+            if not alive:
+                break
+            for t in alive:
+                t.join()
+        if self.replan_thread is not None:
+            # Workers only exit once no re-plan is pending, so the queue is empty here
+            self.replan_requests.put(None)
+            self.replan_thread.join()
+            self.replan_thread = None
+        self.metrics.finish()
+        if self.scheduler is not None:
+            log.debug("[Deterministic] %d turn hand-overs", self.scheduler.turns)
+            determinism.set_scheduler(None)
+            self.scheduler = None
+
+        if self.superseded_tasks:
+            log.info("\nRe-planned around tasks: %s", sorted(self.superseded_tasks))
+
+        if self.failed_tasks:
+            lines = [f"  Task {task_id}: {reason}" for task_id, reason in sorted(self.failed_tasks.items())]
+            if self.skipped_tasks:
+                lines.append(f"  Skipped dependents: {sorted(self.skipped_tasks)}")
+            log.warning("\nFinished with %d failed task(s):\n%s", len(self.failed_tasks), "\n".join(lines))
+            return False
+
+        log.info("\nAll tasks completed!")
+        return True
+
+    def _parse_node_dependencies(self, node_str):
+        """Parse 'node[1,3]' into [1, 3]"""
+        if "node[" in node_str:
+            start = node_str.index("[") + 1
+            end = node_str.index("]")
+            deps_str = node_str[start:end].strip()
+
+            if deps_str:
+                return [int(d.strip()) for d in deps_str.split(",")]
+        return []
 
     def _build_dependency_map(self, commands):
         """Build dependency map from explicit node dependencies in JSON"""
         dependency_map = defaultdict(list)
 
         for cmd in commands:
-            task_id = cmd["id"]
-            node_str = cmd.get("node", "node[]")
-
-            if "node[" in node_str:
-                start = node_str.index("[") + 1
-                end = node_str.index("]")
-                deps_str = node_str[start:end].strip()
+            dep_ids = self._parse_node_dependencies(cmd.get("node", "node[]"))
+            if dep_ids:
+                dependency_map[cmd["id"]] = dep_ids
 
-                if deps_str:
-                    dep_ids = [int(d.strip()) for d in deps_str.split(",")]
-                    dependency_map[task_id] = dep_ids
+        self._print_dependency_map(dependency_map)
+        return dependency_map
 
-        print("\n[Dependency Map]")
+    def _print_dependency_map(self, dependency_map):
+        if not log.isEnabledFor(logging.DEBUG):
+            return
         if dependency_map:
-            for task_id in sorted(dependency_map.keys()):
-                deps = dependency_map[task_id]
-                print(f"  Task {task_id} depends on: {deps}")
+            lines = [f"  Task {task_id} depends on: {dependency_map[task_id]}" for task_id in sorted(dependency_map)]
         else:
-            print("No dependencies found")
-        print()
-
-        return dependency_map
+            lines = ["No dependencies found"]
+        log.debug("\n[Dependency Map]\n%s\n", "\n".join(lines))
+
+    def _run_worker(self, agent):
+        """Thread entry: the worker loop, inside the turn ring in deterministic mode"""
+        if self.scheduler is None:
+            self._agent_worker(agent)
+            return
+        self.scheduler.enter(agent)
+        try:
+            self._agent_worker(agent)
+        finally:
+            self.scheduler.leave()
+
+    def _pause(self):
+        """Wait before polling again: the next robot's turn, or a short sleep"""
+        if self.scheduler is not None:
+            self.scheduler.yield_turn()
+        else:
+            time.sleep(0.05)
 
     def _agent_worker(self, agent):
         """
@@ -194,7 +422,8 @@ class RobotExecutor:
         3. For PICK: agent must not be holding anything
         4. Execute immediately when conditions met
         """
-        print(f"\n[{agent}] Worker started")
+        log.debug("\n[%s] Worker started", agent)
+        wait_start = None  # Trace time the worker started waiting for an eligible task
 
         while True:
             # Try to get next available task for this agent
@@ -202,39 +431,54 @@ class RobotExecutor:
 
             if task is None:
                 # No more tasks available
-                if self._all_tasks_completed():
-                    print(f"[{agent}] All tasks done, shutting down")
+                if self._leave_if_done(agent):
+                    log.debug("[%s] All tasks done, shutting down", agent)
+                    if wait_start is not None:
+                        self.tracer.complete("idle", "wait", wait_start, self.tracer.now())
                     break
                 else:
                     # Wait a bit for dependencies or other agents
-                    time.sleep(0.05)
+                    if wait_start is None:
+                        wait_start = self.tracer.now()
+                    self.metrics.set_state(agent, "blocked" if self._has_pending_task(agent) else "idle")
+                    self._pause()
                     continue
 
+            if wait_start is not None:
+                self._trace_wait(task, wait_start)
+                wait_start = None
+
             task_id = task["id"]
             action = task["action"]
             obj = task["object"]
 
-            # Wait for dependencies BEFORE executing
-            self._wait_for_dependencies(task_id)
-
-            # Get constraint from previous pick if needed
-            prev_constraint = None
-            if action in ["place", "move"]:
-                for prev_task in self.task_map.values():
-                    if (prev_task["agent"] == agent and
-                            prev_task["object"] == obj and
-                            prev_task["action"] == "pick" and
-                            prev_task["id"] < task_id):
-                        prev_constraint = self.get_task_constraint(prev_task["id"])
-                        break
-
-            # Execute task
-            print(f"[{agent}] Executing Task {task_id}: {action} {obj}")
-            constraint = self._execute_task(task, prev_constraint)
+            try:
+                # Wait for dependencies BEFORE executing
+                self._wait_for_dependencies(task)
+
+                # Get constraint from previous pick if needed
+                prev_constraint = None
+                if action in ["place", "move"]:
+                    prev_constraint = self._find_pick_constraint(agent, obj, task_id)
+
+                # Execute task
+                log.info("[%s] Executing Task %d: %s %s", agent, task_id, action, obj,
+                         extra={"fields": {"event": "start", "agent": agent, "task": task_id,
+                                           "action": action, "object": obj}})
+                self.metrics.task_started(task, agent, tracing.thread_steps(), tracing.world_steps())
+                with self.tracer.span(f"Task {task_id}: {action} {obj}", "task", id=task_id, action=action,
+                                      object=obj, destination=task["destination"]):
+                    constraint = self._execute_task(task, prev_constraint)
+            except TaskExecutionError as e:
+                self.metrics.task_finished(task_id, tracing.thread_steps(), "failed", tracing.world_steps())
+                self._handle_task_failure(e.task, e)
+                continue
+
+            self.metrics.task_finished(task_id, tracing.thread_steps(), sim_clock=tracing.world_steps())
 
             # Update agent holding state based on action
             if action == "pick" and constraint:
-                self.set_agent_holding(agent, True)
+                self.set_agent_holding(agent, True, obj)
                 self.set_task_constraint(task_id, constraint)
             elif action in ["place", "move"]:
                 self.set_agent_holding(agent, False)
@@ -245,7 +489,41 @@ class RobotExecutor:
             # NO SLEEP HERE - immediately try to get next task!
             # This allows agent to pick next task ASAP after completing current one
 
-        print(f"[{agent}] Worker finished")
+        log.debug("[%s] Worker finished", agent)
+
+    def _has_pending_task(self, agent):
+        """True if the pool still holds a task for agent"""
+        with self.task_pool_lock:
+            return any(task["agent"] == agent for task in self.available_tasks)
+
+    def run_report(self):
+        """Utilization report of the last run (see telemetry.run_metrics.RunMetrics.report)"""
+        return self.metrics.report(dict(self.dependency_map))
+
+    def _trace_wait(self, task, wait_start):
+        """Record the time a worker waited before task became eligible"""
+        if not self.tracer.enabled:
+            return
+        deps = list(self.dependency_map.get(task["id"], []))
+        handoff = any(self.task_map.get(d, {}).get("action") == "move" for d in deps)
+        self.tracer.complete("handoff wait" if handoff else "dependency wait", "wait",
+                             wait_start, self.tracer.now(), {"task": task["id"], "dependencies": deps})
+
+    def _find_pick_constraint(self, agent, obj, task_id):
+        """Constraint of the latest successful pick of obj by agent before task_id"""
+        constraint = None
+        latest_id = 0
+        for prev_task in list(self.task_map.values()):
+            prev_id = prev_task["id"]
+            if (prev_task["agent"] == agent and
+                    prev_task["object"] == obj and
+                    prev_task["action"] == "pick" and
+                    latest_id < prev_id < task_id):
+                prev_constraint = self.get_task_constraint(prev_id)
+                if prev_constraint is not None:
+                    constraint = prev_constraint
+                    latest_id = prev_id
+        return constraint
 
     def _get_next_available_task(self, agent):
         """
@@ -286,50 +564,305 @@ class RobotExecutor:
                 if deps_satisfied:
                     # Found valid task - remove from pool and return
                     self.available_tasks.pop(i)
-                    print(f"  [{agent}] Selected Task {task_id} from pool")
-                    return task
+                    break
+            else:
+                return None
 
-            return None
+        log.debug("  [%s] Selected Task %d from pool", agent, task_id)
+        return task
 
     def _all_tasks_completed(self):
-        """Check if all tasks are completed"""
+        """Check if all tasks are completed, failed, skipped or superseded"""
         with self.completion_lock:
-            return len(self.completed_tasks) == len(self.task_map)
-
-    def _wait_for_dependencies(self, task_id):
+            return self._all_tasks_completed_locked()
+
+    def _all_tasks_completed_locked(self):
+        # Caller holds completion_lock
+        if self.pending_replans or self.stream_open:
+            return False
+        finished = (len(self.completed_tasks) + len(self.failed_tasks) +
+                    len(self.skipped_tasks) + len(self.superseded_tasks))
+        return finished == len(self.task_map)
+
+    def _leave_if_done(self, agent):
+        """If every task is finished, deregister agent's worker (it exits) and return True"""
+        with self.completion_lock:
+            if not self._all_tasks_completed_locked():
+                return False
+            self.active_agents.discard(agent)
+            if self.scheduler is not None:
+                self.scheduler.leave()  # Before a re-plan can restart agent and re-add it to the ring
+            return True
+
+    def _wait_for_dependencies(self, task):
         """Wait for all dependencies to complete"""
+        task_id = task["id"]
         if task_id in self.dependency_map:
             deps = self.dependency_map[task_id]
             waiting_for = [d for d in deps if not self.is_task_completed(d)]
 
             if waiting_for:
-                print(f"    Task {task_id} waiting for: {waiting_for}")
-
+                log.debug("    Task %d waiting for: %s", task_id, waiting_for)
+            else:
+                return
+
+            self.metrics.set_state(task["agent"], "blocked")
+            with self.tracer.span("dependency wait", "wait", task=task_id, dependencies=waiting_for):
+                for dep_id in deps:
+                    while not self.is_task_completed(dep_id):
+                        if self.is_task_failed(dep_id):
+                            raise TaskExecutionError(task, f"dependency {dep_id} failed")
+                        self._pause()
+
+    def _collect_dependents(self, task_id):
+        """Return IDs of every task that transitively depends on task_id"""
+        children = defaultdict(list)
+        for child_id, deps in list(self.dependency_map.items()):
             for dep_id in deps:
-                while not self.is_task_completed(dep_id):
-                    time.sleep(0.05)
+                children[dep_id].append(child_id)
+
+        dependents = set()
+        stack = [task_id]
+        while stack:
+            for child_id in children[stack.pop()]:
+                if child_id not in dependents:
+                    dependents.add(child_id)
+                    stack.append(child_id)
+        return dependents
+
+    def _handle_task_failure(self, task, error):
+        """
+        Record a failed task and drop its dependent sub-DAG from the pool.
+        Tasks outside the affected sub-DAG keep running.
+        """
+        task_id = task["id"]
+        dependents = self._collect_dependents(task_id)
+
+        with self.task_pool_lock:
+            # The task itself is still pooled when it failed before a worker took it (dangling dependencies)
+            self.available_tasks = [t for t in self.available_tasks
+                                    if t["id"] not in dependents and t["id"] != task_id]
+
+        with self.completion_lock:
+            self.failed_tasks[task_id] = str(error)
+            self.skipped_tasks.update(d for d in dependents if d not in self.completed_tasks)
+            self.skipped_tasks.discard(task_id)
+            if self.replanner is not None:
+                # Counted with the failure, so no worker sees the run as finished before the re-plan
+                self.pending_replans += 1
+
+        log.error("  [Task %d] FAILED: %s", task_id, error,
+                  extra={"fields": {"event": "failed", "task": task_id, "skipped": sorted(dependents)}})
+        if dependents:
+            log.warning("    Skipping dependent tasks: %s", sorted(dependents))
+
+        # A failed or skipped place/move leaves its object in the gripper; drop it so the
+        # agent can still take its independent picks
+        for dropped_id in [task_id] + sorted(dependents):
+            dropped = self.task_map[dropped_id]
+            if dropped["action"] in ("place", "move"):
+                self._drop_held_object(dropped["agent"], dropped["object"])
+
+        if self.replanner is not None:
+            if self.scheduler is not None:
+                self.scheduler.add(REPLAN_TURN)  # Joins the ring here, so the re-plan lands on the same step every run
+            self.replan_requests.put(task_id)
+
+    def _drop_held_object(self, agent, obj):
+        """Release obj if agent is still holding it, and mark the agent free"""
+        with self.holding_lock:
+            if not self.agent_holding.get(agent) or self.held_objects.get(agent) != obj:
+                return
+        with self.constraint_lock:
+            picks = [task_id for task_id, task in list(self.task_map.items())
+                     if task["agent"] == agent and task["object"] == obj and task["action"] == "pick"
+                     and self.task_constraints.get(task_id) is not None]
+            constraint = self.task_constraints.pop(max(picks)) if picks else None
+        if constraint is not None:
+            try:
+                robot_action.release(self.robot_ids[agent], constraint)
+            except Exception as e:
+                log.warning("    [%s] Could not release %s: %s", agent, obj, e)
+        self.set_agent_holding(agent, False)
+        log.warning("    [%s] Dropped %s (its place/move did not run)", agent, obj)
+
+    def snapshot(self):
+        """
+        Capture execution progress and world state for re-planning.
+
+        Returns:
+            Dict with completed/failed task IDs, completed action descriptions,
+            current object positions and per-agent held object
+        """
+        with self.completion_lock:
+            completed = sorted(self.completed_tasks)
+            failed = sorted((set(self.failed_tasks) | self.skipped_tasks) - self.superseded_tasks)
+        with self.holding_lock:
+            holding = dict(self.held_objects)
+
+        completed_actions = []
+        for task_id in completed:
+            task = self.task_map[task_id]
+            target = task["destination"]
+            description = f"{task['agent']}: {task['action']} {task['object']}"
+            if target:
+                preposition = "to" if task["action"] == "move" else "in"
+                description = f"{description} {preposition} {target}"
+            completed_actions.append(description)
+
+        objects = {name: robot_action.get_position(obj_id)
+                   for name, obj_id in self.object_map.items()}
+
+        return {
+            "completed": completed,
+            "failed": failed,
+            "completed_actions": completed_actions,
+            "objects": objects,
+            "holding": holding,
+        }
+
+    def splice_plan(self, commands, replaces=()):
+        """
+        Add a sub-plan to the running DAG. Sub-plan IDs (and their node[...]
+        references) are renumbered after the current highest task ID.
+
+        Args:
+            commands: List of command dicts in export_json format
+            replaces: Failed/skipped task IDs that the sub-plan supersedes
+
+        Returns:
+            List of new task IDs
+
+        Raises:
+            ValueError: if the sub-plan names an agent without a robot
+        """
+        unknown = sorted({cmd["agent"] for cmd in commands} - set(self.robot_ids))
+        if unknown:
+            raise ValueError(f"sub-plan uses unknown agents {unknown}")
+        sub_dependency_map = self._build_dependency_map(commands)
+        offset = max(self.task_map, default=0)
+
+        spliced = []
+        for cmd in commands:
+            task_id = cmd["id"] + offset
+            deps = [d + offset for d in sub_dependency_map.get(cmd["id"], [])]
+            spliced.append(dict(cmd, id=task_id, node=f"node[{','.join(map(str, deps))}]"))
+
+        with self.task_pool_lock:
+            with self.completion_lock:
+                for cmd in spliced:
+                    self.task_map[cmd["id"]] = cmd
+                    deps = sub_dependency_map.get(cmd["id"] - offset)
+                    if deps:
+                        self.dependency_map[cmd["id"]] = [d + offset for d in deps]
+                for task_id in replaces:
+                    self.failed_tasks.pop(task_id, None)
+                    self.skipped_tasks.discard(task_id)
+                    self.superseded_tasks.add(task_id)
+                exited = sorted({cmd["agent"] for cmd in spliced} - self.active_agents)
+            self.available_tasks.extend(spliced)
+
+        # Workers that already finished their part of the plan are restarted for the new tasks
+        for agent in exited:
+            log.info("[Re-plan] Restarting worker %s", agent)
+            self._start_worker(agent)
+
+        new_ids = [cmd["id"] for cmd in spliced]
+        log.info("[Re-plan] Spliced %d tasks: %s", len(new_ids), new_ids)
+        return new_ids
+
+    def _replan_worker(self):
+        """
+        Re-plan thread: serves the requests queued by _handle_task_failure one
+        round at a time. Failures queued during a round are covered by the next
+        snapshot together, so they cost one LLM call instead of one each.
+        In deterministic mode the thread takes a turn in the ring for each round.
+        """
+        while self.replan_requests.get() is not None:
+            if self.scheduler is not None:
+                self.scheduler.add(REPLAN_TURN)  # Already there unless the failure was raised outside the ring
+                self.scheduler.enter(REPLAN_TURN)
+            requests = 1
+            while not self.replan_requests.empty():  # Only this thread takes from the queue
+                self.replan_requests.get_nowait()
+                requests += 1
+            try:
+                self._replan()
+            finally:
+                with self.completion_lock:
+                    self.pending_replans -= requests
+                if self.scheduler is not None:
+                    self.scheduler.leave()
+
+    def _replan(self):
+        """Ask the replanner for a sub-plan covering the failed sub-DAG and splice it in"""
+        if self.replan_count >= MAX_REPLANS:
+            log.warning("[Re-plan] Limit of %d re-plans reached", MAX_REPLANS)
+            return
+        snapshot = self.snapshot()
+        if not snapshot["failed"]:
+            return
+        self.replan_count += 1
+        log.info("[Re-plan] Round %d: re-planning around tasks %s", self.replan_count, snapshot["failed"])
+        try:
+            commands = self.replanner(snapshot)
+            if commands:
+                self.splice_plan(commands, replaces=snapshot["failed"])
+        except Exception as e:
+            log.error("[Re-plan] Replanner failed: %s", e)
+
+    def _execute_pick(self, task, robot_id):
+        """
+        Pick with grasp verification and bounded retries.
+        The object pose is re-perceived before every attempt, since a failed
+        grasp may have pushed the object.
+        """
+        obj = task["object"]
+        obj_id = self.object_map[obj]
+        # Taking the object over from another robot's move
+        handoff = any(self.task_map.get(dep_id, {}).get("action") == "move"
+                      and self.task_map[dep_id]["object"] == obj
+                      for dep_id in self.dependency_map.get(task["id"], []))
+
+        for attempt in range(1, MAX_PICK_RETRIES + 2):
+            if attempt > 1:
+                self.metrics.task_retried(task["id"])
+            pos = robot_action.get_position(obj_id)
+            constraint = robot_action.pick(robot_id, obj_id, pos, handoff=handoff)
+            if constraint is not None:
+                return constraint
+            log.warning("    Pick attempt %d/%d failed for object: %s", attempt, MAX_PICK_RETRIES + 1, obj)
+
+        raise TaskExecutionError(task, f"pick {obj} failed after {MAX_PICK_RETRIES + 1} attempts")
 
     def _execute_task(self, task, constraint):
-        """Execute a single task"""
+        """
+        Execute a single task.
+
+        Returns:
+            Constraint ID for pick, None after place/move
+        Raises:
+            TaskExecutionError: if the task could not be carried out
+        """
         agent = task["agent"]
         action = task["action"]
         obj = task["object"]
         dest = task["destination"]
 
         if agent not in self.robot_ids:
-            return constraint
+            raise TaskExecutionError(task, f"unknown agent '{agent}'")
 
         robot_id = self.robot_ids[agent]
 
         try:
-            if action == "pick" and obj in self.object_map:
-                pos = robot_action.get_position(self.object_map[obj])
-                constraint = robot_action.pick(robot_id, self.object_map[obj], pos)
-                if constraint is None:
-                    print(f"    Pick action failed for object: {obj}")
-                return constraint
+            if action == "pick":
+                if obj not in self.object_map:
+                    raise TaskExecutionError(task, f"object '{obj}' not found")
+                return self._execute_pick(task, robot_id)
 
             elif action == "place":
+                if constraint is None:
+                    raise TaskExecutionError(task, f"{agent} is not holding {obj}")
                 if dest in self.object_map:
                     pos = robot_action.get_position(self.object_map[dest])
                 else:
@@ -338,26 +871,137 @@ class RobotExecutor:
                 return None
 
             elif action == "move":
+                if constraint is None:
+                    raise TaskExecutionError(task, f"{agent} is not holding {obj}")
                 handoff_label = f"{agent}to{dest}"
                 target_pos = self.get_transfer_position(handoff_label)
-                if constraint:
-                    robot_action.place(agent, target_pos, constraint, self.robot_ids)
-                    return None
+                robot_action.place(agent, target_pos, constraint, self.robot_ids)
+                return None
 
             elif action == "sweep":
-                if obj in self.object_map:
-                    obj_id = self.object_map[obj]
-                    robot_action.sweep(robot_id, obj_id, sweep_count=3)
-                else:
-                    print(f"  Object {obj} not found for sweeping.")
+                if obj not in self.object_map:
+                    raise TaskExecutionError(task, f"object '{obj}' not found for sweeping")
+                robot_action.sweep(robot_id, self.object_map[obj], sweep_count=3)
 
+        except TaskExecutionError:
+            raise
         except Exception as e:
-            print(f"Error executing {action} for {agent}: {e}")
+            raise TaskExecutionError(task, f"error executing {action} for {agent}: {e}") from e
 
         return constraint
 
 
-def run_from_json(json_file, robot_ids, object_map, transfer_positions=None):
-    executor = RobotExecutor(robot_ids, object_map, transfer_positions)
+def _start_trace(trace_file):
+    # Explicit trace file, else $EXECUTION_TRACE; returns (tracer, path) or (None, None)
+    trace_file = trace_file or os.environ.get(tracing.TRACE_ENV)
+    if not trace_file:
+        return None, None
+    return tracing.enable_tracing(), trace_file
+
+
+def _start_profile(profile_file):
+    # Explicit profile file, else $PRIMITIVE_PROFILE; returns (profiler, path) or (None, None)
+    profile_file = profile_file or os.environ.get(profiling.PROFILE_ENV)
+    if not profile_file:
+        return None, None
+    return profiling.enable_profiling(), profile_file
+
+
+def _executor(robot_ids, object_map, transfer_positions, replanner, seed):
+    # Deterministic mode when a seed is given or $DETERMINISTIC_SEED is set
+    if seed is None and os.environ.get(determinism.SEED_ENV):
+        seed = int(os.environ[determinism.SEED_ENV])
+    if seed is not None:
+        determinism.configure_physics(seed)
+        log.info("Deterministic run, seed %d", seed)
+    return RobotExecutor(robot_ids, object_map, transfer_positions, replanner, deterministic=seed is not None)
+
+
+def _start_replay_log(replay_file, plan_file, deterministic):
+    # Explicit replay log file, else $REPLAY_LOG; returns the path or None
+    replay_file = replay_file or os.environ.get(replay_log.REPLAY_LOG_ENV)
+    if replay_file:
+        replay_log.start_recording(meta={"plan": os.path.basename(plan_file), "deterministic": deterministic})
+    return replay_file
+
+
+def _finish_run(executor, tracer, trace_file, report_file, profiler=None, profile_file=None, replay_file=None):
+    # Utilization summary always; report file if given or $EXECUTION_REPORT is set
+    flush_log()
+    if replay_file:
+        replay_log.stop_recording(replay_file)
+    if tracer is not None:
+        tracer.export_chrome(trace_file)
+        tracer.print_summary()
+    if profiler is not None:
+        profiler.write(profile_file)
+        profiler.print_summary()
+    dependency_map = dict(executor.dependency_map)
+    executor.metrics.print_summary(dependency_map)
+    report_file = report_file or os.environ.get(REPORT_ENV)
+    if report_file:
+        executor.metrics.write(report_file, dependency_map)
+
+
+def run_from_json(json_file, robot_ids, object_map, transfer_positions=None, replanner=None,
+                  trace_file=None, report_file=None, profile_file=None, seed=None, replay_file=None,
+                  optimize=False):
+    tracer, trace_file = _start_trace(trace_file)
+    profiler, profile_file = _start_profile(profile_file)
+    executor = _executor(robot_ids, object_map, transfer_positions, replanner, seed)
+    executor.print_transfer_positions()
+    replay_file = _start_replay_log(replay_file, json_file, executor.deterministic)
+    try:
+        return executor.run_from_json(json_file, optimize)
+    finally:
+        _finish_run(executor, tracer, trace_file, report_file, profiler, profile_file, replay_file)
+
+
+def run_from_binary(plan_file, robot_ids, object_map, transfer_positions=None, replanner=None,
+                    trace_file=None, report_file=None, profile_file=None, seed=None, replay_file=None):
+    tracer, trace_file = _start_trace(trace_file)
+    profiler, profile_file = _start_profile(profile_file)
+    executor = _executor(robot_ids, object_map, transfer_positions, replanner, seed)
+    executor.print_transfer_positions()
+    replay_file = _start_replay_log(replay_file, plan_file, executor.deterministic)
+    try:
+        return executor.run_from_binary(plan_file)
+    finally:
+        _finish_run(executor, tracer, trace_file, report_file, profiler, profile_file, replay_file)
+
+
+def run_commands(commands, robot_ids, object_map, transfer_positions=None, replanner=None,
+                 trace_file=None, report_file=None, profile_file=None, seed=None, replay_file=None,
+                 optimize=False):
+    """Execute a command list (export_json format), e.g. a plan from a planner backend"""
+    tracer, trace_file = _start_trace(trace_file)
+    profiler, profile_file = _start_profile(profile_file)
+    executor = _executor(robot_ids, object_map, transfer_positions, replanner, seed)
+    executor.print_transfer_positions()
+    replay_file = _start_replay_log(replay_file, "commands", executor.deterministic)
+    try:
+        if optimize:
+            commands = executor.optimize_commands(commands)
+        return executor.run_commands(commands)
+    finally:
+        _finish_run(executor, tracer, trace_file, report_file, profiler, profile_file, replay_file)
+
+
+def run_stream(command_stream, robot_ids, object_map, transfer_positions=None, replanner=None,
+               trace_file=None, report_file=None, profile_file=None, seed=None, replay_file=None):
+    """
+    Execute commands while the plan is still being generated (RobotExecutor.run_stream).
+
+    Args:
+        command_stream: Iterable of command dicts, e.g.
+            graph_command.stream_commands(backend.stream(prompt))
+    """
+    tracer, trace_file = _start_trace(trace_file)
+    profiler, profile_file = _start_profile(profile_file)
+    executor = _executor(robot_ids, object_map, transfer_positions, replanner, seed)
     executor.print_transfer_positions()
-    executor.run_from_json(json_file)
\ No newline at end of file
+    replay_file = _start_replay_log(replay_file, "stream", executor.deterministic)
+    try:
+        return executor.run_stream(command_stream)
+    finally:
+        _finish_run(executor, tracer, trace_file, report_file, profiler, profile_file, replay_file)
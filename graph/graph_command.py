@@ -3,11 +3,25 @@ Task Processor Module
 Processes LLM output into structured task graph for robot execution.
 """
 
-from collections import defaultdict, deque
+import argparse
+import importlib
 import json
-import re
-from AI_module.call_gemini_test_truth import call_gemini_4, call_gemini_1, call_gemini_2, call_gemini_3, call_gemini_5  # Groundtruth
-from AI_module.LLM import call_gemini  # Call real LLM
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from graph import plan_format
+from AI_module.plan_parser import TaskRecord, as_records, make_record, handoff_agents
+from AI_module.planner_backend import load_backend  # Gemini, ground truth, replay or local HTTP
+from AI_module.process_prompt import Environment, PromptBuilder, agent_config_for, build_prompt
+from graph.execute_command import run_commands, run_stream
+from graph.plan_optimizer import optimize_plan, print_optimization_report
+from robot.handoff_points import handoff_points_for_environment
+from robot.reachability import scene_positions
+from telemetry.log import get_logger
+
+log = get_logger("graph")
 
 
 class TaskProcessor:
@@ -21,17 +35,22 @@ class TaskProcessor:
     - Exporting to JSON for RobotExecutor
     """
     
-    def __init__(self, task_plan):
+    def __init__(self, task_plan, streaming=False, verbose=True):
         """
         Initialize processor with task plan from LLM.
         
         Args:
-            task_plan: List of tuples [(agent, action, dependencies), ...]
+            task_plan: List of TaskRecords from plan_parser.parse_plan, or
+                tuples [(agent, action, dependencies), ...]
+            streaming: Allow an empty initial plan; tasks are then added one by
+                one with add_task() as the LLM response streams in
+            verbose: Print each task as it is processed
         """
-        if not task_plan:
+        if not task_plan and not streaming:
             raise ValueError("task_plan cannot be empty")
 
-        self.task_plan = task_plan
+        self.task_plan = as_records(task_plan)
+        self.verbose = verbose
         self.tasks = {}           # Task ID -> task details
         self.edges = []           # Dependency edges [(from_id, to_id), ...]
         self.robots = set()       # Set of robot agents
@@ -41,127 +60,67 @@ class TaskProcessor:
         self._process_tasks()
 
     def _discover_agents(self):
-        handoff_pattern = re.compile(r'^(robot\d+)to(robot\d+)$')
-
-        for agent, _, _ in self.task_plan:
-            match = handoff_pattern.match(agent)
-            if match:
-                self.handoff_agents.add(agent)
-                self.robots.add(match.group(1))
-                self.robots.add(match.group(2))
-            elif agent.startswith('robot'):
-                self.robots.add(agent)
-
-    def _get_handoff_target(self, handoff_agent):
-        match = re.match(r'^robot\d+to(robot\d+)$', handoff_agent)
-        return match.group(1) if match else None
-
-    def _get_handoff_source(self, handoff_agent):
-        match = re.match(r'^(robot\d+)torobot\d+$', handoff_agent)
-        return match.group(1) if match else None
-
-    def _parse_dependencies(self, dep_str):
-        """
-        Parse dependency string like 'node[1]', 'node[3,6]', or 'node[]'
-        Returns: list of node IDs
-        """
-        if not dep_str or dep_str == "node[]":
-            return []
-
-        # Extract numbers from node[...]
-        match = re.search(r'node\[([\d,\s]+)\]', dep_str)
-        if match:
-            nums_str = match.group(1)
-            return [int(x.strip()) for x in nums_str.split(',') if x.strip()]
-        return []
+        for record in self.task_plan:
+            self._register_agent(record.agent)
+
+    def _register_agent(self, agent):
+        source, target = handoff_agents(agent)
+        if source:
+            self.handoff_agents.add(agent)
+            self.robots.add(source)
+            self.robots.add(target)
+        elif agent.startswith('robot'):
+            self.robots.add(agent)
 
     def _process_tasks(self):
         """
         Process task plan and build task graph with dependencies.
         Creates tasks dict and dependency edges from LLM output.
         """
-        for i, (agent, action, dependencies) in enumerate(self.task_plan, start=1):
-            obj = self._extract_object(action)
-
-            # Store task details with dependency string for JSON export
-            self.tasks[i] = {
-                "agent": agent,
-                "action": action,
-                "object": obj,
-                "dependencies": dependencies  # Original dependency string from LLM
-            }
-
-            # Build dependency edges from LLM dependency format
-            dep_nodes = self._parse_dependencies(dependencies)
-            for dep_node in dep_nodes:
-                self.edges.append((dep_node, i))  # Edge: dep_node -> current task
-
-            print(f"Task {i}: {agent} | {action} | deps: {dep_nodes}")
-
-    def _extract_object(self, action):
-        action = action.lower().strip()
-
-        if action.startswith("pick "):
-            return action.split("pick ")[1].strip()
-
-        elif action.startswith("move "):
-            return action.split("move ")[1].split(" to ")[0].strip()
-
-        elif action.startswith("place "):
-            if " into " in action:
-                return action.split("place ")[1].split(" into ")[0].strip()
-            elif " in " in action:
-                return action.split("place ")[1].split(" in ")[0].strip()
-            elif " on " in action:
-                return action.split("place ")[1].split(" on ")[0].strip()
-            else:
-                return action.split("place ")[1].strip()
-
-        elif action.startswith("sweep "):
-            return action[6:].strip() if len(action) > 6 else ""
-
-        return ""
-
-    def parse_action(self, action):
-        action = action.lower().strip()
-
-        if action.startswith("pick "):
-            return "pick", action[5:].strip(), ""
-
-        elif action.startswith("place "):
-            # Split based on common prepositions
-            if " into " in action:
-                parts = action[6:].split(" into ", 1)
-            elif " in " in action:
-                parts = action[6:].split(" in ", 1)
-            elif " on " in action:
-                parts = action[6:].split(" on ", 1)
-            elif " onto " in action:
-                parts = action[6:].split(" onto ", 1)
-            else:
-                parts = [action[6:], ""]
-
-            obj = parts[0].strip()
-            raw_dest = parts[1].strip() if len(parts) > 1 else ""
-            dest = raw_dest.split()[-1] if raw_dest else ""
-
-            return "place", obj, dest
-
-        elif action.startswith("move "):
-            parts = action[5:].split(" to ", 1)
-            obj = parts[0].strip()
-            raw_dest = parts[1].strip() if len(parts) > 1 else ""
-            dest = raw_dest.split()[-1] if raw_dest else ""
-
-            return "move", obj, dest
-
-        elif action.startswith("sweep "):
-            obj = action[6:].strip() if len(action) > 6 else ""
-            return "sweep", obj, ""
-
-        return "unknown", action, ""
-
-    def export_json(self, filename="commands_task1.json"):
+        for record in self.task_plan:
+            self._store_task(record.index, record)  # Step ID from the parser (skipped tuples leave gaps)
+
+    def _store_task(self, task_id, record):
+        # The parser already split the action and the dependency string; export reuses them
+        self.tasks[task_id] = {
+            "agent": record.agent,
+            "action": record.action,
+            "verb": record.verb,
+            "object": record.object,
+            "destination": record.destination,
+            "dependencies": record.node  # Original dependency string from LLM
+        }
+
+        # Build dependency edges from LLM dependency format
+        for dep_node in record.dependencies:
+            self.edges.append((dep_node, task_id))  # Edge: dep_node -> current task
+
+        if self.verbose:
+            log.info("Task %d: %s | %s | deps: %s", task_id, record.agent, record.action, list(record.dependencies))
+
+    def add_task(self, agent, action, dependencies):
+        """
+        Append one (agent, action, dependencies) task after the last step.
+
+        Returns:
+            Command dict in export_json format, ready for RobotExecutor.add_task
+        """
+        last = self.task_plan[-1].index if self.task_plan else 0
+        return self.add_record(make_record(last + 1, agent, action, dependencies))
+
+    def add_record(self, record):
+        """
+        Append one parsed TaskRecord (e.g. from a streamed LLM response), keeping its step ID.
+
+        Returns:
+            Command dict in export_json format, ready for RobotExecutor.add_task
+        """
+        self.task_plan.append(record)
+        self._register_agent(record.agent)
+        self._store_task(record.index, record)
+        return self._to_command(record.index)
+
+    def export_json(self, filename="commands_task1.json", commands=None):
         """
         Export processed tasks to JSON file for RobotExecutor.
         
@@ -178,46 +137,164 @@ class TaskProcessor:
         
         Args:
             filename: Output JSON filename
+            commands: Command list to write instead of the processed tasks
+                (e.g. after graph/plan_optimizer.py)
         """
-        commands = []
-        for task_id in sorted(self.tasks.keys()):
-            task = self.tasks[task_id]
-            agent = task["agent"]
-
-            # Handle handoff operations (e.g., "robot1torobot2")
-            if agent in self.handoff_agents:
-                source_agent = self._get_handoff_source(agent)
-                dest_agent = self._get_handoff_target(agent)
-                lane = "transfer"
-            else:
-                source_agent = agent
-                dest_agent = ""
-                lane = agent
-
-            # Parse action string into verb, object, destination
-            verb, obj, dest = self.parse_action(task["action"])
-
-            # For move action during handoff, destination is the receiving robot
-            if verb == "move" and agent in self.handoff_agents:
-                dest = dest_agent
-
-            commands.append({
-                "id": task_id,
-                "agent": source_agent,
-                "action": verb,
-                "object": obj.replace(" ", "_") if obj else "",
-                "destination": dest.replace(" ", "_") if dest else "",
-                "lane": lane,
-                "node": task["dependencies"]  # Dependency string for executor
-            })
+        if commands is None:
+            commands = self.to_commands()
 
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(commands, f, indent=2, ensure_ascii=False)
 
-        print(f"Exported {len(commands)} commands to {filename}")
+        log.info("Exported %d commands to %s", len(commands), filename)
+
+    def export_binary(self, filename="commands_task1.plan", commands=None):
+        """
+        Export processed tasks in the compact binary plan format
+        (see graph/plan_format.py), for RobotExecutor.run_from_binary.
+
+        Args:
+            filename: Output plan filename
+            commands: Command list to write instead of the processed tasks
+        """
+        if commands is None:
+            commands = self.to_commands()
+        size = plan_format.write_plan(commands, filename)
+        log.info("Exported %d commands to %s (%d bytes)", len(commands), filename, size)
+
+    def to_commands(self):
+        """Return processed tasks as a list of command dicts (export_json format)"""
+        return [self._to_command(task_id) for task_id in sorted(self.tasks.keys())]
+
+    def _to_command(self, task_id):
+        task = self.tasks[task_id]
+        agent = task["agent"]
+
+        # Handle handoff operations (e.g., "robot1torobot2")
+        if agent in self.handoff_agents:
+            source_agent, dest_agent = handoff_agents(agent)
+            lane = "transfer"
+        else:
+            source_agent = agent
+            dest_agent = ""
+            lane = agent
+
+        verb, obj, dest = task["verb"], task["object"], task["destination"]
+
+        # For move action during handoff, destination is the receiving robot
+        if verb == "move" and agent in self.handoff_agents:
+            dest = dest_agent
+
+        return {
+            "id": task_id,
+            "agent": source_agent,
+            "action": verb,
+            "object": obj.replace(" ", "_") if obj else "",
+            "destination": dest.replace(" ", "_") if dest else "",
+            "lane": lane,
+            "node": task["dependencies"]  # Dependency string for executor
+        }
+
+
+def stream_commands(task_stream):
+    """
+    Turn a stream of TaskRecords (or (agent, action, dependencies) tuples) into
+    executor commands, one command per task as soon as its tuple arrives.
+
+    Usage:
+        executor.run_stream(stream_commands(stream_plan(prompt)))
+    """
+    processor = TaskProcessor([], streaming=True)
+    for task in task_stream:
+        if isinstance(task, TaskRecord):
+            yield processor.add_record(task)
+        else:
+            yield processor.add_task(*task)
+
+
+def task_arguments(description, goal):
+    """
+    Command-line options of the TaskN/main.py entry points.
+
+    Args:
+        description: Parser description
+        goal: Default task goal for planning prompts
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--backend", default=None,
+                        help="Plan with this planner backend (e.g. gemini, heuristic:1, "
+                             "http://127.0.0.1:8765/generate) instead of running the ground-truth command file")
+    parser.add_argument("--goal", default=goal, help=f"Task goal of the planning prompt (default: '{goal}')")
+    parser.add_argument("--stream", action="store_true",
+                        help="With --backend: execute each task as soon as the LLM has generated it")
+    parser.add_argument("--replan", default=None, metavar="BACKEND",
+                        help="Re-plan failed tasks with this planner backend (graph/replan.py), e.g. gemini")
+    return parser
+
+
+def plan_and_run(backend, env, robot_ids, object_map, goal, stream=False, replanner=None, optimize=True):
+    """
+    Plan a goal for a task scene with a planner backend and execute the plan.
+
+    Args:
+        backend: PlannerBackend (load_backend)
+        env: Task Environment, already set up in the running simulation
+        robot_ids, object_map: Robots and objects of the simulation
+        goal: Task goal for the prompt
+        stream: Start executing while the plan is still being generated
+            (RobotExecutor.run_stream); otherwise the whole plan is generated,
+            optimized (graph/plan_optimizer.py) and then executed
+        replanner: Optional callable snapshot -> commands (graph/replan.py)
+        optimize: Optimize a non-streamed plan before running it
+
+    Returns:
+        True if every task completed
+    """
+    prompt = None
+    if backend.needs_prompt:
+        scene = type(env)()  # Object positions as loaded, not body IDs
+        prompt = PromptBuilder(agent_config_for(scene), env=scene).build_prompt(goal)
+    transfer_positions = handoff_points_for_environment(env)
+    if stream:
+        return run_stream(stream_commands(backend.stream(prompt)), robot_ids, object_map,
+                          transfer_positions, replanner)
+    commands = TaskProcessor(backend.plan(prompt)).to_commands()
+    return run_commands(commands, robot_ids, object_map, transfer_positions, replanner, optimize=optimize)
 
 
 if __name__ == "__main__":
-    task_plan = call_gemini() #Define which function to call for groundtruth or LLM
+    parser = argparse.ArgumentParser(description="Generate the command file for a task plan")
+    parser.add_argument("--backend", default=None,
+                        help="Planner backend spec, e.g. gemini, truth:4, replay:.llm_cache, "
+                             "http://127.0.0.1:8765/generate or a JSON config file "
+                             "(default: $PLANNER_BACKEND, else gemini)")
+    parser.add_argument("--output", default="commands_task_4.json", help="Command JSON file")
+    parser.add_argument("--binary", help="Also write the binary plan format to this file")
+    parser.add_argument("--no-optimize", action="store_true",
+                        help="Write the plan as parsed, without graph/plan_optimizer.py")
+    parser.add_argument("--samples", type=int, default=1,
+                        help="Sample this many candidate plans concurrently and keep the best "
+                             "(graph/plan_sampler.py); needs a backend that generates with a model")
+    args = parser.parse_args()
+
+    backend = load_backend(args.backend)
+    if args.samples > 1:
+        if backend.model is None:
+            parser.error(f"--samples needs a backend that generates with a model, not {backend.describe()}")
+        from graph.plan_sampler import select_best_plan  # plan_sampler imports TaskProcessor from here
+        best = select_best_plan(build_prompt(), k=args.samples, model=backend.model,
+                                cache=getattr(backend, "cache", None))
+        task_plan = best.task_plan
+    else:
+        task_plan = backend.plan()
     processor = TaskProcessor(task_plan)
-    processor.export_json("commands_task_4.json")
\ No newline at end of file
+    commands = processor.to_commands()
+    if not args.no_optimize:
+        # Scene of the backend's task, else the one process_prompt builds prompts for
+        task = getattr(backend, "task", None)
+        env = importlib.import_module(f"Task{task}.environment").Environment() if task else Environment()
+        commands, report = optimize_plan(commands, *scene_positions(env))
+        print_optimization_report(report)
+    processor.export_json(args.output, commands)
+    if args.binary:
+        processor.export_binary(args.binary, commands)
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+Plan Analysis Module
+Cheap static checks and timing estimates for command lists (export_json format),
+used to compare plans without running a simulation.
+"""
+
+from collections import defaultdict, deque
+
+# Approximate simulation steps per primitive (see robot/robot_action.py)
+ACTION_DURATIONS = {
+    "pick": 370,    # home 200 + approach 50 + grasp 50 + gripper 20 + lift 50
+    "place": 290,   # above 50 + lower 50 + release 20 + lift 50 + home 70 + settle 50
+    "move": 290,    # same motion as place, at the handoff point
+    "sweep": 940,
+}
+DEFAULT_DURATION = 300
+SIM_TIME_STEP = 1.0 / 240.0  # PyBullet default time step (seconds)
+
+
+def parse_node(node_str):
+    """Parse 'node[1, 3]' into [1, 3]"""
+    if not node_str or "[" not in node_str:
+        return []
+    inner = node_str[node_str.index("[") + 1:node_str.rindex("]")] if "]" in node_str else ""
+    return [int(d) for d in inner.replace(" ", "").split(",") if d.strip().isdigit()]
+
+
+def dependency_map(commands):
+    """Task ID -> list of dependency IDs"""
+    return {cmd["id"]: parse_node(cmd.get("node", "node[]")) for cmd in commands}
+
+
+def topological_order(commands):
+    """
+    Return task IDs in dependency order, or None if the plan has a cycle.
+    Unknown dependency IDs are ignored here (verify_plan reports them).
+    """
+    deps = dependency_map(commands)
+    children = defaultdict(list)
+    indegree = {task_id: 0 for task_id in deps}
+    for task_id, dep_ids in deps.items():
+        for dep_id in dep_ids:
+            if dep_id in indegree:
+                children[dep_id].append(task_id)
+                indegree[task_id] += 1
+
+    queue = deque(sorted(task_id for task_id, degree in indegree.items() if degree == 0))
+    order = []
+    while queue:
+        task_id = queue.popleft()
+        order.append(task_id)
+        for child_id in children[task_id]:
+            indegree[child_id] -= 1
+            if indegree[child_id] == 0:
+                queue.append(child_id)
+
+    return order if len(order) == len(indegree) else None
+
+
+def ancestors(commands):
+    """Task ID -> set of all (transitive) dependency IDs"""
+    deps = dependency_map(commands)
+    order = topological_order(commands)
+    if order is None:
+        raise ValueError("Plan contains a dependency cycle")
+
+    result = {}
+    for task_id in order:
+        acc = set()
+        for dep_id in deps[task_id]:
+            if dep_id in result:
+                acc.add(dep_id)
+                acc |= result[dep_id]
+        result[task_id] = acc
+    return result
+
+
+def verify_plan(commands, agents=None):
+    """
+    Static plan verifier.
+
+    Checks:
+    - Dependency IDs exist and the graph is acyclic
+    - Every place/move is preceded (as an ancestor) by a pick of the same
+      object by the same agent
+    - Every handoff move targets a known agent, and the receiving pick
+      depends on the move
+    - Actions and agents are known
+
+    Args:
+        commands: List of command dicts
+        agents: Known agent names (optional)
+
+    Returns:
+        List of issue strings (empty if the plan looks valid)
+    """
+    issues = []
+    task_map = {}
+    for cmd in commands:
+        if cmd["id"] in task_map:
+            issues.append(f"Task {cmd['id']}: duplicate ID")
+        task_map[cmd["id"]] = cmd
+
+    for task_id, dep_ids in dependency_map(commands).items():
+        for dep_id in dep_ids:
+            if dep_id not in task_map:
+                issues.append(f"Task {task_id}: unknown dependency {dep_id}")
+            elif dep_id == task_id:
+                issues.append(f"Task {task_id}: depends on itself")
+
+    if topological_order(commands) is None:
+        issues.append("Plan contains a dependency cycle")
+        return issues
+    task_ancestors = ancestors(commands)
+
+    for task_id, cmd in task_map.items():
+        action, agent, obj = cmd["action"], cmd["agent"], cmd["object"]
+
+        if action not in ACTION_DURATIONS:
+            issues.append(f"Task {task_id}: unknown action '{action}'")
+        if agents is not None and agent not in agents:
+            issues.append(f"Task {task_id}: unknown agent '{agent}'")
+
+        if action in ("place", "move"):
+            has_pick = any(
+                task_map[a]["action"] == "pick" and task_map[a]["agent"] == agent and task_map[a]["object"] == obj
+                for a in task_ancestors[task_id]
+            )
+            if not has_pick:
+                issues.append(f"Task {task_id}: {action} {obj} by {agent} has no preceding pick")
+
+        if action == "move":
+            receiver = cmd["destination"]
+            if agents is not None and receiver not in agents:
+                issues.append(f"Task {task_id}: handoff to unknown agent '{receiver}'")
+            received = any(
+                other["action"] == "pick" and other["agent"] == receiver and other["object"] == obj
+                and task_id in task_ancestors[other_id]
+                for other_id, other in task_map.items()
+            )
+            if not received:
+                issues.append(f"Task {task_id}: no pick of {obj} by {receiver} depends on this handoff")
+
+    return issues
+
+
+def task_duration(cmd, durations=None):
+    durations = durations or ACTION_DURATIONS
+    return durations.get(cmd["action"], DEFAULT_DURATION)
+
+
+def critical_path_length(commands, durations=None):
+    """Longest dependency chain, in simulation steps (ignores agent contention)"""
+    task_map = {cmd["id"]: cmd for cmd in commands}
+    deps = dependency_map(commands)
+    order = topological_order(commands)
+    if order is None:
+        return float("inf")
+
+    finish = {}
+    for task_id in order:
+        start = max((finish[d] for d in deps[task_id] if d in finish), default=0)
+        finish[task_id] = start + task_duration(task_map[task_id], durations)
+    return max(finish.values(), default=0)
+
+
+def estimate_schedule(commands, durations=None):
+    """
+    Simulate RobotExecutor with a list-scheduling model: each agent runs its
+    tasks one at a time in pool (ID) order, a task starts once its
+    dependencies finished, and an agent holding an object cannot pick.
+
+    Returns:
+        Dict task ID -> estimated finish (simulation steps), or None if the
+        plan cannot finish (cycle, missing dependency or holding deadlock)
+    """
+    task_map = {cmd["id"]: cmd for cmd in commands}
+    deps = dependency_map(commands)
+    if topological_order(commands) is None:
+        return None
+
+    agents = sorted({cmd["agent"] for cmd in commands})
+    pending = {agent: sorted(t for t, cmd in task_map.items() if cmd["agent"] == agent) for agent in agents}
+    agent_free = {agent: 0 for agent in agents}
+    holding = {agent: False for agent in agents}
+    finish = {}
+
+    while any(pending.values()):
+        best = None
+        for agent in agents:
+            ready = {}
+            for task_id in pending[agent]:
+                cmd = task_map[task_id]
+                if cmd["action"] == "pick" and holding[agent]:
+                    continue
+                if any(d not in finish for d in deps[task_id]):
+                    continue
+                ready[task_id] = max([agent_free[agent]] + [finish[d] for d in deps[task_id]])
+            if not ready:
+                continue
+            # Executor takes the first task in pool order whose dependencies are done
+            # when it next looks, not a task still waiting on a running one
+            start = min(ready.values())
+            task_id = next(t for t in pending[agent] if ready.get(t, float("inf")) <= start)
+            if best is None or (start, task_id) < best[:2]:
+                best = (start, task_id, agent)
+        if best is None:
+            return None
+
+        start, task_id, agent = best
+        cmd = task_map[task_id]
+        finish[task_id] = start + task_duration(cmd, durations)
+        agent_free[agent] = finish[task_id]
+        pending[agent].remove(task_id)
+        if cmd["action"] == "pick":
+            holding[agent] = True
+        elif cmd["action"] in ("place", "move"):
+            holding[agent] = False
+
+    return finish
+
+
+def estimate_makespan(commands, durations=None):
+    """
+    Estimate plan makespan (simulation steps) with estimate_schedule.
+
+    Returns:
+        Makespan in simulation steps, or inf if the plan cannot finish
+    """
+    finish = estimate_schedule(commands, durations)
+    if finish is None:
+        return float("inf")
+    return max(finish.values(), default=0)
+
+
+def handoff_finish(commands, durations=None):
+    """
+    Estimated finish (simulation steps) of the last handoff move: the point
+    after which no robot waits on an object from another one. 0 without
+    handoffs, inf if the plan cannot finish.
+    """
+    finish = estimate_schedule(commands, durations)
+    if finish is None:
+        return float("inf")
+    return max((finish[cmd["id"]] for cmd in commands if cmd["action"] == "move"), default=0)
+
+
+def handoff_count(commands):
+    return sum(1 for cmd in commands if cmd["action"] == "move")
@@ -0,0 +1,303 @@
+"""
+Plan Evaluation Module
+Compares LLM plans with the hand-written ground truth (call_gemini_1..5)
+using DAG-level metrics, over large batches of cached or stubbed responses.
+
+Usage:
+    # Cached responses (LLMCache directory) scored against the Task 1 plan
+    python graph/plan_eval.py --truth 1 --cache-dir .llm_cache
+
+    # Raw response files
+    python graph/plan_eval.py --truth 2 --responses run1.txt run2.txt
+
+    # 500 perturbed stub responses per ground-truth plan, 8 processes
+    python graph/plan_eval.py --stub 500 --workers 8
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.call_gemini_test_truth import GROUND_TRUTH
+from AI_module.plan_parser import parse_plan
+from AI_module.stub_model import plan_to_text
+from graph.graph_command import TaskProcessor
+from graph.plan_analysis import (dependency_map, ancestors, verify_plan, critical_path_length,
+                                 estimate_makespan, handoff_count)
+
+# Metrics averaged by summarize()
+SUMMARY_METRICS = ("action_precision", "action_recall", "action_f1",
+                   "dep_precision", "dep_recall", "order_precision", "order_recall",
+                   "handoff_error", "critical_path_ratio")
+
+
+def to_commands(plan):
+    """
+    Normalize a plan into command dicts (export_json format).
+
+    Args:
+        plan: Raw LLM response text, list of TaskRecords or (agent, action,
+            node) tuples, or list of command dicts
+    """
+    if isinstance(plan, str):
+        plan = parse_plan(plan)
+    if not plan:
+        return []
+    if isinstance(plan[0], dict):
+        return list(plan)
+    return TaskProcessor(plan, verbose=False).to_commands()
+
+
+def action_keys(commands):
+    """
+    Task ID -> canonical action key (agent, action, object, destination, n),
+    where n counts earlier identical actions, so keys are unique and
+    comparable across plans with different task numbering.
+    """
+    seen = Counter()
+    keys = {}
+    for cmd in sorted(commands, key=lambda c: c["id"]):
+        action = (cmd["agent"], cmd["action"], cmd["object"], cmd["destination"])
+        keys[cmd["id"]] = action + (seen[action],)
+        seen[action] += 1
+    return keys
+
+
+def _dependency_edges(commands, keys):
+    return {(keys[dep_id], keys[task_id])
+            for task_id, dep_ids in dependency_map(commands).items()
+            for dep_id in dep_ids if dep_id in keys}
+
+
+def _ordering_edges(commands, keys):
+    """All (transitive) ordering constraints as key pairs"""
+    try:
+        task_ancestors = ancestors(commands)
+    except ValueError:  # Cycle
+        return _dependency_edges(commands, keys)
+    return {(keys[a], keys[task_id]) for task_id, acc in task_ancestors.items() for a in acc}
+
+
+def _precision_recall(predicted, truth):
+    matched = len(predicted & truth)
+    precision = matched / len(predicted) if predicted else float(not truth)
+    recall = matched / len(truth) if truth else 1.0
+    return precision, recall
+
+
+def evaluate_plan(predicted, truth):
+    """
+    Compare a plan with a ground-truth plan.
+
+    Args:
+        predicted: Plan to score (see to_commands for accepted forms)
+        truth: Ground-truth plan (same forms)
+
+    Returns:
+        Dict of metrics:
+        - action_precision / action_recall / action_f1 / exact_actions:
+          match of the canonical action sets
+        - dep_precision / dep_recall: direct node[...] edges between matched actions
+        - order_precision / order_recall: transitive ordering constraints
+          (insensitive to redundant or re-routed edges)
+        - handoffs / truth_handoffs / handoff_error
+        - critical_path / truth_critical_path / critical_path_ratio (sim steps)
+        - makespan / truth_makespan: list-scheduling estimate (sim steps)
+        - issues: static verifier issue count for the predicted plan
+    """
+    pred_cmds = to_commands(predicted)
+    truth_cmds = to_commands(truth)
+    pred_keys, truth_keys = action_keys(pred_cmds), action_keys(truth_cmds)
+
+    pred_actions, truth_actions = set(pred_keys.values()), set(truth_keys.values())
+    action_p, action_r = _precision_recall(pred_actions, truth_actions)
+    dep_p, dep_r = _precision_recall(_dependency_edges(pred_cmds, pred_keys),
+                                     _dependency_edges(truth_cmds, truth_keys))
+    order_p, order_r = _precision_recall(_ordering_edges(pred_cmds, pred_keys),
+                                         _ordering_edges(truth_cmds, truth_keys))
+
+    critical_path = critical_path_length(pred_cmds) if pred_cmds else float("inf")
+    truth_critical_path = critical_path_length(truth_cmds)
+
+    return {
+        "tasks": len(pred_cmds),
+        "truth_tasks": len(truth_cmds),
+        "action_precision": action_p,
+        "action_recall": action_r,
+        "action_f1": 2 * action_p * action_r / (action_p + action_r) if action_p + action_r else 0.0,
+        "exact_actions": pred_actions == truth_actions,
+        "dep_precision": dep_p,
+        "dep_recall": dep_r,
+        "order_precision": order_p,
+        "order_recall": order_r,
+        "handoffs": handoff_count(pred_cmds),
+        "truth_handoffs": handoff_count(truth_cmds),
+        "handoff_error": abs(handoff_count(pred_cmds) - handoff_count(truth_cmds)),
+        "critical_path": critical_path,
+        "truth_critical_path": truth_critical_path,
+        "critical_path_ratio": critical_path / truth_critical_path if truth_critical_path else float("inf"),
+        "makespan": estimate_makespan(pred_cmds) if pred_cmds else float("inf"),
+        "truth_makespan": estimate_makespan(truth_cmds),
+        "issues": len(verify_plan(pred_cmds)) if pred_cmds else 0,
+    }
+
+
+def _evaluate_case(case):
+    """Process pool entry point: case = (name, truth_id, response_text)"""
+    name, truth_id, response_text = case
+    try:
+        result = evaluate_plan(response_text, GROUND_TRUTH[truth_id]())
+        result["error"] = None if result["tasks"] else "no tasks parsed"
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    result["name"] = name
+    result["truth"] = truth_id
+    return result
+
+
+def evaluate_batch(cases, max_workers=None, chunksize=16):
+    """
+    Score many responses in parallel.
+
+    Args:
+        cases: Iterable of (name, truth_id, response_text)
+        max_workers: Worker processes (default: CPU count; 1 runs in-process)
+        chunksize: Cases sent to a worker at a time
+
+    Returns:
+        List of metric dicts (see evaluate_plan) with name, truth and error keys
+    """
+    cases = list(cases)
+    if max_workers == 1 or len(cases) <= 1:
+        return [_evaluate_case(case) for case in cases]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_evaluate_case, cases, chunksize=chunksize))
+
+
+def summarize(results):
+    """Aggregate batch results per ground-truth task and overall"""
+    groups = {}
+    for result in results:
+        groups.setdefault(result["truth"], []).append(result)
+    groups["all"] = list(results)
+
+    summary = {}
+    for group, members in groups.items():
+        ok = [r for r in members if r["error"] is None]
+        entry = {
+            "cases": len(members),
+            "errors": len(members) - len(ok),
+            "exact_actions": sum(r["exact_actions"] for r in ok) / len(ok) if ok else 0.0,
+        }
+        for metric in SUMMARY_METRICS:
+            values = [r[metric] for r in ok if r[metric] != float("inf")]
+            entry[metric] = sum(values) / len(values) if values else float("nan")
+        summary[group] = entry
+    return summary
+
+
+def print_report(summary):
+    print("\n" + "=" * 96)
+    print(" PLAN EVALUATION vs GROUND TRUTH")
+    print("=" * 96)
+    print(f"  {'truth':>5} {'cases':>6} {'err':>4} | {'exact':>6} {'act F1':>6} "
+          f"{'dep P':>6} {'dep R':>6} {'ord P':>6} {'ord R':>6} | {'handoff err':>11} {'CP ratio':>8}")
+    for group, s in sorted(summary.items(), key=lambda item: (item[0] == "all", str(item[0]))):
+        print(f"  {group:>5} {s['cases']:>6} {s['errors']:>4} | {s['exact_actions']:>6.1%} {s['action_f1']:>6.3f} "
+              f"{s['dep_precision']:>6.3f} {s['dep_recall']:>6.3f} {s['order_precision']:>6.3f} {s['order_recall']:>6.3f} | "
+              f"{s['handoff_error']:>11.2f} {s['critical_path_ratio']:>8.2f}")
+    print("=" * 96 + "\n")
+
+
+def load_responses(paths):
+    """Yield (name, response_text) from raw text files or LLMCache entry files"""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        if path.endswith(".json"):
+            text = json.loads(text)["response"]
+        yield os.path.basename(path), text
+
+
+def load_cached_responses(cache_dir):
+    """Yield (name, response_text) for every entry of an LLMCache directory"""
+    paths = [os.path.join(root, name)
+             for root, _, files in os.walk(cache_dir) for name in files if name.endswith(".json")]
+    return load_responses(sorted(paths))
+
+
+def perturb_plan(task_plan, rng):
+    """
+    Stub LLM output: the ground-truth plan with one random, plausible mistake
+    (or none), rendered as response text.
+    """
+    plan = [list(task) for task in task_plan]
+    kind = rng.choice(["none", "drop_dependency", "extra_dependency", "swap_agent", "drop_last", "duplicate"])
+    with_deps = [i for i, (_, _, node) in enumerate(plan) if node != "node[]"]
+
+    if kind == "drop_dependency" and with_deps:
+        plan[rng.choice(with_deps)][2] = "node[]"
+    elif kind == "extra_dependency" and len(plan) > 2:
+        i = rng.randrange(2, len(plan))
+        deps = [d for d in plan[i][2][5:-1].replace(" ", "").split(",") if d]
+        deps.append(str(rng.randrange(1, i + 1)))
+        plan[i][2] = f"node[{','.join(dict.fromkeys(deps))}]"
+    elif kind == "swap_agent":
+        robots = sorted({agent for agent, _, _ in plan if "to" not in agent})
+        singles = [i for i, (agent, _, _) in enumerate(plan) if "to" not in agent]
+        if len(robots) > 1 and singles:
+            i = rng.choice(singles)
+            plan[i][0] = rng.choice([r for r in robots if r != plan[i][0]])
+    elif kind == "drop_last":
+        plan.pop()
+    elif kind == "duplicate":
+        i = rng.randrange(len(plan))
+        plan.append([plan[i][0], plan[i][1], f"node[{len(plan)}]"])
+    return plan_to_text([tuple(task) for task in plan])
+
+
+def stub_cases(truth_ids, count, seed=0):
+    """count perturbed stub responses per ground-truth plan"""
+    rng = random.Random(seed)
+    for truth_id in truth_ids:
+        task_plan = GROUND_TRUTH[truth_id]()
+        for i in range(count):
+            yield f"stub_{truth_id}_{i}", truth_id, perturb_plan(task_plan, rng)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score LLM plans against the ground-truth plans")
+    parser.add_argument("--truth", type=int, nargs="+", default=sorted(GROUND_TRUTH),
+                        help="Ground-truth task number(s)")
+    parser.add_argument("--responses", nargs="*", default=[], help="Raw response or cache entry files")
+    parser.add_argument("--cache-dir", help="LLMCache directory to score")
+    parser.add_argument("--stub", type=int, default=0, help="Perturbed stub responses per ground-truth plan")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--json", help="Write per-case results and summary to this file")
+    args = parser.parse_args()
+
+    cases = list(stub_cases(args.truth, args.stub, args.seed))
+    responses = list(load_responses(args.responses))
+    if args.cache_dir:
+        responses.extend(load_cached_responses(args.cache_dir))
+    if responses and len(args.truth) != 1:
+        parser.error("--responses/--cache-dir need exactly one --truth task")
+    cases.extend((name, args.truth[0], text) for name, text in responses)
+    if not cases:
+        parser.error("nothing to evaluate (use --responses, --cache-dir or --stub)")
+
+    results = evaluate_batch(cases, max_workers=args.workers)
+    summary = summarize(results)
+    print_report(summary)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "results": results}, f, indent=2, default=str)
+        print(f"Wrote {len(results)} results to {args.json}")
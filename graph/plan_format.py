@@ -0,0 +1,270 @@
+"""
+Binary Plan Format Module
+Compact, versioned binary encoding of command lists (export_json format).
+
+Layout (little-endian, every section 4-byte aligned):
+
+    header      magic "DAGPLAN\\0", version u16, flags u16,
+                n_tasks u32, n_strings u32, n_deps u32, blob_bytes u32
+    strings     u32[n_strings + 1]   offsets into the string blob
+    id          u32[n_tasks]
+    agent       u32[n_tasks]         string table index
+    action      u32[n_tasks]         string table index
+    object      u32[n_tasks]         string table index
+    destination u32[n_tasks]         string table index
+    lane        u32[n_tasks]         string table index (precomputed lane)
+    node        u32[n_tasks]         string table index (original node[...] text)
+    dep_start   u32[n_tasks + 1]     offsets into deps
+    deps        u32[n_deps]          resolved dependency task IDs
+    blob        UTF-8 bytes of all interned strings
+
+Agent, object, destination, lane and node strings are interned once in the
+string table, and dependencies are stored as integer arrays, so loading never
+re-parses node[...] strings. PlanView memory-maps the file and reads the
+columns in place.
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from AI_module.plan_parser import parse_dependencies
+
+MAGIC = b"DAGPLAN\0"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHHIIII")
+_COLUMNS = ("id", "agent", "action", "object", "destination", "lane", "node")
+_STRING_COLUMNS = _COLUMNS[1:]
+
+
+class PlanFormatError(ValueError):
+    """Raised when a file is not a binary plan or has an unsupported version"""
+
+
+def _u32(values):
+    column = array("I", values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def encode_plan(commands):
+    """
+    Encode a command list into the binary plan format.
+
+    Args:
+        commands: List of command dicts (export_json format)
+
+    Returns:
+        bytes
+    """
+    strings = {}
+
+    def intern(value):
+        value = value or ""
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    columns = {name: [] for name in _COLUMNS}
+    dep_start = [0]
+    deps = []
+    for cmd in commands:
+        columns["id"].append(cmd["id"])
+        for name in _STRING_COLUMNS:
+            default = "node[]" if name == "node" else ""
+            columns[name].append(intern(cmd.get(name, default)))
+        deps.extend(parse_dependencies(cmd.get("node", "node[]")))
+        dep_start.append(len(deps))
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for raw in encoded:
+        offsets.append(offsets[-1] + len(raw))
+    blob = b"".join(encoded)
+
+    parts = [
+        _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(commands), len(encoded), len(deps), len(blob)),
+        _u32(offsets),
+    ]
+    parts.extend(_u32(columns[name]) for name in _COLUMNS)
+    parts.append(_u32(dep_start))
+    parts.append(_u32(deps))
+    parts.append(blob)
+    return b"".join(parts)
+
+
+def write_plan(commands, filename):
+    """Write a command list as a binary plan file"""
+    data = encode_plan(commands)
+    with open(filename, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+class PlanView:
+    """
+    Read-only, zero-copy view over a binary plan.
+
+    Integer columns are memoryviews into the mapped file; strings are decoded
+    on first use. Command dicts are only built when asked for.
+
+    Usage:
+        with load_plan("commands_task_1.plan") as plan:
+            commands = plan.commands()
+            dependency_map = plan.dependency_map()
+    """
+
+    def __init__(self, buffer, _mmap=None, _file=None):
+        # Validate before taking any view, so a rejected mmap can be closed
+        if len(buffer) < _HEADER.size:
+            raise PlanFormatError("File too short for a plan header")
+        magic, version, _, n_tasks, n_strings, n_deps, blob_bytes = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise PlanFormatError("Not a binary plan file (bad magic)")
+        if version != FORMAT_VERSION:
+            raise PlanFormatError(f"Unsupported plan format version {version} (expected {FORMAT_VERSION})")
+        columns_bytes = 4 * ((n_strings + 1) + len(_COLUMNS) * n_tasks + (n_tasks + 1) + n_deps)
+        if _HEADER.size + columns_bytes + blob_bytes > len(buffer):
+            raise PlanFormatError("Truncated plan file")
+
+        self._mmap = _mmap
+        self._file = _file
+        self._buffer = memoryview(buffer)
+        self.version = version
+        self.n_tasks = n_tasks
+        self.n_deps = n_deps
+
+        pos = _HEADER.size
+        self._string_offsets, pos = self._column(pos, n_strings + 1)
+        for name in _COLUMNS:
+            column, pos = self._column(pos, n_tasks)
+            setattr(self, f"_{name}", column)
+        self._dep_start, pos = self._column(pos, n_tasks + 1)
+        self._deps, pos = self._column(pos, n_deps)
+        self._blob = self._buffer[pos:pos + blob_bytes]
+        self._strings = [None] * n_strings
+
+    def _column(self, pos, count):
+        end = pos + 4 * count
+        raw = self._buffer[pos:end]
+        if sys.byteorder == "little":
+            return raw.cast("B").cast("I"), end
+        column = array("I", raw.tobytes())  # Big-endian hosts need a swapped copy
+        column.byteswap()
+        return column, end
+
+    def string(self, index):
+        """Interned string by table index (decoded once)"""
+        value = self._strings[index]
+        if value is None:
+            value = str(self._blob[self._string_offsets[index]:self._string_offsets[index + 1]], "utf-8")
+            self._strings[index] = value
+        return value
+
+    def __len__(self):
+        return self.n_tasks
+
+    def task_id(self, i):
+        return self._id[i]
+
+    def dependencies(self, i):
+        """
+        Dependency IDs of the i-th task, as a zero-copy slice.
+        Release (or drop) the slice before closing the view.
+        """
+        return self._deps[self._dep_start[i]:self._dep_start[i + 1]]
+
+    def command(self, i):
+        """The i-th task as a command dict (export_json format)"""
+        return {
+            "id": self._id[i],
+            "agent": self.string(self._agent[i]),
+            "action": self.string(self._action[i]),
+            "object": self.string(self._object[i]),
+            "destination": self.string(self._destination[i]),
+            "lane": self.string(self._lane[i]),
+            "node": self.string(self._node[i]),
+        }
+
+    def commands(self):
+        """All tasks as command dicts, built column-wise"""
+        strings = [self.string(i) for i in range(len(self._strings))]
+        columns = [self._id.tolist()]
+        columns.extend([strings[k] for k in getattr(self, f"_{name}").tolist()] for name in _STRING_COLUMNS)
+        return [dict(zip(_COLUMNS, row)) for row in zip(*columns)]
+
+    def dependency_map(self):
+        """Task ID -> list of dependency IDs (tasks without dependencies omitted)"""
+        result = defaultdict(list)
+        bounds = self._dep_start.tolist()
+        deps = self._deps.tolist()
+        for task_id, start, end in zip(self._id.tolist(), bounds, bounds[1:]):
+            if end > start:
+                result[task_id] = deps[start:end]
+        return result
+
+    def close(self):
+        # Release every view into the mapping before closing it
+        for name in ("_string_offsets", "_dep_start", "_deps", "_blob") + tuple(f"_{c}" for c in _COLUMNS):
+            column = getattr(self, name, None)
+            if isinstance(column, memoryview):
+                column.release()
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_plan(filename):
+    """Memory-map a binary plan file and return a PlanView"""
+    f = open(filename, "rb")
+    try:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:  # Empty file cannot be mapped
+        f.close()
+        raise PlanFormatError("Empty plan file")
+    try:
+        return PlanView(mapped, _mmap=mapped, _file=f)
+    except PlanFormatError:
+        mapped.close()
+        f.close()
+        raise
+
+
+def read_commands(filename):
+    """Load a binary plan file as a list of command dicts"""
+    with load_plan(filename) as plan:
+        return plan.commands()
+
+
+def is_binary_plan(filename):
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert JSON command files to the binary plan format")
+    parser.add_argument("inputs", nargs="+", help="JSON command files (export_json output)")
+    parser.add_argument("--dump", action="store_true", help="Print the decoded commands of binary plan files")
+    args = parser.parse_args()
+
+    for path in args.inputs:
+        if args.dump:
+            print(json.dumps(read_commands(path), indent=2, ensure_ascii=False))
+            continue
+        with open(path, encoding="utf-8") as f:
+            commands = json.load(f)
+        out_path = path.rsplit(".", 1)[0] + ".plan"
+        size = write_plan(commands, out_path)
+        print(f"{path} -> {out_path} ({len(commands)} tasks, {size} bytes)")
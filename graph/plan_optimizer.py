@@ -0,0 +1,495 @@
+"""
+Plan Optimizer Module
+Rewrites command lists (export_json format) between TaskProcessor and
+RobotExecutor to cut handoffs and estimated makespan.
+
+Passes (each one is kept only if the plan still places the same objects in
+the same destinations, gains no verifier issues and is not estimated slower):
+1. Edge relaxation: drop node[...] edges between tasks of different robots
+   that share no object or destination (sweeps keep all their edges)
+2. Transitive reduction: drop edges implied by other edges
+3. Handoff removal: pick -> move -> pick -> place chains become a single
+   pick -> place when one robot reaches both the object and the destination
+4. Reachability fix: pick/place pairs assigned to a robot that cannot reach
+   them move to one that can (kept even if estimated slower)
+5. Load balancing: move independent pick/place pairs to other robots that
+   reach them when that shortens the estimated makespan
+6. Priority order: renumber tasks so the longest remaining chains come
+   first in each robot's pool order, also trying with unrelated edges
+   between one robot's own tasks relaxed when that cannot deadlock. Kept if
+   it lowers the estimated makespan, or keeps it and finishes the handoffs
+   sooner (a late handoff stalls the receiving robot; done first, the
+   remaining independent work absorbs pick retries of either robot)
+
+Usage:
+    commands = TaskProcessor(task_plan).to_commands()
+    commands, report = optimize_plan(commands, agent_positions, object_positions)
+    print_optimization_report(report)
+    RobotExecutor(robot_ids, object_map).run_commands(commands)
+
+The Task*/main.py scripts run it through run_from_json(..., optimize=True),
+and graph/graph_command.py applies it before writing the command file
+(--no-optimize to skip).
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+from collections import Counter, defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from graph.plan_analysis import (dependency_map, topological_order, ancestors, verify_plan,
+                                 critical_path_length, estimate_makespan, handoff_count, handoff_finish,
+                                 task_duration, SIM_TIME_STEP)
+from robot.reachability import UR5_REACH, can_reach, scene_positions
+
+MAX_BALANCE_PASSES = 3  # Load-balancing sweeps over all pick/place pairs
+
+
+def _format_node(dep_ids):
+    return f"node[{', '.join(map(str, dep_ids))}]"
+
+
+def _with_dependencies(commands, deps):
+    """Copy commands with node strings rebuilt from a dependency map"""
+    return [dict(cmd, node=_format_node(deps.get(cmd["id"], []))) for cmd in commands]
+
+
+def _renumber(commands, order):
+    """Renumber tasks 1..n following order (a list of current IDs)"""
+    deps = dependency_map(commands)
+    new_id = {old: i for i, old in enumerate(order, start=1)}
+    by_id = {cmd["id"]: cmd for cmd in commands}
+    return [dict(by_id[old], id=new_id[old],
+                 node=_format_node(sorted(new_id[d] for d in deps[old] if d in new_id)))
+            for old in order]
+
+
+def _placements(commands):
+    """What the plan achieves: objects placed into destinations and surfaces swept"""
+    return Counter((cmd["action"], cmd["object"], cmd["destination"])
+                   for cmd in commands if cmd["action"] in ("place", "sweep"))
+
+
+def _accept(before, after, agents, allow_slower=False):
+    """Keep a rewrite only if it preserves semantics and is not estimated slower"""
+    if _placements(before) != _placements(after):
+        return False
+    if len(verify_plan(after, agents)) > len(verify_plan(before, agents)):
+        return False
+    return allow_slower or estimate_makespan(after) <= estimate_makespan(before)
+
+
+def _holding_safe(commands):
+    """
+    True if no robot can end up holding an object while a task it must do
+    before releasing it is another pick of its own (executor deadlock).
+    """
+    tasks = {cmd["id"]: cmd for cmd in commands}
+    try:
+        task_ancestors = ancestors(commands)
+    except ValueError:
+        return False
+    for release_id, release in tasks.items():
+        if release["action"] not in ("place", "move"):
+            continue
+        agent, obj = release["agent"], release["object"]
+        own_picks = [a for a in task_ancestors[release_id]
+                     if tasks[a]["action"] == "pick" and tasks[a]["agent"] == agent]
+        holding_picks = [a for a in own_picks if tasks[a]["object"] == obj]
+        if not holding_picks:
+            continue
+        grab = max(holding_picks)
+        if any(a != grab and tasks[a]["object"] != obj and a not in task_ancestors[grab] for a in own_picks):
+            return False
+    return True
+
+
+def _touches(cmd):
+    return {name for name in (cmd["object"], cmd["destination"]) if name}
+
+
+def relax_dependencies(commands, same_agent=False):
+    """
+    Drop edges between tasks of different robots that share no object or
+    destination.
+
+    Such edges only make one robot wait for unrelated work of another (e.g.
+    robot1 "pick green_cube_2" waiting for robot2 "place red_cube"). Edges
+    between tasks of the same robot are kept: they order its picks, and
+    dropping them can let it grab an object while it still has to receive
+    another one. Edges into or out of a sweep are kept, since a sweep may
+    need the surface cleared first.
+
+    Args:
+        commands: List of command dicts
+        same_agent: Also drop unrelated edges between one robot's own tasks
+            (check the result with _holding_safe)
+
+    Returns:
+        (commands, number of removed edges)
+    """
+    tasks = {cmd["id"]: cmd for cmd in commands}
+    relaxed = {}
+    removed = 0
+    for task_id, dep_ids in dependency_map(commands).items():
+        cmd = tasks[task_id]
+        kept = [d for d in dep_ids
+                if d not in tasks or (tasks[d]["agent"] == cmd["agent"] and not same_agent)
+                or "sweep" in (cmd["action"], tasks[d]["action"])
+                or _touches(cmd) & _touches(tasks[d])]
+        removed += len(dep_ids) - len(kept)
+        relaxed[task_id] = kept
+    return _with_dependencies(commands, relaxed), removed
+
+
+def transitive_reduction(commands):
+    """
+    Drop dependency edges implied by other dependencies.
+
+    Returns:
+        (commands, number of removed edges)
+    """
+    deps = dependency_map(commands)
+    task_ancestors = ancestors(commands)
+    reduced = {}
+    removed = 0
+    for task_id, dep_ids in deps.items():
+        implied = set()
+        for dep_id in dep_ids:
+            implied |= task_ancestors.get(dep_id, set())
+        kept = [d for d in dict.fromkeys(dep_ids) if d not in implied]
+        removed += len(dep_ids) - len(kept)
+        reduced[task_id] = kept
+    return _with_dependencies(commands, reduced), removed
+
+
+def _find_handoff_chain(move, tasks, deps, children):
+    """Return (pick, receive, place) IDs around a handoff move, or None"""
+    obj, giver, receiver = move["object"], move["agent"], move["destination"]
+    picks = [d for d in deps[move["id"]]
+             if tasks[d]["action"] == "pick" and tasks[d]["agent"] == giver and tasks[d]["object"] == obj]
+    receives = [c for c in children[move["id"]]
+                if tasks[c]["action"] == "pick" and tasks[c]["agent"] == receiver and tasks[c]["object"] == obj]
+    if len(picks) != 1 or len(receives) != 1:
+        return None
+    places = [c for c in children[receives[0]]
+              if tasks[c]["action"] == "place" and tasks[c]["agent"] == receiver and tasks[c]["object"] == obj]
+    if len(places) != 1:
+        return None
+    return picks[0], receives[0], places[0]
+
+
+def remove_handoffs(commands, agent_positions, object_positions, reach=UR5_REACH):
+    """
+    Collapse handoff chains that a single robot can do on its own.
+
+    A chain pick(A) -> move(A to B) -> pick(B) -> place(B) becomes
+    pick(R) -> place(R), where R reaches both the object and the destination
+    (A preferred, then B, then the least loaded robot).
+
+    Returns:
+        (commands, list of removed handoff descriptions)
+    """
+    tasks = {cmd["id"]: dict(cmd) for cmd in commands}
+    deps = {task_id: list(dep_ids) for task_id, dep_ids in dependency_map(commands).items()}
+    task_ancestors = ancestors(commands)
+    load = Counter(cmd["agent"] for cmd in commands)
+    removed = []
+
+    for move_id in sorted(t for t, cmd in tasks.items() if cmd["action"] == "move"):
+        if move_id not in tasks:
+            continue
+        children = defaultdict(list)
+        for task_id, dep_ids in deps.items():
+            for dep_id in dep_ids:
+                children[dep_id].append(task_id)
+        move = tasks[move_id]
+        chain = _find_handoff_chain(move, tasks, deps, children)
+        if chain is None:
+            continue
+        pick_id, receive_id, place_id = chain
+        obj, dest = move["object"], tasks[place_id]["destination"]
+
+        # The object must still be at its scene position when picked
+        if any(tasks[a]["action"] == "place" and tasks[a]["object"] == obj
+               for a in task_ancestors.get(pick_id, ()) if a in tasks):
+            continue
+        if obj not in object_positions or dest not in object_positions:
+            continue
+        candidates = [agent for agent, base in agent_positions.items()
+                      if can_reach(base, object_positions[obj], reach)
+                      and can_reach(base, object_positions[dest], reach)]
+        if not candidates:
+            continue
+        giver, receiver = move["agent"], move["destination"]
+        robot = giver if giver in candidates else receiver if receiver in candidates \
+            else min(candidates, key=lambda a: (load[a], a))
+
+        for task_id in (pick_id, place_id):
+            load[tasks[task_id]["agent"]] -= 1
+            tasks[task_id].update(agent=robot, lane=robot)
+            load[robot] += 1
+        for dropped in (move_id, receive_id):
+            for task_id, dep_ids in deps.items():
+                if dropped in dep_ids:
+                    deps[task_id] = list(dict.fromkeys(pick_id if d == dropped else d for d in dep_ids))
+            del tasks[dropped]
+            del deps[dropped]
+        load[giver] -= 1
+        load[receiver] -= 1
+        removed.append(f"{obj}: {giver}->{receiver} handoff replaced by {robot}")
+
+    kept = [cmd for cmd in commands if cmd["id"] in tasks]
+    return _with_dependencies([tasks[cmd["id"]] for cmd in kept], deps), removed
+
+
+def _independent_pairs(commands):
+    """(pick ID, place ID) pairs by one robot with no handoff involved"""
+    handed_off = {cmd["object"] for cmd in commands if cmd["action"] == "move"}
+    deps = dependency_map(commands)
+    tasks = {cmd["id"]: cmd for cmd in commands}
+    pairs = []
+    for cmd in commands:
+        if cmd["action"] != "place" or cmd["object"] in handed_off:
+            continue
+        picks = [d for d in deps[cmd["id"]]
+                 if tasks.get(d, {}).get("action") == "pick" and tasks[d]["object"] == cmd["object"]
+                 and tasks[d]["agent"] == cmd["agent"]]
+        if len(picks) == 1:
+            pairs.append((picks[0], cmd["id"]))
+    return pairs
+
+
+def _reaches_pair(base, obj, dest, object_positions, reach):
+    return can_reach(base, object_positions[obj], reach) and can_reach(base, object_positions[dest], reach)
+
+
+def fix_unreachable(commands, agent_positions, object_positions, reach=UR5_REACH):
+    """
+    Move independent pick/place pairs off robots that cannot reach the object
+    or the destination, onto the reachable robot giving the shortest makespan.
+
+    Returns:
+        (commands, list of reassignment descriptions)
+    """
+    fixed = []
+    for pick_id, place_id in _independent_pairs(commands):
+        by_id = {cmd["id"]: cmd for cmd in commands}
+        obj, dest = by_id[place_id]["object"], by_id[place_id]["destination"]
+        current = by_id[place_id]["agent"]
+        if obj not in object_positions or dest not in object_positions or current not in agent_positions:
+            continue
+        if _reaches_pair(agent_positions[current], obj, dest, object_positions, reach):
+            continue
+
+        trials = []
+        for agent, base in sorted(agent_positions.items()):
+            if agent != current and _reaches_pair(base, obj, dest, object_positions, reach):
+                trial = [dict(cmd, agent=agent, lane=agent) if cmd["id"] in (pick_id, place_id) else cmd
+                         for cmd in commands]
+                trials.append((estimate_makespan(trial), agent, trial))
+        if trials:
+            _, agent, commands = min(trials, key=lambda t: (t[0], t[1]))
+            fixed.append(f"{obj} -> {dest}: {current} -> {agent} ({current} cannot reach)")
+    return commands, fixed
+
+
+def balance_load(commands, agent_positions, object_positions, reach=UR5_REACH):
+    """
+    Reassign independent pick/place pairs to other robots that reach both the
+    object and the destination, whenever that lowers the estimated makespan.
+
+    Returns:
+        (commands, list of reassignment descriptions)
+    """
+    reassigned = []
+    for _ in range(MAX_BALANCE_PASSES):
+        improved = False
+        for pick_id, place_id in _independent_pairs(commands):
+            by_id = {cmd["id"]: cmd for cmd in commands}
+            obj, dest = by_id[place_id]["object"], by_id[place_id]["destination"]
+            current = by_id[place_id]["agent"]
+            if obj not in object_positions or dest not in object_positions:
+                continue
+
+            best, best_span = None, estimate_makespan(commands)
+            for agent, base in sorted(agent_positions.items()):
+                if agent == current or not _reaches_pair(base, obj, dest, object_positions, reach):
+                    continue
+                trial = [dict(cmd, agent=agent, lane=agent) if cmd["id"] in (pick_id, place_id) else cmd
+                         for cmd in commands]
+                span = estimate_makespan(trial)
+                if span < best_span:
+                    best, best_span = (agent, trial), span
+            if best is not None:
+                commands = best[1]
+                reassigned.append(f"{obj} -> {dest}: {current} -> {best[0]}")
+                improved = True
+        if not improved:
+            break
+    return commands, reassigned
+
+
+def prioritize(commands, durations=None):
+    """
+    Renumber tasks in a topological order that starts the longest remaining
+    dependency chains first (upward rank list scheduling). The executor and
+    estimate_makespan take each robot's tasks in ID order.
+    """
+    deps = dependency_map(commands)
+    tasks = {cmd["id"]: cmd for cmd in commands}
+    children = defaultdict(list)
+    for task_id, dep_ids in deps.items():
+        for dep_id in dep_ids:
+            children[dep_id].append(task_id)
+
+    rank = {}
+    for task_id in reversed(topological_order(commands)):
+        rank[task_id] = task_duration(tasks[task_id], durations) + max(
+            (rank[c] for c in children[task_id]), default=0)
+
+    indegree = {task_id: sum(1 for d in deps[task_id] if d in tasks) for task_id in tasks}
+    ready = [task_id for task_id, degree in indegree.items() if degree == 0]
+    order = []
+    while ready:
+        ready.sort(key=lambda t: (-rank[t], t))
+        task_id = ready.pop(0)
+        order.append(task_id)
+        for child_id in children[task_id]:
+            indegree[child_id] -= 1
+            if indegree[child_id] == 0:
+                ready.append(child_id)
+    return _renumber(commands, order)
+
+
+def _plan_stats(commands):
+    return {
+        "tasks": len(commands),
+        "handoffs": handoff_count(commands),
+        "edges": sum(len(d) for d in dependency_map(commands).values()),
+        "critical_path": critical_path_length(commands),
+        "makespan": estimate_makespan(commands),
+        "handoff_finish": handoff_finish(commands),
+    }
+
+
+def _schedule_key(commands):
+    """Priority-order objective: estimated makespan, then last handoff finish"""
+    return estimate_makespan(commands), handoff_finish(commands)
+
+
+def optimize_plan(commands, agent_positions=None, object_positions=None, reach=UR5_REACH):
+    """
+    Optimize a command list.
+
+    Args:
+        commands: List of command dicts (export_json format)
+        agent_positions: Robot base positions (Environment.agent_positions);
+            without them only the graph-only passes run
+        object_positions: Object and destination positions (Environment.objects
+            before setup_simulation)
+        reach: Robot reach radius (meters)
+
+    Returns:
+        (optimized commands, report dict)
+    """
+    if topological_order(commands) is None:
+        raise ValueError("Plan contains a dependency cycle")
+
+    agents = set(agent_positions) if agent_positions else None
+    report = {"before": _plan_stats(commands), "edges_removed": 0,
+              "handoffs_removed": [], "reassigned": [], "reordered": False}
+    current = commands
+
+    for rewrite in (relax_dependencies, transitive_reduction):
+        candidate, removed = rewrite(current)
+        if removed and _accept(current, candidate, agents):
+            current = candidate
+            report["edges_removed"] += removed
+
+    if agent_positions and object_positions:
+        candidate, handoffs = remove_handoffs(current, agent_positions, object_positions, reach)
+        if handoffs and _accept(current, candidate, agents):
+            current = candidate
+            report["handoffs_removed"] = handoffs
+
+        candidate, fixed = fix_unreachable(current, agent_positions, object_positions, reach)
+        if fixed and _accept(current, candidate, agents, allow_slower=True):
+            current = candidate
+            report["reassigned"].extend(fixed)
+
+        candidate, reassigned = balance_load(current, agent_positions, object_positions, reach)
+        if reassigned and _accept(current, candidate, agents):
+            current = candidate
+            report["reassigned"].extend(reassigned)
+
+    candidates = [(prioritize(current), 0)]
+    relaxed, removed = relax_dependencies(current, same_agent=True)
+    if removed:
+        relaxed, reduced = transitive_reduction(relaxed)
+        relaxed = prioritize(relaxed)
+        if _holding_safe(relaxed):
+            candidates.append((relaxed, removed + reduced))
+    for candidate, removed in sorted(candidates, key=lambda c: _schedule_key(c[0])):
+        if _schedule_key(candidate) < _schedule_key(current) and _accept(current, candidate, agents):
+            current = candidate
+            report["edges_removed"] += removed
+            report["reordered"] = True
+            break
+
+    # Removed handoffs leave gaps in the task IDs
+    if [cmd["id"] for cmd in current] != list(range(1, len(current) + 1)):
+        current = _renumber(current, [cmd["id"] for cmd in current])
+
+    report["after"] = _plan_stats(current)
+    return current, report
+
+
+def print_optimization_report(report):
+    before, after = report["before"], report["after"]
+    print("\n" + "=" * 60)
+    print(" PLAN OPTIMIZATION")
+    print("=" * 60)
+    for key in ("tasks", "handoffs", "edges", "critical_path", "makespan", "handoff_finish"):
+        suffix = ""
+        if key in ("critical_path", "makespan", "handoff_finish"):
+            suffix = f"  (~{before[key] * SIM_TIME_STEP:.1f}s -> ~{after[key] * SIM_TIME_STEP:.1f}s)"
+        print(f"  {key:<14} {before[key]:>8} -> {after[key]:<8}{suffix}")
+    print(f"  Redundant/over-constraining edges removed: {report['edges_removed']}")
+    for line in report["handoffs_removed"]:
+        print(f"  Handoff removed: {line}")
+    for line in report["reassigned"]:
+        print(f"  Reassigned: {line}")
+    if report["reordered"]:
+        print("  Tasks reordered by critical-path priority")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Optimize a command plan before execution")
+    parser.add_argument("--task", type=int, required=True, help="Task number (scene and default plan)")
+    parser.add_argument("--input", help="JSON command file (default: task_plan_truth/commands_task_<N>.json)")
+    parser.add_argument("--output", help="Write the optimized plan (.json, or .plan for the binary format)")
+    args = parser.parse_args()
+
+    project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    input_path = args.input or os.path.join(project_root, "task_plan_truth", f"commands_task_{args.task}.json")
+    with open(input_path, encoding="utf-8") as f:
+        plan = json.load(f)
+
+    env = importlib.import_module(f"Task{args.task}.environment").Environment()
+    optimized, report = optimize_plan(plan, *scene_positions(env))
+    print_optimization_report(report)
+
+    if args.output:
+        if args.output.endswith(".plan"):
+            from graph.plan_format import write_plan
+            write_plan(optimized, args.output)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(optimized, f, indent=2, ensure_ascii=False)
+        print(f"Wrote {len(optimized)} commands to {args.output}")
@@ -0,0 +1,141 @@
+"""
+Plan Sampler Module
+Requests several candidate plans concurrently and keeps the best one.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from AI_module.LLM import generate_text
+from AI_module.plan_parser import parse_plan
+from graph.graph_command import TaskProcessor
+from graph.plan_analysis import verify_plan, estimate_makespan, handoff_count, SIM_TIME_STEP
+
+
+class PlanCandidate:
+    """One sampled plan with its verification result and makespan estimate"""
+
+    def __init__(self, index, temperature):
+        self.index = index
+        self.temperature = temperature
+        self.text = None
+        self.task_plan = []
+        self.commands = []
+        self.issues = []
+        self.makespan = float("inf")
+        self.latency = None
+        self.error = None
+
+    @property
+    def valid(self):
+        return self.error is None and bool(self.commands) and not self.issues
+
+    def score(self):
+        """Lower is better: issue-free plans first, then fewest issues, then shortest makespan; unusable last"""
+        if self.error is not None or not self.commands:
+            return (2, float("inf"), float("inf"))
+        return (1 if self.issues else 0, len(self.issues), self.makespan)
+
+
+def _default_temperatures(k):
+    if k == 1:
+        return [0.2]
+    return [round(0.2 + 0.8 * i / (k - 1), 2) for i in range(k)]
+
+
+def _generate_candidate(candidate, prompt, model, cache):
+    start = time.time()
+    candidate.text = generate_text(prompt, model=model, cache=cache,
+                                   generation_config={"temperature": candidate.temperature})
+    candidate.latency = time.time() - start
+    return candidate
+
+
+def _evaluate_candidate(candidate, agents):
+    """Parse, process and score a generated candidate"""
+    try:
+        candidate.task_plan = parse_plan(candidate.text)
+        if not candidate.task_plan:
+            candidate.error = "no tasks parsed"
+            return
+        candidate.commands = TaskProcessor(candidate.task_plan).to_commands()
+        candidate.issues = verify_plan(candidate.commands, agents)
+        candidate.makespan = estimate_makespan(candidate.commands)
+    except Exception as e:
+        candidate.error = f"processing failed: {e}"
+
+
+def sample_plans(prompt, k=4, model=None, max_concurrency=4, timeout=120.0,
+                 temperatures=None, cache=None, agents=None):
+    """
+    Request k candidate plans concurrently and score each one.
+
+    Args:
+        prompt: Prompt from build_prompt
+        k: Number of candidates
+        model: Object with generate_content (default: Gemini); a
+            stub_model.StubModel can stand in for offline runs
+        max_concurrency: Max requests in flight
+        timeout: Seconds to wait for all candidates; late ones are dropped
+        temperatures: Per-candidate sampling temperatures (default: spread 0.2-1.0)
+        cache: Optional LLMCache
+        agents: Known agent names for the verifier (optional)
+
+    Returns:
+        List of PlanCandidate sorted best first
+    """
+    temperatures = temperatures or _default_temperatures(k)
+    candidates = [PlanCandidate(i, temperatures[i % len(temperatures)]) for i in range(k)]
+
+    pool = ThreadPoolExecutor(max_workers=max_concurrency)
+    futures = {pool.submit(_generate_candidate, c, prompt, model, cache): c for c in candidates}
+    done, not_done = wait(futures, timeout=timeout)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    for future in not_done:
+        futures[future].error = f"timed out after {timeout}s"
+    for future in done:
+        candidate = futures[future]
+        if future.exception() is not None:
+            candidate.error = f"request failed: {future.exception()}"
+        else:
+            _evaluate_candidate(candidate, agents)
+
+    return sorted(candidates, key=lambda c: (c.score(), c.index))
+
+
+def print_candidates(candidates):
+    print("\n" + "=" * 70)
+    print(" PLAN CANDIDATES")
+    print("=" * 70)
+    for c in candidates:
+        if c.error:
+            print(f"  #{c.index} (T={c.temperature}): ERROR {c.error}")
+            continue
+        print(f"  #{c.index} (T={c.temperature}): {len(c.commands)} tasks, "
+              f"{handoff_count(c.commands)} handoffs, {len(c.issues)} issues, "
+              f"makespan ~{c.makespan * SIM_TIME_STEP:.1f}s, latency {c.latency:.2f}s")
+        for issue in c.issues:
+            print(f"      - {issue}")
+    print("=" * 70 + "\n")
+
+
+def select_best_plan(prompt, k=4, **kwargs):
+    """
+    Sample k plans and return the best valid candidate for RobotExecutor.
+
+    Only candidates that verify_plan accepts without issues are selected;
+    among them the shortest estimated makespan wins.
+
+    Raises:
+        ValueError: if no candidate produced a valid plan
+    """
+    candidates = sample_plans(prompt, k=k, **kwargs)
+    print_candidates(candidates)
+    best = candidates[0]
+    if not best.valid:
+        if best.error is not None or not best.commands:
+            raise ValueError("No candidate produced a usable plan")
+        raise ValueError(f"No candidate produced a valid plan "
+                         f"(best: #{best.index} with {len(best.issues)} issues: {best.issues[0]})")
+    print(f"Selected candidate #{best.index}")
+    return best
@@ -0,0 +1,78 @@
+"""
+Incremental Re-planning Module
+Re-plans only the remaining part of a task from the executor's current state.
+"""
+
+from AI_module.process_prompt import PromptBuilder, agent_config_for
+from AI_module.LLM import generate_text
+from AI_module.plan_parser import parse_plan
+from AI_module.planner_backend import load_backend
+from graph.graph_command import TaskProcessor
+from telemetry.log import get_logger
+
+log = get_logger("planner")
+
+
+class Replanner:
+    """
+    Builds a sub-plan for the remaining goal when execution goes wrong.
+
+    Sends the LLM pipeline (build prompt -> parse -> TaskProcessor) only the
+    remaining goal together with current object positions, holding state and
+    completed actions. The returned commands are meant for
+    RobotExecutor.splice_plan, so running robots are never restarted.
+
+    Usage:
+        replanner = Replanner("Sort the cubes into the matching bowls")
+        executor = RobotExecutor(robot_ids, object_map, replanner=replanner)
+    """
+
+    def __init__(self, task, agent_config=None, generate=None, env=None):
+        """
+        Args:
+            task: Original task goal
+            agent_config: Agent configuration for PromptBuilder (optional)
+            generate: Callable prompt -> raw LLM response text
+                (defaults to AI_module.LLM.generate_text)
+            env: Environment of the running task (default: the one
+                process_prompt builds prompts for)
+        """
+        self.task = task
+        self.builder = PromptBuilder(agent_config, env=env)
+        self.generate = generate or generate_text
+
+    def __call__(self, snapshot):
+        """
+        Re-plan from an executor snapshot.
+
+        Args:
+            snapshot: RobotExecutor.snapshot()
+
+        Returns:
+            List of command dicts (export_json format), empty if the LLM
+            returned no usable plan
+        """
+        prompt = self.builder.build_replan_prompt(self.task, snapshot)
+        response_text = self.generate(prompt)
+        log.info("Raw re-plan response:\n%s", response_text)
+
+        task_plan = parse_plan(response_text)
+        if not task_plan:
+            return []
+        return TaskProcessor(task_plan).to_commands()
+
+
+def load_replanner(spec, env, goal):
+    """
+    Replanner for a task entry point that generates with a planner backend.
+
+    Args:
+        spec: Planner backend spec (load_backend), e.g. gemini or http://127.0.0.1:8765/generate
+        env: Task Environment, already set up in the running simulation
+        goal: Task goal of the planning prompt
+
+    Returns:
+        Replanner for RobotExecutor / run_from_json
+    """
+    scene = type(env)()  # Object positions as loaded, not body IDs
+    return Replanner(goal, agent_config_for(scene), generate=load_backend(spec).generate, env=scene)
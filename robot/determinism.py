@@ -0,0 +1,154 @@
+"""
+Deterministic Run Module
+Makes a plan execution reproducible: seeded random generators, a fixed
+physics time step with deterministic contact ordering, and a token ring that
+lets exactly one robot worker run at a time, handing the turn on in fixed
+agent order after every simulation step batch.
+
+With the ring, the sequence of PyBullet calls (motor commands, steps,
+contact queries) depends only on the plan and the physics, not on thread
+timing, so the same plan gives bit-identical trajectories and makespan.
+Robots still move concurrently in simulation: motor targets persist while
+another robot steps the world.
+
+Usage:
+    determinism.configure_physics(seed=0)
+    executor = RobotExecutor(robot_ids, object_map, deterministic=True)
+    executor.run_from_json("commands_task_1.json")
+    print(determinism.world_digest())       # Equal across identical runs
+
+or DETERMINISTIC_SEED=0 python Task1/main.py
+"""
+
+import hashlib
+import random
+import struct
+import threading
+
+import pybullet as p
+
+SEED_ENV = "DETERMINISTIC_SEED"  # Seed for run_from_json/run_from_binary deterministic mode when set
+TIME_STEP = 1.0 / 240.0          # PyBullet default, set explicitly so it cannot drift
+SOLVER_ITERATIONS = 50           # PyBullet default constraint solver iterations
+
+_scheduler = None
+
+
+class TurnScheduler:
+    """
+    Round-robin token ring over agent worker threads.
+
+    A worker calls enter(agent) before doing anything, yield_turn() at every
+    point where it would otherwise sleep or after stepping the world, and
+    leave() when it exits. Threads that never entered pass through.
+    """
+
+    def __init__(self, agents):
+        self.ring = list(agents)
+        self.turn = 0  # Index into ring of the agent allowed to run
+        self.cond = threading.Condition()
+        self.local = threading.local()
+        self.turns = 0  # Turn hand-overs, for diagnostics
+
+    def _current(self):
+        return self.ring[self.turn] if self.ring else None
+
+    def enter(self, agent):
+        """Register the calling thread as agent and wait for its first turn"""
+        self.local.agent = agent
+        with self.cond:
+            self.cond.wait_for(lambda: self._current() == agent)
+
+    def add(self, agent):
+        """Put agent (back) at the end of the ring, for a worker started mid-run"""
+        with self.cond:
+            if agent not in self.ring:
+                self.ring.append(agent)
+                if len(self.ring) == 1:
+                    self.turn = 0
+                self.cond.notify_all()
+
+    def yield_turn(self):
+        """Hand the turn to the next agent in the ring and wait to get it back"""
+        agent = getattr(self.local, "agent", None)
+        if agent is None:
+            return
+        with self.cond:
+            if len(self.ring) > 1:
+                self.turn = (self.ring.index(agent) + 1) % len(self.ring)
+                self.turns += 1
+                self.cond.notify_all()
+                self.cond.wait_for(lambda: self._current() == agent)
+
+    def leave(self):
+        """Remove the calling thread's agent from the ring, passing the turn on"""
+        agent = getattr(self.local, "agent", None)
+        if agent is None:
+            return
+        self.local.agent = None
+        with self.cond:
+            index = self.ring.index(agent)
+            self.ring.pop(index)
+            if self.ring:
+                if index < self.turn or self.turn >= len(self.ring):
+                    self.turn = (self.turn - (index < self.turn)) % len(self.ring)
+            self.cond.notify_all()
+
+
+def get_scheduler():
+    return _scheduler
+
+
+def set_scheduler(scheduler):
+    """Install the scheduler robot_action.wait_simulation yields to (None = free-running threads)"""
+    global _scheduler
+    _scheduler = scheduler
+    return scheduler
+
+
+def yield_turn():
+    """Yield to the next robot if a deterministic run is in progress"""
+    scheduler = _scheduler
+    if scheduler is not None:
+        scheduler.yield_turn()
+
+
+def seed_everything(seed):
+    """Seed Python's and NumPy's global random generators"""
+    import numpy as np
+
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def configure_physics(seed=0, time_step=TIME_STEP, solver_iterations=SOLVER_ITERATIONS):
+    """
+    Seed the random generators and pin the physics parameters of the
+    connected PyBullet server.
+
+    Args:
+        seed: Random seed
+        time_step: Physics time step (seconds)
+        solver_iterations: Constraint solver iterations per step
+    """
+    seed_everything(seed)
+    p.setRealTimeSimulation(0)
+    p.setTimeStep(time_step)
+    p.setPhysicsEngineParameter(fixedTimeStep=time_step, numSolverIterations=solver_iterations,
+                                deterministicOverlappingPairs=1)
+
+
+def world_digest():
+    """
+    SHA-256 of every body's base pose and joint state, as exact float bits.
+    Two runs with the same digest ended in bit-identical world states.
+    """
+    digest = hashlib.sha256()
+    for index in range(p.getNumBodies()):
+        body = p.getBodyUniqueId(index)
+        pos, orn = p.getBasePositionAndOrientation(body)
+        digest.update(struct.pack("<i7d", body, *pos, *orn))
+        for joint in range(p.getNumJoints(body)):
+            position, velocity = p.getJointState(body, joint)[:2]
+            digest.update(struct.pack("<2d", position, velocity))
+    return digest.hexdigest()
@@ -0,0 +1,142 @@
+"""
+Handoff Point Generator Module
+Computes robotXtorobotY handoff points from robot base poses, so cells with
+any number of robots need no hand-typed Environment.handoff_points.
+"""
+
+import argparse
+import importlib
+import math
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from robot.reachability import UR5_REACH, can_reach, planar_distance, scene_positions
+
+LANE_OFFSET = 0.2        # Sideways shift so opposite handoff directions use separate points (meters)
+LANE_WEIGHT = 0.5        # Pull toward the lane relative to the travel cost
+OBJECT_CLEARANCE = 0.1   # Keep handoff points this far from scene objects (meters)
+GRID_RESOLUTION = 0.02   # Search grid step (meters)
+HANDOFF_Z_OFFSET = 0.0   # Handoff height relative to the robot bases (meters)
+
+
+def _cost(point, base_a, base_b, lane_center, obstacles):
+    # Both arms' travel from their bases (squared, so the load is shared),
+    # distance from the lane, and a penalty for crowding scene objects
+    cost = planar_distance(point, base_a) ** 2 + planar_distance(point, base_b) ** 2
+    cost += LANE_WEIGHT * planar_distance(point, lane_center) ** 2
+    for obstacle in obstacles:
+        gap = planar_distance(point, obstacle)
+        if gap < OBJECT_CLEARANCE:
+            cost += (OBJECT_CLEARANCE - gap) * 10.0
+    return cost
+
+
+def handoff_point(base_a, base_b, reach=UR5_REACH, obstacles=()):
+    """
+    Handoff point for giver base_a -> receiver base_b.
+
+    Searches the intersection of both workspaces for the point with the least
+    combined arm travel, shifted LANE_OFFSET to the giver's left so the
+    reverse direction gets its own point.
+
+    Returns:
+        ([x, y, z], feasible); if the workspaces do not overlap, the midpoint
+        between the bases is returned with feasible=False
+    """
+    dx, dy = base_b[0] - base_a[0], base_b[1] - base_a[1]
+    distance = math.hypot(dx, dy)
+    z = round((base_a[2] + base_b[2]) / 2 + HANDOFF_Z_OFFSET, 4)
+    mid = ((base_a[0] + base_b[0]) / 2, (base_a[1] + base_b[1]) / 2)
+    if distance == 0:
+        return [round(mid[0], 4), round(mid[1], 4), z], False
+
+    ux, uy = dx / distance, dy / distance
+    nx, ny = -uy, ux  # Left of the giver -> receiver direction
+    lane_center = (mid[0] + LANE_OFFSET * nx, mid[1] + LANE_OFFSET * ny)
+
+    best, best_cost = None, math.inf
+    half_length = max(reach - distance / 2, 0.0)
+    steps_s = int(half_length / GRID_RESOLUTION)
+    steps_t = int(reach / GRID_RESOLUTION)
+    for i in range(-steps_s, steps_s + 1):
+        s = i * GRID_RESOLUTION
+        for j in range(-steps_t, steps_t + 1):
+            t = j * GRID_RESOLUTION
+            point = (mid[0] + s * ux + t * nx, mid[1] + s * uy + t * ny)
+            if not (can_reach(base_a, point, reach) and can_reach(base_b, point, reach)):
+                continue
+            cost = _cost(point, base_a, base_b, lane_center, obstacles)
+            if cost < best_cost:
+                best, best_cost = point, cost
+
+    if best is None:
+        return [round(mid[0], 4), round(mid[1], 4), z], False
+    return [round(best[0], 4), round(best[1], 4), z], True
+
+
+def generate_handoff_points(agent_positions, reach=UR5_REACH, obstacles=(), verbose=True):
+    """
+    Handoff points for every ordered robot pair.
+
+    Args:
+        agent_positions: Dict agent -> base position (Environment.agent_positions)
+        reach: Robot reach radius (meters)
+        obstacles: Scene object positions to keep clear of
+        verbose: Print a warning for pairs whose workspaces do not overlap
+
+    Returns:
+        Dict "robotXtorobotY" -> [x, y, z]
+    """
+    points = {}
+    for giver, base_a in agent_positions.items():
+        for receiver, base_b in agent_positions.items():
+            if giver == receiver:
+                continue
+            point, feasible = handoff_point(base_a, base_b, reach, obstacles)
+            points[f"{giver}to{receiver}"] = point
+            if not feasible and verbose:
+                print(f"[WARN] {giver} and {receiver} workspaces do not overlap "
+                      f"({planar_distance(base_a, base_b):.2f} m apart); using midpoint {point}")
+    return points
+
+
+def complete_handoff_points(handoff_points, agent_positions, reach=UR5_REACH, obstacles=()):
+    """
+    Return handoff_points (may be None) with every missing robot pair generated.
+    Hand-typed points are kept as they are.
+    """
+    result = dict(handoff_points or {})
+    missing = [f"{a}to{b}" for a in agent_positions for b in agent_positions
+               if a != b and f"{a}to{b}" not in result]
+    if missing:
+        generated = generate_handoff_points(agent_positions, reach, obstacles)
+        for key in missing:
+            result[key] = generated[key]
+        print(f"[INFO] Generated handoff points for: {', '.join(missing)}")
+    return result
+
+
+def handoff_points_for_environment(env, reach=UR5_REACH):
+    """Complete an Environment's handoff points from its agent_positions and objects"""
+    agent_positions, object_positions = scene_positions(env)
+    return complete_handoff_points(getattr(env, "handoff_points", None), agent_positions,
+                                   reach, list(object_positions.values()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate handoff points for a task cell")
+    parser.add_argument("--task", type=int, required=True, help="Task number")
+    args = parser.parse_args()
+
+    env = importlib.import_module(f"Task{args.task}.environment").Environment()
+    agent_positions, object_positions = scene_positions(env)
+    generated = generate_handoff_points(agent_positions, obstacles=list(object_positions.values()))
+
+    print(f"\n{'pair':<16} {'hand-typed':<24} {'generated':<24} {'giver/receiver reach (m)'}")
+    for key, point in sorted(generated.items()):
+        giver, receiver = key.split("to")
+        manual = env.handoff_points.get(key) if hasattr(env, "handoff_points") else None
+        distances = "/".join(f"{planar_distance(agent_positions[a], point):.3f}" for a in (giver, receiver))
+        print(f"{key:<16} {str(manual):<24} {str(point):<24} {distances}")
@@ -0,0 +1,38 @@
+"""
+Reachability Module
+Planar workspace model of the UR5 arms: which robot can reach an object,
+a destination or a handoff point, without running the simulation.
+"""
+
+import math
+
+UR5_REACH = 0.85       # Max horizontal reach from the base axis (meters)
+UR5_MIN_REACH = 0.15   # Closer than this the arm collides with its own base (meters)
+
+
+def planar_distance(a, b):
+    """Horizontal (x, y) distance between two points"""
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def can_reach(base_pos, point, reach=UR5_REACH, min_reach=UR5_MIN_REACH):
+    """True if a robot based at base_pos can reach point"""
+    return min_reach <= planar_distance(base_pos, point) <= reach + 1e-9  # Tolerate float round-off
+
+
+def reachable_agents(point, agent_positions, reach=UR5_REACH):
+    """Agents (sorted by distance) that can reach point"""
+    distances = {agent: planar_distance(pos, point) for agent, pos in agent_positions.items()}
+    return [agent for agent in sorted(distances, key=distances.get)
+            if can_reach(agent_positions[agent], point, reach)]
+
+
+def scene_positions(env):
+    """
+    Read (agent_positions, object_positions) from a task Environment
+    created but not yet set up (objects still hold coordinates, not PyBullet IDs).
+    """
+    agent_positions = dict(getattr(env, "agent_positions", {}))
+    object_positions = {name: tuple(pos) for name, pos in getattr(env, "objects", {}).items()
+                        if isinstance(pos, (tuple, list)) and len(pos) >= 3}
+    return agent_positions, object_positions
@@ -0,0 +1,419 @@
+"""
+Replay Log Module
+Records every joint motor command, gripper command and grasp constraint
+create/remove of a run, plus a periodic snapshot of all body poses and joint
+positions, into a compact columnar binary file. The replayer re-drives
+PyBullet from the log (physics mode) or just poses the scene from the
+snapshots (kinematic mode), with no executor or LLM involved.
+
+Layout (little-endian, every section 4-byte aligned):
+
+    header      magic "DAGRLOG\\0", version u16, flags u16, n_events u32,
+                n_snapshots u32, n_bodies u32, n_joints u32, snapshot_every u32,
+                total_steps u32, meta_bytes u32, time_step f64
+    bodies      i32[n_bodies]            body IDs in snapshot order
+    joints      u32[n_bodies]            joint count per body
+    ev_step     u32[n_events]            steps taken before the event
+    ev_kind     u32[n_events]            MOTOR, GRIPPER, CONSTRAINT or RELEASE
+    ev_body     i32[n_events]
+    ev_arg      i32[3 * n_events]        joint / parent link, child body, constraint ID
+    ev_value    f64[3 * n_events]        target, max velocity (NaN = default) / frame position
+    snap_step   u32[n_snapshots]
+    snap_pose   f32[n_snapshots * n_bodies * 7]    x y z qx qy qz qw
+    snap_joint  f32[n_snapshots * n_joints]        joint positions
+    meta        UTF-8 JSON (plan file, deterministic mode, exact initial body poses, ...)
+
+Commands keep full double precision, so a physics replay of a deterministic
+run (robot/determinism.py) on the same scene reproduces it exactly; snapshots
+are float32.
+
+Usage:
+    recorder = replay_log.start_recording(meta={"plan": "commands_task_1.json"})
+    ...run...
+    replay_log.stop_recording("run_task_1.rlog")
+
+    python robot/replay_log.py run_task_1.rlog --task 1 [--kinematic] [--gui]
+"""
+
+import argparse
+import importlib
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pybullet as p
+
+MAGIC = b"DAGRLOG\0"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHHIIIIIIId")
+REPLAY_LOG_ENV = "REPLAY_LOG"  # Replay log written by run_from_json/run_from_binary when set
+SNAPSHOT_EVERY = 10            # Steps between state snapshots
+
+# Event kinds
+MOTOR, GRIPPER, CONSTRAINT, RELEASE = range(4)
+EVENT_NAMES = ("motor", "gripper", "constraint", "release")
+
+
+class ReplayLogError(ValueError):
+    """Raised when a file is not a replay log or has an unsupported version"""
+
+
+def _column(typecode, values=()):
+    return array(typecode, values)
+
+
+def _bytes(column):
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+class ReplayRecorder:
+    """
+    Thread-safe in-memory recorder; columns are written out by write().
+
+    The scene's bodies are fixed when recording starts (create the recorder
+    after setup_simulation).
+    """
+
+    def __init__(self, snapshot_every=SNAPSHOT_EVERY, meta=None):
+        self.snapshot_every = snapshot_every
+        self.meta = dict(meta or {})
+        self.lock = threading.Lock()
+        self.steps = 0
+        self.bodies = _column("i", (p.getBodyUniqueId(i) for i in range(p.getNumBodies())))
+        self.joints = _column("I", (p.getNumJoints(body) for body in self.bodies))
+        self.ev_step, self.ev_kind = _column("I"), _column("I")
+        self.ev_body, self.ev_arg, self.ev_value = _column("i"), _column("i"), _column("d")
+        self.snap_step, self.snap_pose, self.snap_joint = _column("I"), _column("f"), _column("f")
+        self.time_step = p.getPhysicsEngineParameters().get("fixedTimeStep", 1.0 / 240.0)
+        # Full-precision start poses, so perturbed scenes (robustness sweeps) replay exactly. Only read:
+        # recording must not change the run (a reset would also zero the bodies' velocities)
+        # Poses passed in come from reset_poses (the run started from a reset); read ones were never reset
+        self.meta["initial_poses_reset"] = "initial_poses" in self.meta
+        if "initial_poses" not in self.meta:
+            self.meta["initial_poses"] = {str(body): [list(value) for value in p.getBasePositionAndOrientation(body)]
+                                          for body in self.bodies}
+        self.snapshot()
+
+    def _event(self, kind, body, args, values):
+        with self.lock:
+            self.ev_step.append(self.steps)
+            self.ev_kind.append(kind)
+            self.ev_body.append(body)
+            self.ev_arg.extend(args)
+            self.ev_value.extend(values)
+
+    def motor(self, body, joint, target, max_velocity=None):
+        self._event(MOTOR, body, (joint, -1, -1),
+                    (target, math.nan if max_velocity is None else max_velocity, 0.0))
+
+    def gripper(self, body, joint, angle, open_length):
+        self._event(GRIPPER, body, (joint, -1, -1), (angle, open_length, 0.0))
+
+    def constraint(self, parent, parent_link, child, constraint_id, frame_position):
+        self._event(CONSTRAINT, parent, (parent_link, child, constraint_id), tuple(frame_position))
+
+    def release(self, constraint_id):
+        self._event(RELEASE, -1, (-1, -1, constraint_id), (0.0, 0.0, 0.0))
+
+    def on_step(self):
+        with self.lock:
+            self.steps += 1
+            due = self.steps % self.snapshot_every == 0
+        if due:
+            self.snapshot()
+
+    def snapshot(self):
+        """Record every body pose and joint position at the current step"""
+        poses, joint_positions = [], []
+        for body, count in zip(self.bodies, self.joints):
+            pos, orn = p.getBasePositionAndOrientation(body)
+            poses.extend(pos)
+            poses.extend(orn)
+            if count:
+                joint_positions.extend(state[0] for state in p.getJointStates(body, range(count)))
+        with self.lock:
+            self.snap_step.append(self.steps)
+            self.snap_pose.extend(poses)
+            self.snap_joint.extend(joint_positions)
+
+    def encode(self):
+        with self.lock:
+            meta = json.dumps(self.meta).encode("utf-8")
+            parts = [
+                _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(self.ev_step), len(self.snap_step), len(self.bodies),
+                             sum(self.joints), self.snapshot_every, self.steps, len(meta), self.time_step),
+            ]
+            parts.extend(_bytes(column) for column in (
+                self.bodies, self.joints, self.ev_step, self.ev_kind, self.ev_body, self.ev_arg,
+                self.ev_value, self.snap_step, self.snap_pose, self.snap_joint))
+            parts.append(meta)
+        return b"".join(parts)
+
+    def write(self, path):
+        data = self.encode()
+        with open(path, "wb") as f:
+            f.write(data)
+        print(f"[INFO] Replay log with {len(self.ev_step)} events and {len(self.snap_step)} snapshots "
+              f"({len(data) / 1024:.1f} KB) written to {path}")
+        return len(data)
+
+
+class ReplayLog:
+    """
+    Decoded replay log: the columns as arrays, plus helpers.
+
+    Usage:
+        log = ReplayLog.load("run_task_1.rlog")
+        for step, kind, body, args, values in log.events(): ...
+        poses, joints = log.as_arrays()      # NumPy, for training data
+    """
+
+    def __init__(self, data):
+        if len(data) < _HEADER.size:
+            raise ReplayLogError("File too short for a replay log header")
+        (magic, version, _, n_events, n_snapshots, n_bodies, n_joints,
+         snapshot_every, total_steps, meta_bytes, time_step) = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ReplayLogError("Not a replay log (bad magic)")
+        if version != FORMAT_VERSION:
+            raise ReplayLogError(f"Unsupported replay log version {version} (expected {FORMAT_VERSION})")
+
+        self.snapshot_every = snapshot_every
+        self.total_steps = total_steps
+        self.time_step = time_step
+        self.n_events = n_events
+        self.n_snapshots = n_snapshots
+        pos = _HEADER.size
+
+        def read(typecode, count):
+            nonlocal pos
+            column = array(typecode)
+            end = pos + column.itemsize * count
+            if end > len(data):
+                raise ReplayLogError("Truncated replay log")
+            column.frombytes(data[pos:end])
+            if sys.byteorder != "little":
+                column.byteswap()
+            pos = end
+            return column
+
+        self.bodies = read("i", n_bodies)
+        self.joints = read("I", n_bodies)
+        self.ev_step = read("I", n_events)
+        self.ev_kind = read("I", n_events)
+        self.ev_body = read("i", n_events)
+        self.ev_arg = read("i", 3 * n_events)
+        self.ev_value = read("d", 3 * n_events)
+        self.snap_step = read("I", n_snapshots)
+        self.snap_pose = read("f", n_snapshots * n_bodies * 7)
+        self.snap_joint = read("f", n_snapshots * n_joints)
+        self.meta = json.loads(bytes(data[pos:pos + meta_bytes]).decode("utf-8")) if meta_bytes else {}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def events(self):
+        """(step, kind, body, (arg0, arg1, arg2), (v0, v1, v2)) in recorded order"""
+        for i in range(self.n_events):
+            yield (self.ev_step[i], self.ev_kind[i], self.ev_body[i],
+                   tuple(self.ev_arg[3 * i:3 * i + 3]), tuple(self.ev_value[3 * i:3 * i + 3]))
+
+    def snapshot(self, i):
+        """(step, {body: (pos, orn)}, {body: [joint positions]}) of the i-th snapshot"""
+        n_bodies = len(self.bodies)
+        n_joints = sum(self.joints)
+        pose = self.snap_pose[i * n_bodies * 7:(i + 1) * n_bodies * 7]
+        joint = self.snap_joint[i * n_joints:(i + 1) * n_joints]
+        poses, joints, offset = {}, {}, 0
+        for k, (body, count) in enumerate(zip(self.bodies, self.joints)):
+            poses[body] = (tuple(pose[7 * k:7 * k + 3]), tuple(pose[7 * k + 3:7 * k + 7]))
+            joints[body] = list(joint[offset:offset + count])
+            offset += count
+        return self.snap_step[i], poses, joints
+
+    def as_arrays(self):
+        """Snapshots as NumPy arrays: poses (n_snapshots, n_bodies, 7), joints (n_snapshots, n_joints)"""
+        import numpy as np
+
+        poses = np.frombuffer(self.snap_pose, dtype=np.float32).reshape(self.n_snapshots, len(self.bodies), 7)
+        joints = np.frombuffer(self.snap_joint, dtype=np.float32).reshape(self.n_snapshots, sum(self.joints))
+        return poses, joints
+
+    def summary(self):
+        counts = [0] * len(EVENT_NAMES)
+        for kind in self.ev_kind:
+            counts[kind] += 1
+        meta = {key: value for key, value in self.meta.items() if key != "initial_poses"}
+        return {"steps": self.total_steps, "snapshots": self.n_snapshots, "bodies": len(self.bodies),
+                **{name: count for name, count in zip(EVENT_NAMES, counts)}, "meta": meta}
+
+    def restore_initial_poses(self):
+        """
+        Move every body to its recorded start pose (the scene may have been
+        perturbed). Bodies of a run that was not started from reset_poses are
+        left alone when they already are at that pose, since a reset is not
+        bit-exact.
+        """
+        always = self.meta.get("initial_poses_reset", True)
+        for body, (pos, orn) in self.meta.get("initial_poses", {}).items():
+            if always or [list(value) for value in p.getBasePositionAndOrientation(int(body))] != [pos, orn]:
+                p.resetBasePositionAndOrientation(int(body), pos, orn)
+
+
+def _apply_event(kind, body, args, values, constraints):
+    if kind == MOTOR:
+        if math.isnan(values[1]):
+            p.setJointMotorControl2(body, args[0], p.POSITION_CONTROL, values[0])
+        else:
+            p.setJointMotorControl2(body, args[0], p.POSITION_CONTROL, values[0], maxVelocity=values[1])
+    elif kind == GRIPPER:
+        p.setJointMotorControl2(body, args[0], p.POSITION_CONTROL, targetPosition=values[0])
+    elif kind == CONSTRAINT:
+        constraints[args[2]] = p.createConstraint(
+            parentBodyUniqueId=body, parentLinkIndex=args[0], childBodyUniqueId=args[1], childLinkIndex=-1,
+            jointType=p.JOINT_FIXED, jointAxis=[0, 0, 0], parentFramePosition=list(values),
+            childFramePosition=[0, 0, 0])
+    elif kind == RELEASE:
+        constraint_id = constraints.pop(args[2], None)
+        if constraint_id is not None:
+            p.removeConstraint(constraint_id)
+
+
+def _deviation(log, i):
+    # Largest body position difference (meters) between the world and snapshot i
+    _, poses, _ = log.snapshot(i)
+    worst = 0.0
+    for body, (pos, _) in poses.items():
+        current, _ = p.getBasePositionAndOrientation(body)
+        worst = max(worst, max(abs(a - b) for a, b in zip(current, pos)))
+    return worst
+
+
+def replay_physics(log, sleep_time=0.0):
+    """
+    Re-drive the loaded scene from the recorded commands, stepping physics.
+
+    The scene must be set up exactly as when recording (same bodies, same
+    physics parameters). Returns the largest deviation from the recorded
+    snapshots (meters).
+    """
+    p.setTimeStep(log.time_step)
+    constraints = {}
+    events = log.events()
+    pending = next(events, None)
+    next_snapshot = 1  # Snapshot 0 is the initial state
+    max_deviation = 0.0
+    for step in range(log.total_steps + 1):
+        while pending is not None and pending[0] == step:
+            _apply_event(*pending[1:], constraints)
+            pending = next(events, None)
+        while next_snapshot < log.n_snapshots and log.snap_step[next_snapshot] == step:
+            max_deviation = max(max_deviation, _deviation(log, next_snapshot))
+            next_snapshot += 1
+        if step < log.total_steps:
+            p.stepSimulation()
+            if sleep_time:
+                time.sleep(sleep_time)
+    return max_deviation
+
+
+def replay_kinematic(log, sleep_time=0.0):
+    """Pose the scene from each snapshot in turn (no physics; for rendering)"""
+    for i in range(log.n_snapshots):
+        _, poses, joints = log.snapshot(i)
+        for body, (pos, orn) in poses.items():
+            p.resetBasePositionAndOrientation(body, pos, orn)
+            for joint, position in enumerate(joints[body]):
+                p.resetJointState(body, joint, position)
+        if sleep_time:
+            time.sleep(sleep_time)
+
+
+_recorder = None
+
+
+def get_recorder():
+    return _recorder
+
+
+def reset_poses():
+    """
+    Reset every body to its current pose, as restore_initial_poses does on
+    replay (a get/reset round trip is not bit-exact, and a reset also zeroes
+    velocities). Call before start_recording when the replay must match the
+    run exactly and pass the result as meta["initial_poses"].
+
+    Returns:
+        Dict body ID (str) -> [position, orientation] passed to the reset
+    """
+    poses = {}
+    for i in range(p.getNumBodies()):
+        body = p.getBodyUniqueId(i)
+        pos, orn = p.getBasePositionAndOrientation(body)
+        p.resetBasePositionAndOrientation(body, pos, orn)
+        poses[str(body)] = [list(pos), list(orn)]
+    return poses
+
+
+def start_recording(snapshot_every=SNAPSHOT_EVERY, meta=None):
+    """Install and return a recorder for the current scene"""
+    global _recorder
+    _recorder = ReplayRecorder(snapshot_every, meta)
+    return _recorder
+
+
+def stop_recording(path=None):
+    """Uninstall the recorder, writing it to path if given"""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None and path:
+        if recorder.snap_step[-1] != recorder.steps:
+            recorder.snapshot()  # Final state
+        recorder.write(path)
+    return recorder
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a run from its replay log")
+    parser.add_argument("log", help="Replay log file")
+    parser.add_argument("--task", type=int, default=None, help="Task scene to replay in (omit to only summarize)")
+    parser.add_argument("--kinematic", action="store_true", help="Pose from snapshots instead of re-driving physics")
+    parser.add_argument("--gui", action="store_true")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the physics configuration")
+    args = parser.parse_args()
+
+    replay = ReplayLog.load(args.log)
+    print(f"[INFO] {replay.summary()}")
+    if args.task is None:
+        sys.exit(0)
+
+    from robot import determinism
+
+    p.connect(p.GUI if args.gui else p.DIRECT)
+    env = importlib.import_module(f"Task{args.task}.environment").Environment()
+    env.setup_simulation()
+    replay.restore_initial_poses()
+    determinism.configure_physics(args.seed, time_step=replay.time_step)
+    delay = replay.time_step if args.gui else 0.0
+    start = time.perf_counter()
+    if args.kinematic:
+        replay_kinematic(replay, delay * replay.snapshot_every)
+        print(f"[INFO] Posed {replay.n_snapshots} snapshots in {time.perf_counter() - start:.2f}s")
+    else:
+        deviation = replay_physics(replay, delay)
+        print(f"[INFO] Replayed {replay.total_steps} steps in {time.perf_counter() - start:.2f}s, "
+              f"max deviation from the recording {deviation * 1000:.3f} mm")
+    print(f"[INFO] Final world digest {determinism.world_digest()}")
+    p.disconnect()
@@ -5,6 +5,9 @@ Contains primitive actions for robot manipulation: pick, place, move, sweep.
 
 import pybullet as p
 import time
+from robot import determinism, replay_log
+from telemetry import profiling, tracing
+from telemetry.log import get_logger
 
 # ============ CONFIGURATION CONSTANTS ============
 SIMULATION_STEPS = 50       # Default simulation steps per action
@@ -13,7 +16,16 @@ GRIPPER_CLOSE = 0.0         # Gripper closed position
 APPROACH_HEIGHT = 0.3       # Height above object for approach
 GRASP_HEIGHT = 0.12         # Height for grasping object
 PLACE_HEIGHT = 0.15         # Height for placing object
-DEFAULT_SLEEP = 0.01        # Sleep time between simulation steps
+DEFAULT_SLEEP = 0.01        # Sleep time between simulation steps (0 for headless runs)
+GRASP_CONTACT_TOLERANCE = 0.005  # Max finger-object gap counted as contact (meters)
+HANDOFF_CONTACT_TOLERANCE = 0.06  # Same, when taking an object over at a handoff point: the points
+                                  # sit at the edge of both arms' reach and a released object lands
+                                  # a few cm toward the giver, so the receiver's fingers close up to
+                                  # ~5 cm short of it
+VERIFY_GRASP = True         # Require finger contact before attaching a picked object
+GRASP_FRAME = [0.15, 0.0, -0.005]  # Held object position in the end-effector frame
+
+log = get_logger("robot")
 
 
 def get_position(obj_id):
@@ -22,13 +34,22 @@ def get_position(obj_id):
     return (pos[0], pos[1], pos[2])
 
 
-def wait_simulation(steps=SIMULATION_STEPS, sleep_time=DEFAULT_SLEEP):
-    """Step the simulation forward and wait."""
+@profiling.profile("wait_simulation")
+def wait_simulation(steps=SIMULATION_STEPS, sleep_time=None):
+    """Step the simulation forward and wait (sleep_time None = DEFAULT_SLEEP, read per call)."""
+    if sleep_time is None:
+        sleep_time = DEFAULT_SLEEP
+    recorder = replay_log.get_recorder()
     for _ in range(steps):
         p.stepSimulation()
+        if recorder is not None:
+            recorder.on_step()
         time.sleep(sleep_time)
+    tracing.add_steps(steps)
+    determinism.yield_turn()  # Next robot's turn in a deterministic run
 
 
+@profiling.profile("move_to_target")
 def move_to_target(robot_id, target_pos, target_orn):
     if target_orn is None:
         eef_state = p.getLinkState(robot_id.id, robot_id.eef_id)
@@ -39,6 +60,7 @@ def move_to_target(robot_id, target_pos, target_orn):
     wait_simulation(50)
 
 
+@profiling.profile("set_gripper")
 def set_gripper(robot_id, open_length):
     open_length = max(robot_id.gripper_range[0],
                       min(open_length, robot_id.gripper_range[1]))
@@ -47,25 +69,67 @@ def set_gripper(robot_id, open_length):
     return True
 
 
-def pick(robot_id, object_id, target_pos=None):
+def _record_constraint(robot_id, object_id, constraint_id):
+    recorder = replay_log.get_recorder()
+    if recorder is not None:
+        recorder.constraint(robot_id.id, robot_id.eef_id, object_id, constraint_id, GRASP_FRAME)
+
+
+def _record_release(constraint_id):
+    recorder = replay_log.get_recorder()
+    if recorder is not None:
+        recorder.release(constraint_id)
+
+
+def verify_grasp(robot_id, object_id, tolerance=GRASP_CONTACT_TOLERANCE):
+    """
+    Check that the gripper fingers are touching the object.
+
+    Args:
+        robot_id: Robot instance
+        object_id: PyBullet object ID that should be grasped
+        tolerance: Max finger-object distance still counted as contact
+
+    Returns:
+        True if at least one finger link is in contact with the object
+    """
+    for link_id in robot_id.finger_link_ids:
+        if p.getContactPoints(bodyA=robot_id.id, bodyB=object_id, linkIndexA=link_id):
+            return True
+        if p.getClosestPoints(robot_id.id, object_id, tolerance, linkIndexA=link_id):
+            return True
+    return False
+
+
+@profiling.profile("pick")
+def pick(robot_id, object_id, target_pos=None, verify=None, handoff=False):
     """
     Pick up an object at target position.
     
-    Sequence: Home pose -> Approach -> Grasp -> Close gripper -> Lift
+    Sequence: Home pose -> Approach -> Grasp -> Close gripper -> Verify -> Lift
     
     Args:
         robot_id: Robot instance
         object_id: PyBullet object ID to pick
         target_pos: [x, y, z] position of object
+        verify: Check finger contacts before attaching the object
+            (defaults to VERIFY_GRASP)
+        handoff: The object was left at a handoff point by another robot
+            (verified with HANDOFF_CONTACT_TOLERANCE)
     
     Returns:
-        constraint_id: PyBullet constraint ID (for attaching object to gripper)
+        constraint_id: PyBullet constraint ID (for attaching object to gripper),
+            or None if the grasp failed
     """
     # Move to home position first
-    target_joint_positions = [0, -1.57, 1.57, -1.5, -1.57, 0.0]
-    for i, joint_id in enumerate(robot_id.arm_controllable_joints):
-        p.setJointMotorControl2(robot_id.id, joint_id, p.POSITION_CONTROL, target_joint_positions[i])
-    wait_simulation(steps=200)
+    with tracing.span("home", "primitive"):
+        target_joint_positions = [0, -1.57, 1.57, -1.5, -1.57, 0.0]
+        recorder = replay_log.get_recorder()
+        for i, joint_id in enumerate(robot_id.arm_controllable_joints):
+            p.setJointMotorControl2(robot_id.id, joint_id, p.POSITION_CONTROL, target_joint_positions[i])
+            if recorder is not None:
+                recorder.motor(robot_id.id, joint_id, target_joint_positions[i])
+        wait_simulation(steps=200)
 
     # Get current end-effector orientation
     eef_state = p.getLinkState(robot_id.id, robot_id.eef_id)
@@ -73,16 +137,33 @@ def pick(robot_id, object_id, target_pos=None):
 
     # Step 1: Move to approach position (above object)
     approach_pos = [target_pos[0], target_pos[1], target_pos[2] + APPROACH_HEIGHT]
-    robot_id.move_arm_ik(approach_pos, eef_orientation)
-    wait_simulation(50)
-
-    # Step 2: Lower to grasp position
-    grasp_pos = [target_pos[0], target_pos[1], target_pos[2] + GRASP_HEIGHT]
-    robot_id.move_arm_ik(grasp_pos, eef_orientation)
-    wait_simulation(50)
-
-    # Step 3: Close gripper
-    set_gripper(robot_id, GRIPPER_CLOSE)
+    with tracing.span("approach", "primitive"):
+        robot_id.move_arm_ik(approach_pos, eef_orientation)
+        wait_simulation(50)
+
+    with tracing.span("grasp", "primitive") as grasp_span:
+        # Step 2: Lower to grasp position
+        grasp_pos = [target_pos[0], target_pos[1], target_pos[2] + GRASP_HEIGHT]
+        robot_id.move_arm_ik(grasp_pos, eef_orientation)
+        wait_simulation(50)
+
+        # Step 3: Close gripper
+        set_gripper(robot_id, GRIPPER_CLOSE)
+
+        # Step 3b: Verify the fingers actually closed on the object
+        if verify is None:
+            verify = VERIFY_GRASP
+        tolerance = HANDOFF_CONTACT_TOLERANCE if handoff else GRASP_CONTACT_TOLERANCE
+        grasped = not verify or verify_grasp(robot_id, object_id, tolerance)
+        grasp_span.set(grasped=grasped)
+
+    if not grasped:
+        log.warning("Grasp verification failed: no finger contact with object %s", object_id)
+        with tracing.span("release", "primitive"):
+            set_gripper(robot_id, GRIPPER_OPEN)
+            robot_id.move_arm_ik(approach_pos, eef_orientation)
+            wait_simulation(50)
+        return None
 
     # Step 4: Create fixed constraint to attach object to gripper
     try:
@@ -93,21 +174,24 @@ def pick(robot_id, object_id, target_pos=None):
             childLinkIndex=-1,
             jointType=p.JOINT_FIXED,
             jointAxis=[0, 0, 0],
-            parentFramePosition=[0.15, 0.0, -0.005],
+            parentFramePosition=GRASP_FRAME,
             childFramePosition=[0, 0, 0]
         )
-        print(f"Constraint created: {constraint_id}")
+        log.debug("Constraint created: %s", constraint_id)
+        _record_constraint(robot_id, object_id, constraint_id)
     except Exception as e:
-        print(f"Failed to create constraint: {e}")
+        log.error("Failed to create constraint: %s", e)
         constraint_id = None
 
     # Step 5: Lift object
-    robot_id.move_arm_ik([target_pos[0], target_pos[1], target_pos[2] + 0.4], eef_orientation)
-    wait_simulation(50)
+    with tracing.span("lift", "primitive"):
+        robot_id.move_arm_ik([target_pos[0], target_pos[1], target_pos[2] + 0.4], eef_orientation)
+        wait_simulation(50)
 
     return constraint_id
 
 
+@profiling.profile("place")
 def place(agent_name, target_pos, constraint_id, robot_ids):
     """
     Place an object at target position.
@@ -121,48 +205,71 @@ def place(agent_name, target_pos, constraint_id, robot_ids):
         robot_ids: Dict mapping agent names to robot instances
     """
     if constraint_id is None:
-        print("No constraint found. Cannot place object.")
+        log.warning("No constraint found. Cannot place object.")
         return
     robot_id = robot_ids[agent_name]
 
     eef_state = p.getLinkState(robot_id.id, robot_id.eef_id)
     eef_orientation = eef_state[1]
 
-    # Step 1: Move above target position
-    robot_id.move_arm_ik([target_pos[0], target_pos[1], target_pos[2] + 0.3], eef_orientation)
-    wait_simulation(50)
+    with tracing.span("approach", "primitive"):
+        # Step 1: Move above target position
+        robot_id.move_arm_ik([target_pos[0], target_pos[1], target_pos[2] + 0.3], eef_orientation)
+        wait_simulation(50)
 
-    # Step 2: Lower toward target
-    robot_id.move_arm_ik([target_pos[0], target_pos[1], target_pos[2] + 0.2], eef_orientation)
-    wait_simulation(50)
+        # Step 2: Lower toward target
+        robot_id.move_arm_ik([target_pos[0], target_pos[1], target_pos[2] + 0.2], eef_orientation)
+        wait_simulation(50)
 
-    # Step 3: Open gripper to release object
-    robot_id.move_gripper(GRIPPER_OPEN)
-    wait_simulation(20)
+    with tracing.span("release", "primitive"):
+        # Step 3: Open gripper to release object
+        robot_id.move_gripper(GRIPPER_OPEN)
+        wait_simulation(20)
 
-    # Step 4: Remove constraint to detach object from gripper
-    if constraint_id:
-        p.removeConstraint(constraint_id)
+        # Step 4: Remove constraint to detach object from gripper
+        if constraint_id:
+            p.removeConstraint(constraint_id)
+            _record_release(constraint_id)
 
     # Step 5: Lift arm and return to home position
-    robot_id.move_arm_ik([target_pos[0], target_pos[1], target_pos[2] + 0.3], eef_orientation)
-    wait_simulation(50)
+    with tracing.span("lift", "primitive"):
+        robot_id.move_arm_ik([target_pos[0], target_pos[1], target_pos[2] + 0.3], eef_orientation)
+        wait_simulation(50)
 
-    move_to_home(robot_id)
-    wait_simulation(50)
+    with tracing.span("home", "primitive"):
+        move_to_home(robot_id)
+        wait_simulation(50)
+
+
+def release(robot_id, constraint_id):
+    """
+    Drop a held object where it is: open the gripper and detach the object,
+    without moving the arm. Used when the task that would have put the
+    object down failed or was skipped.
+
+    Args:
+        robot_id: Robot instance holding the object
+        constraint_id: PyBullet constraint ID from pick action
+    """
+    robot_id.move_gripper(GRIPPER_OPEN)
+    p.removeConstraint(constraint_id)
+    _record_release(constraint_id)
 
 
+@profiling.profile("sweep")
 def sweep(robot_id, obj_id, sweep_count=2, z_height=0.15, sweep_distance=0.3):
     target_pos = get_position(obj_id)
     downward_orientation = p.getQuaternionFromEuler([0, 1.57, 0])
-    set_gripper(robot_id, GRIPPER_OPEN)
-    approach_pos = [target_pos[0], target_pos[1], target_pos[2] + APPROACH_HEIGHT]
-    move_to_target(robot_id, approach_pos, downward_orientation)
+    with tracing.span("approach", "primitive"):
+        set_gripper(robot_id, GRIPPER_OPEN)
+        approach_pos = [target_pos[0], target_pos[1], target_pos[2] + APPROACH_HEIGHT]
+        move_to_target(robot_id, approach_pos, downward_orientation)
 
-    grasp_pos = [target_pos[0], target_pos[1], target_pos[2] + GRASP_HEIGHT]
-    move_to_target(robot_id, grasp_pos, downward_orientation)
+    with tracing.span("grasp", "primitive"):
+        grasp_pos = [target_pos[0], target_pos[1], target_pos[2] + GRASP_HEIGHT]
+        move_to_target(robot_id, grasp_pos, downward_orientation)
 
-    set_gripper(robot_id, GRIPPER_CLOSE)
+        set_gripper(robot_id, GRIPPER_CLOSE)
 
 
     try:
@@ -173,41 +280,47 @@ def sweep(robot_id, obj_id, sweep_count=2, z_height=0.15, sweep_distance=0.3):
             childLinkIndex=-1,
             jointType=p.JOINT_FIXED,
             jointAxis=[0, 0, 0],
-            parentFramePosition=[0.15, 0.0, -0.005],
+            parentFramePosition=GRASP_FRAME,
             childFramePosition=[0, 0, 0]
         )
-        print(f"Constraint created: {constraint_id}")
+        log.debug("Constraint created: %s", constraint_id)
+        _record_constraint(robot_id, obj_id, constraint_id)
     except Exception as e:
-        print(f"Failed to create constraint: {e}")
+        log.error("Failed to create constraint: %s", e)
         constraint_id = None
         return
 
     sweep_pos = [target_pos[0], target_pos[1], z_height + 0.1]
-    move_to_target(robot_id, sweep_pos, downward_orientation)
+    with tracing.span("sweep", "primitive", passes=sweep_count):
+        move_to_target(robot_id, sweep_pos, downward_orientation)
 
-    center_y = target_pos[1]
-    pos1 = [target_pos[0], center_y - sweep_distance / 2, z_height]
-    pos2 = [target_pos[0], center_y + sweep_distance / 2, z_height]
+        center_y = target_pos[1]
+        pos1 = [target_pos[0], center_y - sweep_distance / 2, z_height]
+        pos2 = [target_pos[0], center_y + sweep_distance / 2, z_height]
 
-    for i in range(sweep_count):
-        move_to_target(robot_id, pos1, downward_orientation)
-        wait_simulation(30)
-        move_to_target(robot_id, pos2, downward_orientation)
-        wait_simulation(30)
+        for i in range(sweep_count):
+            move_to_target(robot_id, pos1, downward_orientation)
+            wait_simulation(30)
+            move_to_target(robot_id, pos2, downward_orientation)
+            wait_simulation(30)
 
 
-    move_to_target(robot_id, sweep_pos, downward_orientation)
-    wait_simulation(30)
+        move_to_target(robot_id, sweep_pos, downward_orientation)
+        wait_simulation(30)
 
-    set_gripper(robot_id, GRIPPER_OPEN)
-    if constraint_id:
-        p.removeConstraint(constraint_id)
+    with tracing.span("release", "primitive"):
+        set_gripper(robot_id, GRIPPER_OPEN)
+        if constraint_id:
+            p.removeConstraint(constraint_id)
+            _record_release(constraint_id)
 
-    final_pos = [target_pos[0], target_pos[1], target_pos[2] + 0.4]
-    move_to_target(robot_id, final_pos, downward_orientation)
-    wait_simulation(50)
+    with tracing.span("lift", "primitive"):
+        final_pos = [target_pos[0], target_pos[1], target_pos[2] + 0.4]
+        move_to_target(robot_id, final_pos, downward_orientation)
+        wait_simulation(50)
 
-    move_to_home(robot_id)
+    with tracing.span("home", "primitive"):
+        move_to_home(robot_id)
 
 
 def move_to_home(robot_id):
@@ -216,6 +329,7 @@ def move_to_home(robot_id):
 
 
 def move_arm_to_joint_positions(robot_id, joint_positions):
+    recorder = replay_log.get_recorder()
     for i, joint_id in enumerate(robot_id.arm_controllable_joints):
         p.setJointMotorControl2(
             robot_id.id,
@@ -224,4 +338,6 @@ def move_arm_to_joint_positions(robot_id, joint_positions):
             joint_positions[i],
             maxVelocity=robot_id.max_velocity
         )
+        if recorder is not None:
+            recorder.motor(robot_id.id, joint_id, joint_positions[i], robot_id.max_velocity)
     wait_simulation()
\ No newline at end of file
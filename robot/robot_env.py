@@ -3,6 +3,8 @@ import math
 from collections import namedtuple
 import pybullet_data
 from paths import ROBOT_URDF
+from robot import replay_log
+from telemetry import profiling
 
 
 class UR5Robotiq85:
@@ -67,6 +69,12 @@ class UR5Robotiq85:
                 jointInfo(jointID, jointName, jointType, jointLowerLimit, jointUpperLimit, jointMaxForce, jointMaxVelocity, controllable)
             )
 
+        # Finger links (outer/inner fingers and pads) used for grasp contact checks
+        self.finger_link_ids = [
+            i for i in range(p.getNumJoints(self.id))
+            if 'finger' in p.getJointInfo(self.id, i)[12].decode("utf-8")
+        ]
+
         self.arm_controllable_joints = self.controllable_joints[:self.arm_num_dofs]
         self.arm_lower_limits = [j.lowerLimit for j in self.joints if j.controllable][:self.arm_num_dofs]
         self.arm_upper_limits = [j.upperLimit for j in self.joints if j.controllable][:self.arm_num_dofs]
@@ -99,6 +107,7 @@ class UR5Robotiq85:
             target_pos: [x, y, z] target end-effector position
             target_orn: quaternion [x, y, z, w] target orientation
         """
+        profiling.add_ik_call()
         joint_poses = p.calculateInverseKinematics(
             self.id, self.eef_id, target_pos, target_orn,
             lowerLimits=self.arm_lower_limits,
@@ -107,8 +116,11 @@ class UR5Robotiq85:
             restPoses=self.arm_rest_poses,
         )
         # Apply joint positions with velocity control
+        recorder = replay_log.get_recorder()
         for i, joint_id in enumerate(self.arm_controllable_joints):
             p.setJointMotorControl2(self.id, joint_id, p.POSITION_CONTROL, joint_poses[i], maxVelocity=self.max_velocity)
+            if recorder is not None:
+                recorder.motor(self.id, joint_id, joint_poses[i], self.max_velocity)
 
     def move_gripper(self, open_length):
         """
@@ -121,6 +133,9 @@ class UR5Robotiq85:
         # Convert linear opening to joint angle using gripper geometry
         open_angle = 0.715 - math.asin((open_length - 0.010) / 0.1143)
         p.setJointMotorControl2(self.id, self.mimic_parent_id, p.POSITION_CONTROL, targetPosition=open_angle)
+        recorder = replay_log.get_recorder()
+        if recorder is not None:
+            recorder.gripper(self.id, self.mimic_parent_id, open_angle, open_length)
 
 
 
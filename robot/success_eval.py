@@ -0,0 +1,211 @@
+"""
+Success Evaluation Module
+Checks the end state of a run against the task goal: every item must be in
+(bowl, box, drawer, ...) or on (plate, tray, shelf) its destination. Both
+mean the item's center lies over the destination's footprint and its bottom
+within the destination's height band (plates are shallow dishes, so an item
+on one sits below the rim). Items stacked on other items count as well, as
+long as the bottom of the stack satisfies the goal.
+
+Goals come from a plan's final place of each item (for the tasks: the
+ground-truth plan in task_plan_truth/) or, without a plan, from the scene's
+object names (AI_module.assignment.infer_destinations). Poses and AABBs of
+the goal bodies are read once into arrays and all predicates are tested
+together with NumPy, so a check costs under a millisecond per episode.
+
+Usage:
+    goals = goals_for_task(5)
+    result = evaluate(goals, env.objects)   # After the run, same PyBullet connection
+    result["success"], result["unmet"]
+
+    # Final state of a replay log (robot/replay_log.py)
+    python robot/success_eval.py run_task_5.rlog --task 5
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pybullet as p
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.assignment import infer_destinations
+from paths import PROJECT_ROOT
+
+TRUTH_DIR = os.path.join(PROJECT_ROOT, "task_plan_truth")
+SURFACE_KEYWORDS = ("plate", "tray", "shelf")  # Destinations items rest on; other containers hold them
+XY_MARGIN = 0.01    # Meters an item's center may lie outside the destination's footprint
+Z_TOLERANCE = 0.03  # Meters an item's bottom may lie outside the destination's height band, or off its support
+
+
+def relation_for(destination):
+    """"on" for surfaces, "in" for containers (reporting only; the test is the same)"""
+    return "on" if any(keyword in destination.lower() for keyword in SURFACE_KEYWORDS) else "in"
+
+
+def goals_from_plan(commands):
+    """
+    Goal predicates from a plan: the destination of each item's last place.
+
+    Args:
+        commands: Command dicts (export_json format)
+
+    Returns:
+        List of (item, relation, destination) tuples
+    """
+    destinations = {}
+    for command in commands:
+        if command["action"] == "place" and command.get("destination"):
+            destinations[command["object"]] = command["destination"]
+    return [(item, relation_for(dest), dest) for item, dest in destinations.items()]
+
+
+def goals_from_scene(object_names):
+    """Goal predicates guessed from object names (see assignment.infer_destinations)"""
+    return [(item, relation_for(dest), dest) for item, dest in infer_destinations(object_names).items()]
+
+
+def goals_for_task(task):
+    """Goal predicates of TaskN: its ground-truth plan, else the scene's object names"""
+    path = os.path.join(TRUTH_DIR, f"commands_task_{task}.json")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return goals_from_plan(json.load(f))
+    env = importlib.import_module(f"Task{task}.environment").Environment()
+    return goals_from_scene(env.get_object_names())
+
+
+def read_state(bodies):
+    """
+    Base positions and AABBs of bodies in one pass.
+
+    Returns:
+        (positions (N, 3), aabbs (N, 6) as [min xyz, max xyz]); a body's
+        AABB covers its base and all links (drawers, hollow boxes)
+    """
+    positions = np.empty((len(bodies), 3))
+    aabbs = np.empty((len(bodies), 6))
+    for i, body in enumerate(bodies):
+        positions[i] = p.getBasePositionAndOrientation(body)[0]
+        low, high = p.getAABB(body)
+        low, high = list(low), list(high)
+        for link in range(p.getNumJoints(body)):
+            link_low, link_high = p.getAABB(body, link)
+            low = [min(a, b) for a, b in zip(low, link_low)]
+            high = [max(a, b) for a, b in zip(high, link_high)]
+        aabbs[i, :3], aabbs[i, 3:] = low, high
+    return positions, aabbs
+
+
+def check_goals(item_xy, item_bottom, item_aabbs, dest_aabbs, dest_ids):
+    """
+    Vectorized goal test over G goals.
+
+    Args:
+        item_xy: (G, 2) item base x, y
+        item_bottom: (G,) item AABB min z
+        item_aabbs: (G, 6) item AABBs (supports for stacking)
+        dest_aabbs: (G, 6) AABB of each goal's destination
+        dest_ids: (G,) destination identifiers (equal for goals sharing a destination)
+
+    Returns:
+        (G,) bool array, True where the goal holds
+    """
+    def within(xy, aabbs):
+        return np.all((xy >= aabbs[..., :2] - XY_MARGIN) & (xy <= aabbs[..., 3:5] + XY_MARGIN), axis=-1)
+
+    over = within(item_xy, dest_aabbs)
+    met = over & (item_bottom >= dest_aabbs[:, 2] - Z_TOLERANCE) & (item_bottom <= dest_aabbs[:, 5] + Z_TOLERANCE)
+
+    # stacked[i, j]: item i rests on item j. A goal also holds when its item rests on
+    # an item that meets a goal with the same destination (propagated up the stack)
+    stacked = within(item_xy[:, None, :], item_aabbs[None, :, :]) & \
+        (np.abs(item_bottom[:, None] - item_aabbs[None, :, 5]) <= Z_TOLERANCE)
+    np.fill_diagonal(stacked, False)
+    stacked &= (dest_ids[:, None] == dest_ids[None, :]) & over[:, None]
+    for _ in range(len(met)):
+        grown = met | np.any(stacked & met[None, :], axis=1)
+        if np.array_equal(grown, met):
+            break
+        met = grown
+    return met
+
+
+def evaluate(goals, object_map):
+    """
+    Test the goal predicates against the current world.
+
+    Args:
+        goals: List of (item, relation, destination) tuples
+        object_map: Dict name -> PyBullet body ID
+
+    Returns:
+        Dict with success (all goals met), met, total, unmet (goal tuples)
+        and missing (goal objects not in object_map)
+    """
+    missing = sorted({name for item, _, dest in goals for name in (item, dest) if name not in object_map})
+    goals = [goal for goal in goals if goal[0] in object_map and goal[2] in object_map]
+    if not goals:
+        return {"success": not missing, "met": 0, "total": 0, "unmet": [], "missing": missing}
+
+    bodies = sorted({object_map[name] for item, _, dest in goals for name in (item, dest)})
+    index = {body: i for i, body in enumerate(bodies)}
+    positions, aabbs = read_state(bodies)
+    items = np.array([index[object_map[item]] for item, _, _ in goals])
+    dests = np.array([index[object_map[dest]] for _, _, dest in goals])
+
+    met = check_goals(positions[items, :2], aabbs[items, 2], aabbs[items], aabbs[dests], dests)
+    return {
+        "success": bool(met.all()) and not missing,
+        "met": int(met.sum()),
+        "total": len(goals),
+        "unmet": [goal for goal, ok in zip(goals, met) if not ok],
+        "missing": missing,
+    }
+
+
+def print_result(result):
+    status = "PASS" if result["success"] else "FAIL"
+    print(f"[INFO] Goal check {status}: {result['met']}/{result['total']} goals met")
+    for item, relation, dest in result["unmet"]:
+        print(f"[WARN] Unmet goal: {item} {relation} {dest}")
+    if result["missing"]:
+        print(f"[WARN] Goal objects not in the scene: {', '.join(result['missing'])}")
+
+
+if __name__ == "__main__":
+    from robot import replay_log
+
+    parser = argparse.ArgumentParser(description="Check the final state of a replay log against the task goal")
+    parser.add_argument("log", help="Replay log written with REPLAY_LOG or --log-dir")
+    parser.add_argument("--task", type=int, required=True, help="Task number of the recorded scene")
+    parser.add_argument("--plan", default=None, help="Take goals from this plan JSON instead of the ground truth")
+    args = parser.parse_args()
+
+    replay = replay_log.ReplayLog.load(args.log)
+    if args.plan:
+        with open(args.plan, encoding="utf-8") as f:
+            goals = goals_from_plan(json.load(f))
+    else:
+        goals = goals_for_task(args.task)
+
+    p.connect(p.DIRECT)
+    env = importlib.import_module(f"Task{args.task}.environment").Environment()
+    env.setup_simulation()
+    _, poses, joints = replay.snapshot(replay.n_snapshots - 1)
+    for body, (pos, orn) in poses.items():
+        p.resetBasePositionAndOrientation(body, pos, orn)
+        for joint, position in enumerate(joints[body]):
+            p.resetJointState(body, joint, position)
+
+    start = time.perf_counter()
+    result = evaluate(goals, env.objects)
+    elapsed = time.perf_counter() - start
+    print_result(result)
+    print(f"[INFO] {len(goals)} goals checked in {elapsed * 1e6:.0f}us")
+    p.disconnect()
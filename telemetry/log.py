@@ -0,0 +1,159 @@
+"""
+Logging Module
+Level-gated, per-subsystem logging with an asynchronous sink: log calls
+enqueue records and a background thread formats and writes them, so worker
+threads never block on stdout (or write while holding executor locks).
+
+Subsystems are child loggers of "dag": dag.executor, dag.robot, dag.graph, ...
+Configuration comes from configure() or the environment:
+
+    DAG_LOG_LEVEL=INFO                        Default level
+    DAG_LOG_LEVELS=executor=DEBUG,robot=WARNING   Per-subsystem levels
+    DAG_LOG_FORMAT=text|verbose|json          json = one JSON object per line
+    DAG_LOG_FILE=run.log                      Write here instead of stdout
+
+Usage:
+    from telemetry.log import get_logger
+    log = get_logger("executor")
+    log.debug("Selected task %d", task_id)       # Formatted only if enabled
+    log.info("Task %d completed", task_id, extra={"fields": {"task": task_id}})
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+ROOT_LOGGER = "dag"
+DEFAULT_LEVEL = "INFO"
+
+FORMATS = {
+    "text": "%(message)s",  # Same console output as the former print statements
+    "verbose": "%(relativeCreated)9.1f %(threadName)-10s %(name)-14s %(levelname)-7s %(message)s",
+}
+
+_listener = None
+_configured = False
+_config_lock = threading.Lock()
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per record: time, level, logger, thread, message, plus
+    any structured fields passed as extra={"fields": {...}}.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def parse_levels(spec):
+    """'executor=DEBUG,robot=WARNING' -> {"executor": "DEBUG", "robot": "WARNING"}"""
+    levels = {}
+    for part in (spec or "").split(","):
+        name, sep, level = part.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure(level=None, levels=None, fmt=None, path=None, stream=None):
+    """
+    (Re)configure the "dag" loggers; unspecified options come from the
+    DAG_LOG_* environment variables.
+
+    Args:
+        level: Default level name or number
+        levels: Dict subsystem -> level (e.g. {"robot": "WARNING"})
+        fmt: "text", "verbose" or "json"
+        path: Log file (default: stream)
+        stream: Output stream (default: sys.stdout)
+    """
+    global _listener, _configured
+    with _config_lock:
+        level = level or os.environ.get("DAG_LOG_LEVEL", DEFAULT_LEVEL)
+        levels = levels if levels is not None else parse_levels(os.environ.get("DAG_LOG_LEVELS"))
+        fmt = fmt or os.environ.get("DAG_LOG_FORMAT", "text")
+        path = path or os.environ.get("DAG_LOG_FILE")
+
+        if _listener is not None:
+            _listener.stop()  # Flushes queued records
+
+        if path:
+            sink = logging.FileHandler(path, encoding="utf-8")
+        else:
+            sink = logging.StreamHandler(stream or sys.stdout)
+        if fmt == "json":
+            sink.setFormatter(JSONFormatter())
+        elif fmt in FORMATS:
+            sink.setFormatter(logging.Formatter(FORMATS[fmt]))
+        else:
+            raise ValueError(f"Unknown log format '{fmt}' (use text, verbose or json)")
+
+        records = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(records, sink)
+        _listener.start()
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.handlers = [_QueueHandler(records)]
+        root.propagate = False
+        root.setLevel(level if isinstance(level, int) else level.upper())
+        for name in list(logging.root.manager.loggerDict):
+            if name.startswith(ROOT_LOGGER + "."):
+                logging.getLogger(name).setLevel(logging.NOTSET)
+        for subsystem, subsystem_level in levels.items():
+            logging.getLogger(f"{ROOT_LOGGER}.{subsystem}").setLevel(subsystem_level)
+        _configured = True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Format the message on the calling thread (arguments may change later),
+        # but leave the record's fields intact for the JSON formatter
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_text = None
+        return record
+
+
+def flush():
+    """Block until every queued record has been written (before printing to the same stream)"""
+    with _config_lock:
+        if _listener is not None:
+            _listener.stop()  # Drains the queue and joins the writer thread
+            _listener.start()
+
+
+def shutdown():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _config_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(subsystem):
+    """Logger for a subsystem ("executor", "robot", "graph", ...), configuring on first use"""
+    if not _configured:
+        configure()
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+atexit.register(shutdown)
@@ -0,0 +1,205 @@
+"""
+Primitive Profiling Module
+Opt-in per-primitive statistics for robot_action: call counts plus
+histograms of wall time, simulation steps and IK calls for pick, place,
+sweep, move_to_target, set_gripper and wait_simulation.
+
+Values are inclusive (a pick's numbers contain its set_gripper and
+wait_simulation calls). Profiling is off by default; a disabled hook costs
+one attribute check.
+
+Usage:
+    profiler = profiling.enable_profiling()
+    run_from_json("commands_task_1.json", robot_ids, object_map)
+    profiler.stats("pick")["wall_ms"]["p95"]     # Query while running or after
+    profiler.print_summary()
+    profiler.write("profile_task_1.json")
+
+or PRIMITIVE_PROFILE=profile_task_1.json python Task1/main.py
+"""
+
+import argparse
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from telemetry.tracing import thread_steps
+
+PROFILE_ENV = "PRIMITIVE_PROFILE"  # Profile file written by run_from_json/run_from_binary when set
+METRICS = ("wall_ms", "steps", "ik_calls")
+
+_thread_ik = threading.local()  # IK solves per thread, counted even with profiling off
+
+
+class Histogram:
+    """
+    Power-of-two bucket histogram: bucket k holds values in [2^(k-1), 2^k),
+    bucket 0 holds values below 1. Percentiles are bucket upper bounds
+    (clamped to the observed maximum), so they are within a factor of 2.
+    """
+
+    def __init__(self):
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        bucket = 0 if value < 1 else int(math.log2(value)) + 1
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(float(2 ** bucket), self.max)
+        return self.max
+
+    def to_dict(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "total": round(self.total, 3),
+            "mean": round(self.total / self.count, 3),
+            "min": round(self.min, 3),
+            "max": round(self.max, 3),
+            "p50": round(self.percentile(0.5), 3),
+            "p95": round(self.percentile(0.95), 3),
+            "buckets": {f"<{2 ** bucket}": n for bucket, n in sorted(self.buckets.items())},
+        }
+
+
+class Profiler:
+    """Thread-safe per-primitive histograms (see module docstring)"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.histograms = defaultdict(lambda: {metric: Histogram() for metric in METRICS})
+
+    def record(self, name, wall, steps, ik_calls):
+        """
+        Add one call of a primitive.
+
+        Args:
+            name: Primitive name
+            wall: Wall time (seconds)
+            steps: Simulation steps taken during the call
+            ik_calls: IK solves during the call
+        """
+        with self.lock:
+            entry = self.histograms[name]
+            entry["wall_ms"].add(wall * 1000)
+            entry["steps"].add(steps)
+            entry["ik_calls"].add(ik_calls)
+
+    def stats(self, name=None):
+        """Histogram dicts of one primitive, or {primitive: ...} for all"""
+        with self.lock:
+            if name is not None:
+                entry = self.histograms.get(name)
+                return {metric: hist.to_dict() for metric, hist in entry.items()} if entry else None
+            return {primitive: {metric: hist.to_dict() for metric, hist in entry.items()}
+                    for primitive, entry in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.stats(), f, indent=2)
+        print(f"[INFO] Primitive profile written to {path}")
+
+    def print_summary(self):
+        print_profile(self.stats())
+
+
+def print_profile(stats):
+    print("\n" + "=" * 72)
+    print(" PRIMITIVE PROFILE")
+    print("=" * 72)
+    print(f"  {'primitive':<16} {'calls':>6} {'total s':>8} {'mean ms':>9} {'p95 ms':>8} "
+          f"{'mean steps':>11} {'mean IK':>8}")
+    for name, entry in sorted(stats.items(), key=lambda item: -item[1]["wall_ms"].get("total", 0)):
+        wall, steps, ik = entry["wall_ms"], entry["steps"], entry["ik_calls"]
+        print(f"  {name:<16} {wall['count']:>6} {wall['total'] / 1000:>8.2f} {wall['mean']:>9.1f} "
+              f"{wall['p95']:>8.1f} {steps['mean']:>11.1f} {ik['mean']:>8.1f}")
+    print("=" * 72 + "\n")
+
+
+_profiler = Profiler(enabled=False)
+
+
+def get_profiler():
+    return _profiler
+
+
+def set_profiler(profiler):
+    global _profiler
+    _profiler = profiler
+    return profiler
+
+
+def enable_profiling():
+    """Install and return a new enabled global profiler"""
+    return set_profiler(Profiler(enabled=True))
+
+
+def disable_profiling():
+    return set_profiler(Profiler(enabled=False))
+
+
+def add_ik_call():
+    """Count an IK solve on the calling thread (UR5Robotiq85.move_arm_ik)"""
+    _thread_ik.count = getattr(_thread_ik, "count", 0) + 1
+
+
+def thread_ik_calls():
+    return getattr(_thread_ik, "count", 0)
+
+
+def profile(name):
+    """Decorator recording each call of a primitive on the global profiler"""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if not profiler.enabled:
+                return fn(*args, **kwargs)
+            start, steps, ik_calls = time.perf_counter(), thread_steps(), thread_ik_calls()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.record(name, time.perf_counter() - start, thread_steps() - steps,
+                                thread_ik_calls() - ik_calls)
+        return wrapper
+
+    return decorate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print a primitive profile written by the executor")
+    parser.add_argument("profile", help="Profile JSON file")
+    args = parser.parse_args()
+
+    with open(args.profile, encoding="utf-8") as f:
+        print_profile(json.load(f))
@@ -0,0 +1,249 @@
+"""
+Run Metrics Module
+Per-robot utilization for one executor run: busy, blocked and idle time,
+time spent waiting on each dependency, handoff latency, simulation steps
+per primitive and the sim-time / wall-clock ratio.
+
+The executor reports state changes and task start/finish; everything else
+is derived in report().
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import defaultdict
+
+SIM_TIME_STEP = 1.0 / 240.0  # PyBullet default time step (seconds)
+REPORT_ENV = "EXECUTION_REPORT"  # Report file written by run_from_json/run_from_binary when set
+STATES = ("busy", "blocked", "idle")
+
+
+class RunMetrics:
+    """
+    Thread-safe collector fed by RobotExecutor.
+
+    Agent states:
+        busy     executing a task
+        blocked  has tasks left, none eligible yet (dependencies or holding)
+        idle     no tasks of its own left (waiting for the run to finish)
+
+    Usage:
+        metrics = RunMetrics(["robot1", "robot2"])
+        ...executor run...
+        metrics.finish()
+        metrics.print_summary()
+        metrics.write("report.json")
+    """
+
+    def __init__(self, agents):
+        self.agents = list(agents)
+        self.lock = threading.Lock()
+        self.start_time = time.perf_counter()
+        self.end_time = None
+        self.state = {agent: ("idle", self.start_time) for agent in self.agents}
+        self.state_time = {agent: dict.fromkeys(STATES, 0.0) for agent in self.agents}
+        self.tasks = {}  # Task ID -> record
+
+    def set_state(self, agent, state, now=None):
+        """Switch an agent's state; the time since the last switch goes to the old state"""
+        now = now if now is not None else time.perf_counter()
+        with self.lock:
+            current, since = self.state[agent]
+            if current == state:
+                return
+            self.state_time[agent][current] += now - since
+            self.state[agent] = (state, now)
+
+    def task_started(self, task, agent, steps, sim_clock=None):
+        """
+        Record a task start; the agent becomes busy.
+
+        Args:
+            task: Command dict
+            agent: Executing agent
+            steps: Simulation steps taken so far on the worker thread
+            sim_clock: Simulation steps taken so far by all robots (tracing.world_steps)
+        """
+        now = time.perf_counter()
+        with self.lock:
+            state, since = self.state[agent]
+            self.tasks[task["id"]] = {
+                "id": task["id"], "agent": agent, "action": task["action"], "object": task["object"],
+                "destination": task.get("destination", ""),
+                "start": now - self.start_time, "end": None,
+                "blocked_since": since - self.start_time if state == "blocked" else None,
+                "start_steps": steps, "steps": 0, "status": "running", "attempts": 1,
+                "sim_start": sim_clock, "sim_end": None,
+            }
+        self.set_state(agent, "busy", now)
+
+    def task_retried(self, task_id):
+        """Count another attempt of a running task (a pick retried after a failed grasp)"""
+        with self.lock:
+            record = self.tasks.get(task_id)
+            if record is not None:
+                record["attempts"] += 1
+
+    def task_finished(self, task_id, steps, status="completed", sim_clock=None):
+        now = time.perf_counter()
+        with self.lock:
+            record = self.tasks.get(task_id)
+            if record is None or record["end"] is not None:
+                return  # Failed before it started
+            record["end"] = now - self.start_time
+            record["steps"] = steps - record.pop("start_steps")
+            record["sim_end"] = sim_clock
+            record["status"] = status
+
+    def finish(self):
+        """Close the run: every agent's current state runs until now"""
+        now = time.perf_counter()
+        with self.lock:
+            self.end_time = now
+            for agent in self.agents:
+                current, since = self.state[agent]
+                self.state_time[agent][current] += now - since
+                self.state[agent] = (current, now)
+
+    def report(self, dependency_map=None):
+        """
+        Machine-readable run report.
+
+        Args:
+            dependency_map: Task ID -> dependency IDs (for dependency waits
+                and handoff latency)
+
+        Returns:
+            Dict with "run", "agents", "primitives", "dependency_waits" and "handoffs"
+        """
+        with self.lock:
+            end = (self.end_time or time.perf_counter()) - self.start_time
+            tasks = {task_id: dict(record) for task_id, record in self.tasks.items()}
+            state_time = {agent: dict(times) for agent, times in self.state_time.items()}
+        dependency_map = dependency_map or {}
+
+        total_steps = sum(record["steps"] for record in tasks.values())
+        sim_time = total_steps * SIM_TIME_STEP
+        # Makespan: simulated time from the first task start to the last task end
+        starts = [record["sim_start"] for record in tasks.values() if record["sim_start"] is not None]
+        ends = [record["sim_end"] for record in tasks.values() if record["sim_end"] is not None]
+        makespan_steps = max(ends) - min(starts) if starts and ends else 0
+        run = {
+            "wall_time": round(end, 4),
+            "sim_steps": total_steps,
+            "sim_time": round(sim_time, 4),
+            "makespan_steps": makespan_steps,
+            "makespan": round(makespan_steps * SIM_TIME_STEP, 4),
+            "sim_to_wall": round(sim_time / end, 4) if end > 0 else 0.0,
+            "tasks": len(tasks),
+            "failed": sum(1 for record in tasks.values() if record["status"] != "completed"),
+        }
+
+        agents = {}
+        for agent in self.agents:
+            times = state_time[agent]
+            own = [record for record in tasks.values() if record["agent"] == agent]
+            agents[agent] = {
+                "tasks": len(own),
+                "busy": round(times["busy"], 4),
+                "blocked": round(times["blocked"], 4),
+                "idle": round(times["idle"], 4),
+                "utilization": round(times["busy"] / end, 4) if end > 0 else 0.0,
+                "sim_steps": sum(record["steps"] for record in own),
+            }
+
+        primitives = defaultdict(lambda: {"count": 0, "steps": 0, "wall_time": 0.0})
+        for record in tasks.values():
+            if record["end"] is None:
+                continue
+            entry = primitives[record["action"]]
+            entry["count"] += 1
+            entry["steps"] += record["steps"]
+            entry["wall_time"] += record["end"] - record["start"]
+        for entry in primitives.values():
+            entry["mean_steps"] = round(entry["steps"] / entry["count"], 1)
+            entry["mean_wall_time"] = round(entry["wall_time"] / entry["count"], 4)
+            entry["wall_time"] = round(entry["wall_time"], 4)
+
+        # A blocked task waited on every dependency that finished after the agent became free
+        dependency_waits = []
+        for task_id, record in sorted(tasks.items()):
+            if record["blocked_since"] is None:
+                continue
+            for dep_id in dependency_map.get(task_id, []):
+                dep = tasks.get(dep_id)
+                if dep is None or dep["end"] is None:
+                    continue
+                wait = min(dep["end"], record["start"]) - record["blocked_since"]
+                if wait > 0:
+                    dependency_waits.append({
+                        "task": task_id, "agent": record["agent"], "dependency": dep_id,
+                        "dependency_action": dep["action"], "wait": round(wait, 4),
+                    })
+
+        # Handoff latency: move finished -> receiving pick started
+        handoffs = []
+        for task_id, record in sorted(tasks.items()):
+            if record["action"] != "pick":
+                continue
+            for dep_id in dependency_map.get(task_id, []):
+                move = tasks.get(dep_id)
+                if move and move["action"] == "move" and move["end"] is not None:
+                    handoffs.append({
+                        "move": dep_id, "pick": task_id, "object": record["object"],
+                        "giver": move["agent"], "receiver": record["agent"],
+                        "latency": round(record["start"] - move["end"], 4),
+                    })
+
+        return {"run": run, "agents": agents, "primitives": dict(primitives),
+                "dependency_waits": dependency_waits, "handoffs": handoffs,
+                "tasks": [tasks[task_id] for task_id in sorted(tasks)]}
+
+    def write(self, path, dependency_map=None):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(dependency_map), f, indent=2)
+        print(f"[INFO] Run report written to {path}")
+
+    def print_summary(self, dependency_map=None):
+        print_report(self.report(dependency_map))
+
+
+def print_report(report, top_waits=5):
+    run = report["run"]
+    print("\n" + "=" * 72)
+    print(" RUN METRICS")
+    print("=" * 72)
+    print(f"  Wall time: {run['wall_time']:.2f}s  Sim time: {run['sim_time']:.2f}s "
+          f"({run['sim_steps']} steps, {run['sim_to_wall']:.2f}x real time)  "
+          f"Makespan: {run['makespan']:.2f}s sim  Tasks: {run['tasks']} ({run['failed']} failed)")
+
+    print(f"\n  {'agent':<10} {'tasks':>5} {'busy s':>8} {'blocked s':>10} {'idle s':>8} {'util':>7} {'steps':>7}")
+    for agent, entry in report["agents"].items():
+        print(f"  {agent:<10} {entry['tasks']:>5} {entry['busy']:>8.2f} {entry['blocked']:>10.2f} "
+              f"{entry['idle']:>8.2f} {entry['utilization']:>7.1%} {entry['sim_steps']:>7}")
+
+    print(f"\n  {'primitive':<10} {'count':>5} {'mean steps':>11} {'mean wall s':>12}")
+    for action, entry in sorted(report["primitives"].items()):
+        print(f"  {action:<10} {entry['count']:>5} {entry['mean_steps']:>11.1f} {entry['mean_wall_time']:>12.3f}")
+
+    if report["handoffs"]:
+        latencies = [h["latency"] for h in report["handoffs"]]
+        print(f"\n  Handoffs: {len(latencies)}, latency mean {sum(latencies) / len(latencies):.3f}s "
+              f"max {max(latencies):.3f}s")
+    waits = sorted(report["dependency_waits"], key=lambda w: -w["wait"])[:top_waits]
+    if waits:
+        print("  Longest dependency waits:")
+        for wait in waits:
+            print(f"    Task {wait['task']} ({wait['agent']}) on Task {wait['dependency']} "
+                  f"({wait['dependency_action']}): {wait['wait']:.3f}s")
+    print("=" * 72 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print a run report written by the executor")
+    parser.add_argument("report", help="Report JSON file")
+    args = parser.parse_args()
+
+    with open(args.report, encoding="utf-8") as f:
+        print_report(json.load(f))
@@ -0,0 +1,53 @@
+"""
+Object assignment tests (AI_module/assignment.py).
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.assignment import assign_objects
+from robot.reachability import reachable_agents, scene_positions
+from Task2.environment import Environment
+
+AGENTS = {"robot1": (0.0, 0.0, 0.0), "robot2": (1.0, 0.0, 0.0)}
+# Six cubes within reach of both robots, all of them closer to robot1
+CUBES = {f"cube_{i}": (0.3 + 0.02 * i, 0.1 * (i - 2), 0.0) for i in range(6)}
+
+
+def items(assignment):
+    return {agent: [name for name in names if name.startswith("cube")] for agent, names in assignment.items()}
+
+
+@pytest.mark.parametrize("method", ["hungarian", "greedy"])
+def test_imbalanced_scene_is_spread(method):
+    assignment = assign_objects(dict(CUBES, box=(0.5, 0.0, 0.0)), AGENTS, method=method)
+
+    # Closest-agent would give robot1 all six cubes
+    assert [len(names) for names in items(assignment).values()] == [3, 3]
+    assert "box" in assignment["robot1"]
+
+
+@pytest.mark.parametrize("method", ["hungarian", "greedy"])
+def test_handoff_work_is_weighed(method):
+    # robot2 cannot reach the box: each of its cubes needs a handoff back to robot1
+    assignment = assign_objects(dict(CUBES, box=(-0.5, 0.0, 0.0)), AGENTS, method=method)
+
+    assert [len(names) for names in items(assignment).values()] == [4, 2]
+
+
+def test_task2_cubes_go_to_the_only_robot_that_reaches_them():
+    # No cube of Task 2 is within reach of two robots, so no solver can move work off robot3
+    agent_positions, objects = scene_positions(Environment())
+    assignment = assign_objects(objects, agent_positions)
+
+    for agent, names in assignment.items():
+        for name in names:
+            if "cube" in name:
+                assert reachable_agents(objects[name], agent_positions) == [agent]
@@ -0,0 +1,264 @@
+"""
+RobotExecutor regression tests on a stubbed robot_action (no PyBullet stepping).
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.LLM import stream_plan
+from AI_module.stub_model import StubModel, plan_to_text
+from graph import execute_command
+from graph.execute_command import RobotExecutor
+from graph.graph_command import stream_commands
+from telemetry import log as dag_log
+
+TIMEOUT = 10  # Seconds before a run counts as hung
+
+
+def stub_robot_action(failing_objects=()):
+    """robot_action stand-in: picks always succeed, the first place of each of failing_objects raises"""
+    stub = types.SimpleNamespace(released=[])
+    held = {}
+    failing = set(failing_objects)
+
+    def pick(robot_id, obj_id, target_pos=None, verify=None, handoff=False):
+        held[100 + obj_id] = obj_id
+        return 100 + obj_id
+
+    def place(agent_name, target_pos, constraint_id, robot_ids):
+        if held[constraint_id] in failing:
+            failing.discard(held[constraint_id])
+            raise RuntimeError("IK failed")
+
+    stub.get_position = lambda obj_id: [0.0, 0.0, 0.0]
+    stub.pick = pick
+    stub.place = place
+    stub.release = lambda robot_id, constraint_id: stub.released.append(constraint_id)
+    return stub
+
+
+def run_with_timeout(executor, commands):
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(ok=executor.run_commands(commands)), daemon=True)
+    worker.start()
+    worker.join(TIMEOUT)
+    assert not worker.is_alive(), (f"run hung: holding {executor.agent_holding}, "
+                                   f"pool {[task['id'] for task in executor.available_tasks]}")
+    return result["ok"]
+
+
+def command(task_id, action, obj, destination=None, node="node[]"):
+    return {"id": task_id, "agent": "robot1", "action": action, "object": obj,
+            "destination": destination, "lane": "robot1", "node": node}
+
+
+def test_failed_place_releases_object_and_later_picks_run(monkeypatch):
+    dag_log.configure(level="CRITICAL")
+    stub = stub_robot_action(failing_objects={1})
+    monkeypatch.setattr(execute_command, "robot_action", stub)
+    executor = RobotExecutor({"robot1": object()}, {"a": 1, "b": 2, "bowl": 3},
+                             transfer_positions={"robot1torobot2": [0.0, 0.0, 0.0]})
+    commands = [
+        command(1, "pick", "a"),
+        command(2, "place", "a", "bowl", "node[1]"),
+        command(3, "pick", "b"),
+        command(4, "place", "b", "bowl", "node[3]"),
+    ]
+
+    assert run_with_timeout(executor, commands) is False
+    assert set(executor.failed_tasks) == {2}
+    assert executor.completed_tasks == {1, 3, 4}
+    assert executor.agent_holding == {"robot1": False}
+    assert stub.released == [101]
+
+
+def test_skipped_place_releases_object(monkeypatch):
+    dag_log.configure(level="CRITICAL")
+    stub = stub_robot_action()
+    monkeypatch.setattr(execute_command, "robot_action", stub)
+    executor = RobotExecutor({"robot1": object()}, {"a": 1, "b": 2, "bowl": 3},
+                             transfer_positions={"robot1torobot2": [0.0, 0.0, 0.0]})
+    commands = [
+        command(1, "pick", "a"),
+        command(2, "sweep", "missing"),                      # Fails: unknown object
+        command(3, "place", "a", "bowl", "node[1,2]"),       # Skipped while robot1 holds a
+        command(4, "pick", "b", node="node[1]"),
+        command(5, "place", "b", "bowl", "node[4]"),
+    ]
+
+    assert run_with_timeout(executor, commands) is False
+    assert set(executor.failed_tasks) == {2}
+    assert executor.skipped_tasks == {3}
+    assert executor.completed_tasks == {1, 4, 5}
+    assert stub.released == [101]
+
+
+def test_replan_splices_tasks_for_other_agent(monkeypatch):
+    dag_log.configure(level="CRITICAL")
+    stub = stub_robot_action(failing_objects={1})
+    monkeypatch.setattr(execute_command, "robot_action", stub)
+    snapshots = []
+
+    def replanner(snapshot):
+        snapshots.append(snapshot)
+        return [dict(command(1, "pick", "a"), agent="robot2"),
+                dict(command(2, "place", "a", "bowl", "node[1]"), agent="robot2")]
+
+    executor = RobotExecutor({"robot1": object(), "robot2": object()}, {"a": 1, "b": 2, "bowl": 3},
+                             transfer_positions={"robot1torobot2": [0.0, 0.0, 0.0]}, replanner=replanner)
+    commands = [
+        command(1, "pick", "a"),
+        command(2, "place", "a", "bowl", "node[1]"),
+        dict(command(3, "pick", "b"), agent="robot2"),
+        dict(command(4, "place", "b", "bowl", "node[3]"), agent="robot2"),
+    ]
+
+    assert run_with_timeout(executor, commands) is True
+    assert len(snapshots) == 1 and snapshots[0]["failed"] == [2]
+    assert executor.superseded_tasks == {2}
+    assert executor.completed_tasks == {1, 3, 4, 5, 6}
+    assert executor.pending_replans == 0
+
+
+def test_failing_worker_keeps_running_during_replan(monkeypatch):
+    dag_log.configure(level="CRITICAL")
+    stub = stub_robot_action(failing_objects={1})
+    b_placed = threading.Event()
+    place = stub.place
+
+    def place_and_signal(agent_name, target_pos, constraint_id, robot_ids):
+        place(agent_name, target_pos, constraint_id, robot_ids)
+        if constraint_id == 102:
+            b_placed.set()
+
+    stub.place = place_and_signal
+    monkeypatch.setattr(execute_command, "robot_action", stub)
+    seen = []
+
+    def slow_replanner(snapshot):
+        # The LLM call: robot1 places b meanwhile instead of waiting for the sub-plan
+        seen.append(b_placed.wait(TIMEOUT / 2))
+        return []
+
+    executor = RobotExecutor({"robot1": object()}, {"a": 1, "b": 2, "bowl": 3},
+                             transfer_positions={"robot1torobot2": [0.0, 0.0, 0.0]}, replanner=slow_replanner)
+    commands = [
+        command(1, "pick", "a"),
+        command(2, "place", "a", "bowl", "node[1]"),
+        command(3, "pick", "b"),
+        command(4, "place", "b", "bowl", "node[3]"),
+    ]
+
+    assert run_with_timeout(executor, commands) is False
+    assert seen == [True]
+    assert executor.completed_tasks == {1, 3, 4}
+    assert executor.pending_replans == 0
+
+
+def test_replan_with_unknown_agent_is_rejected(monkeypatch):
+    dag_log.configure(level="CRITICAL")
+    monkeypatch.setattr(execute_command, "robot_action", stub_robot_action(failing_objects={1}))
+    executor = RobotExecutor({"robot1": object()}, {"a": 1, "bowl": 3},
+                             transfer_positions={"robot1torobot2": [0.0, 0.0, 0.0]},
+                             replanner=lambda snapshot: [dict(command(1, "pick", "a"), agent="robot9")])
+    commands = [command(1, "pick", "a"), command(2, "place", "a", "bowl", "node[1]")]
+
+    assert run_with_timeout(executor, commands) is False
+    assert set(executor.failed_tasks) == {2}
+    assert len(executor.task_map) == 2
+
+
+def test_pick_retries_count_as_attempts(monkeypatch):
+    dag_log.configure(level="CRITICAL")
+    stub = stub_robot_action()
+    grasp = stub.pick
+    misses = [None]  # First grasp of the run fails, the retry succeeds
+    stub.pick = lambda robot_id, obj_id, target_pos=None, verify=None, handoff=False: (
+        misses.pop() if misses else grasp(robot_id, obj_id, target_pos, verify))
+    monkeypatch.setattr(execute_command, "robot_action", stub)
+    executor = RobotExecutor({"robot1": object()}, {"a": 1, "bowl": 3},
+                             transfer_positions={"robot1torobot2": [0.0, 0.0, 0.0]})
+    commands = [command(1, "pick", "a"), command(2, "place", "a", "bowl", "node[1]")]
+
+    assert run_with_timeout(executor, commands) is True
+    records = {record["id"]: record for record in executor.run_report()["tasks"]}
+    assert records[1]["attempts"] == 2 and records[2]["attempts"] == 1
+
+
+def test_failed_grasps_retry_then_fail_task(monkeypatch):
+    dag_log.configure(level="CRITICAL")
+    stub = stub_robot_action()
+    grasps = []
+
+    def pick(robot_id, obj_id, target_pos=None, verify=None, handoff=False):
+        grasps.append((obj_id, handoff))
+        return None  # Grasp verification never finds finger contact
+
+    stub.pick = pick
+    monkeypatch.setattr(execute_command, "robot_action", stub)
+    executor = RobotExecutor({"robot1": object(), "robot2": object()}, {"a": 1, "bowl": 3},
+                             transfer_positions={"robot1torobot2": [0.0, 0.0, 0.0]})
+    receive = dict(command(3, "pick", "a", node="node[2]"), agent="robot2")
+    executor.task_map = {2: command(2, "move", "a", "robot2"), 3: receive}
+    executor.dependency_map[3] = [2]
+
+    with pytest.raises(execute_command.TaskExecutionError, match="failed after 3 attempts") as error:
+        executor._execute_pick(receive, object())
+    assert error.value.task is receive
+    assert grasps == [(1, True)] * (execute_command.MAX_PICK_RETRIES + 1)
+
+    # In a run the failed pick drops its place, and nothing is left held
+    grasps.clear()
+    executor = RobotExecutor({"robot1": object()}, {"a": 1, "bowl": 3},
+                             transfer_positions={"robot1torobot2": [0.0, 0.0, 0.0]})
+    commands = [command(1, "pick", "a"), command(2, "place", "a", "bowl", "node[1]")]
+
+    assert run_with_timeout(executor, commands) is False
+    assert "failed after 3 attempts" in executor.failed_tasks[1]
+    assert executor.skipped_tasks == {2}
+    assert grasps == [(1, False)] * (execute_command.MAX_PICK_RETRIES + 1)
+    assert executor.agent_holding == {"robot1": False}
+
+
+def test_stream_executes_before_generation_ends(monkeypatch):
+    dag_log.configure(level="CRITICAL")
+    stub = stub_robot_action()
+    grasp = stub.pick
+    events = []
+
+    def pick(robot_id, obj_id, target_pos=None, verify=None, handoff=False):
+        events.append(("pick", obj_id))
+        return grasp(robot_id, obj_id, target_pos, verify, handoff)
+
+    stub.pick = pick
+    monkeypatch.setattr(execute_command, "robot_action", stub)
+    plan = [("robot1", "pick a", "node[]"), ("robot1", "place a in bowl", "node[1]"),
+            ("robot1", "pick b", "node[]"), ("robot1", "place b in bowl", "node[3]")]
+    model = StubModel(plan_to_text(plan), chunk_size=8, delay=0.03)  # About 0.6 s of generation
+
+    def tasks():
+        yield from stream_plan("prompt", model=model)
+        events.append("end of stream")
+
+    executor = RobotExecutor({"robot1": object()}, {"a": 1, "b": 2, "bowl": 3},
+                             transfer_positions={"robot1torobot2": [0.0, 0.0, 0.0]})
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(ok=executor.run_stream(stream_commands(tasks()))),
+                              daemon=True)
+    worker.start()
+    worker.join(TIMEOUT)
+
+    assert not worker.is_alive(), "streamed run hung"
+    assert result["ok"] is True
+    assert executor.completed_tasks == {1, 2, 3, 4}
+    # The first pick ran while the model was still generating the rest of the plan
+    assert events.index(("pick", 1)) < events.index("end of stream")
@@ -0,0 +1,66 @@
+"""
+Handoff point generator tests (robot/handoff_points.py).
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import math
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from robot.handoff_points import (OBJECT_CLEARANCE, complete_handoff_points, generate_handoff_points,
+                                  handoff_point)
+from robot.reachability import can_reach, planar_distance
+
+# Four robots on a ring, neighbours 0.9 m apart
+RING = {f"robot{i + 1}": (0.64 * math.cos(i * math.pi / 2), 0.64 * math.sin(i * math.pi / 2), 0.3)
+        for i in range(4)}
+
+
+def test_every_pair_is_reachable_by_both_robots():
+    points = generate_handoff_points(RING)
+
+    assert len(points) == 4 * 3
+    for key, point in points.items():
+        giver, receiver = key.split("to")
+        assert can_reach(RING[giver], point) and can_reach(RING[receiver], point)
+        assert point[2] == 0.3
+
+
+def test_opposite_directions_use_separate_points():
+    # Each direction is pulled to its own lane, as far as the shared workspace allows
+    points = generate_handoff_points(RING)
+    for a in RING:
+        for b in RING:
+            if a < b:
+                assert planar_distance(points[f"{a}to{b}"], points[f"{b}to{a}"]) > 0.05
+
+    # Robots facing each other along x: the two directions sit on either side of the line between them
+    there, _ = handoff_point((0.0, 0.0, 0.0), (0.6, 0.0, 0.0))
+    back, _ = handoff_point((0.6, 0.0, 0.0), (0.0, 0.0, 0.0))
+    assert there[1] > 0 > back[1]
+
+
+def test_points_keep_clear_of_objects():
+    base_a, base_b = (0.0, 0.0, 0.0), (1.0, 0.0, 0.0)
+    free, _ = handoff_point(base_a, base_b)
+    point, feasible = handoff_point(base_a, base_b, obstacles=[free])
+
+    assert feasible
+    assert planar_distance(point, free) >= OBJECT_CLEARANCE - 1e-9
+
+
+def test_robots_out_of_reach_get_the_midpoint():
+    point, feasible = handoff_point((0.0, 0.0, 0.0), (3.0, 0.0, 0.0))
+    assert (point, feasible) == ([1.5, 0.0, 0.0], False)
+
+
+def test_hand_typed_points_are_kept():
+    manual = {"robot1torobot2": [9.0, 9.0, 9.0]}
+    points = complete_handoff_points(manual, RING)
+
+    assert points["robot1torobot2"] == [9.0, 9.0, 9.0]
+    assert len(points) == 12
@@ -0,0 +1,55 @@
+"""
+Heuristic planner tests (AI_module/heuristic_planner.py) against the ground-truth plans.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import importlib
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module import call_gemini_test_truth
+from AI_module.heuristic_planner import HeuristicUnsupported, plan_for_environment
+from graph.plan_eval import evaluate_plan
+
+SORT_GOAL = "Sort the cubes into the bowls of the same color"
+
+
+def plan_and_truth(task):
+    env = importlib.import_module(f"Task{task}.environment").Environment()
+    return plan_for_environment(env, SORT_GOAL), getattr(call_gemini_test_truth, f"call_gemini_{task}")()
+
+
+@pytest.mark.parametrize("task", [1, 5])
+def test_matches_ground_truth(task):
+    plan, truth = plan_and_truth(task)
+    result = evaluate_plan(plan, truth)
+
+    assert len(plan) == 12
+    assert result["exact_actions"]
+    assert (result["dep_precision"], result["dep_recall"]) == (1.0, 1.0)
+    assert result["makespan"] == result["truth_makespan"]
+    assert result["issues"] == 0
+
+
+def test_task2_covers_ground_truth():
+    # One more handoff than the hand-written plan (22 tasks instead of 20), same makespan
+    plan, truth = plan_and_truth(2)
+    result = evaluate_plan(plan, truth)
+
+    assert len(plan) == 22
+    assert (result["action_recall"], result["dep_recall"]) == (1.0, 1.0)
+    assert (result["handoffs"], result["truth_handoffs"]) == (4, 3)
+    assert result["makespan"] == result["truth_makespan"]
+    assert result["issues"] == 0
+
+
+def test_unsupported_goal_is_declined():
+    env = importlib.import_module("Task1.environment").Environment()
+    with pytest.raises(HeuristicUnsupported):
+        plan_for_environment(env, "Wipe the table")
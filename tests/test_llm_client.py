@@ -0,0 +1,115 @@
+"""
+LLM client tests (AI_module/llm_client.py) against the local stand-in server (AI_module/stub_server.py).
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.llm_client import HTTPModel, LLMClient, LLMMetrics, LLMRequestError, LLMTimeoutError, load_metrics
+from AI_module.process_prompt import estimate_tokens
+from AI_module.stub_server import StubLLMServer
+
+PLAN = '("robot1", "pick red_cube", "node[]"),\n("robot1", "place red_cube in red_bowl", "node[1]")'
+PROMPT = "Sort the cubes into the bowls of the same color"
+
+
+def client(server, **options):
+    options.setdefault("backoff", 0.0)
+    options.setdefault("metrics", None)
+    return LLMClient(HTTPModel(server.url), **options)
+
+
+def test_metrics_record_is_written(tmp_path):
+    path = str(tmp_path / "llm_metrics.jsonl")
+    with StubLLMServer(PLAN) as server:
+        response = client(server, metrics=LLMMetrics(path)).generate_content(PROMPT)
+
+    assert response.text == PLAN
+    [record] = load_metrics(path)
+    assert (record["status"], record["attempts"], record["hedged"], record["error"]) == ("ok", 1, False, None)
+    # Token counts reported by the server, not estimated by the client
+    assert (record["prompt_tokens"], record["response_tokens"]) == (estimate_tokens(PROMPT), estimate_tokens(PLAN))
+    assert record["tokens_estimated"] is False
+
+
+def test_timeout():
+    with StubLLMServer(PLAN, latency=2.0) as server:
+        llm = client(server, timeout=0.2, retries=0)
+        start = time.monotonic()
+        with pytest.raises(LLMRequestError) as error:
+            llm.generate_content(PROMPT)
+
+    assert time.monotonic() - start < 1.0
+    assert isinstance(error.value.__cause__, LLMTimeoutError)
+    [record] = llm.metrics.records
+    assert (record["status"], record["attempts"]) == ("error", 1)
+    assert record["error"].startswith("LLMTimeoutError")
+
+
+def test_server_errors_are_retried():
+    with StubLLMServer(PLAN, failure_rate=1.0) as server:
+        llm = client(server, retries=2)
+        with pytest.raises(LLMRequestError) as error:
+            llm.generate_content(PROMPT)
+        requests = server.requests
+
+    assert requests == 3
+    assert error.value.status == 500
+    assert llm.metrics.records[0]["attempts"] == 3
+
+
+def test_invalid_requests_are_not_retried():
+    with StubLLMServer(PLAN) as server:
+        llm = LLMClient(HTTPModel(server.url.replace("/generate", "/missing")), retries=2, backoff=0.0, metrics=None)
+        with pytest.raises(LLMRequestError) as error:
+            llm.generate_content(PROMPT)
+
+    assert error.value.status == 404
+    assert llm.metrics.records[0]["attempts"] == 1
+
+    class BadArgumentModel:
+        calls = 0
+
+        def generate_content(self, prompt, **kwargs):
+            self.calls += 1
+            raise ValueError("unsupported generation_config")
+
+    model = BadArgumentModel()
+    with pytest.raises(LLMRequestError):
+        LLMClient(model, retries=2, backoff=0.0, metrics=None).generate_content(PROMPT)
+    assert model.calls == 1
+
+
+def test_hedged_request_wins_over_stalled_one():
+    lock = threading.Lock()
+    calls = []
+
+    def respond(prompt):
+        # The first request stalls, the hedged duplicate answers at once
+        with lock:
+            calls.append(prompt)
+            first = len(calls) == 1
+        if first:
+            time.sleep(2.0)
+        return PLAN
+
+    with StubLLMServer(respond) as server:
+        llm = client(server, timeout=5.0, retries=0, hedge_after=0.2)
+        start = time.monotonic()
+        response = llm.generate_content(PROMPT)
+        elapsed = time.monotonic() - start
+
+    assert response.text == PLAN
+    assert elapsed < 1.5
+    assert len(calls) == 2
+    [record] = llm.metrics.records
+    assert (record["status"], record["attempts"], record["hedged"], record["hedge_won"]) == ("ok", 1, True, True)
@@ -0,0 +1,50 @@
+"""
+Ground-truth evaluation tests (graph/plan_eval.py).
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.call_gemini_test_truth import GROUND_TRUTH
+from AI_module.stub_model import plan_to_text
+from graph.plan_eval import evaluate_batch, evaluate_plan, stub_cases, summarize
+
+
+@pytest.mark.parametrize("task", sorted(GROUND_TRUTH))
+def test_ground_truth_scores_perfectly(task):
+    truth = GROUND_TRUTH[task]()
+    result = evaluate_plan(plan_to_text(truth), truth)
+
+    assert result["exact_actions"]
+    assert (result["dep_precision"], result["dep_recall"]) == (1.0, 1.0)
+    assert (result["order_precision"], result["order_recall"]) == (1.0, 1.0)
+    assert (result["handoff_error"], result["critical_path_ratio"]) == (0, 1.0)
+
+
+def test_mistakes_lower_the_scores():
+    truth = GROUND_TRUTH[1]()
+    # Last task missing, and the first place no longer waits for its pick
+    mistaken = [(agent, action, "node[]" if i == 1 else node) for i, (agent, action, node) in enumerate(truth[:-1])]
+    result = evaluate_plan(plan_to_text(mistaken), truth)
+
+    assert not result["exact_actions"]
+    assert result["action_precision"] == 1.0
+    assert result["action_recall"] == (len(truth) - 1) / len(truth)
+    assert result["dep_recall"] < 1.0
+
+
+def test_batch_summary():
+    results = evaluate_batch(stub_cases([1, 5], count=4, seed=0), max_workers=1)
+    summary = summarize(results)
+
+    assert [r["name"] for r in results[:2]] == ["stub_1_0", "stub_1_1"]
+    assert summary["all"]["cases"] == 8
+    assert summary[1]["cases"] == summary[5]["cases"] == 4
+    assert 0.0 < summary["all"]["action_f1"] <= 1.0
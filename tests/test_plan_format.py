@@ -0,0 +1,60 @@
+"""
+Binary plan format tests (graph/plan_format.py) on the ground-truth command files.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from graph.plan_analysis import dependency_map
+from graph.plan_format import (PlanFormatError, PlanView, encode_plan, is_binary_plan, load_plan,
+                               read_commands, write_plan)
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def load_truth(task):
+    with open(os.path.join(PROJECT_ROOT, "task_plan_truth", f"commands_task_{task}.json")) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("task", [1, 2, 3, 4, 5])
+def test_round_trip(tmp_path, task):
+    commands = load_truth(task)
+    path = str(tmp_path / f"commands_task_{task}.plan")
+    write_plan(commands, path)
+
+    assert is_binary_plan(path)
+    assert read_commands(path) == commands
+    with load_plan(path) as plan:
+        assert len(plan) == len(commands)
+        assert plan.command(len(commands) - 1) == commands[-1]
+        expected = {task_id: deps for task_id, deps in dependency_map(commands).items() if deps}
+        assert dict(plan.dependency_map()) == expected
+
+
+def test_missing_fields_get_defaults():
+    plan = PlanView(encode_plan([{"id": 7, "agent": "robot1", "action": "sweep", "object": "table"}]))
+    assert plan.commands() == [{"id": 7, "agent": "robot1", "action": "sweep", "object": "table",
+                                "destination": "", "lane": "", "node": "node[]"}]
+    assert dict(plan.dependency_map()) == {}
+
+
+def test_rejects_foreign_and_truncated_files(tmp_path):
+    data = encode_plan(load_truth(1))
+    with pytest.raises(PlanFormatError, match="bad magic"):
+        PlanView(b"{" + data[1:])
+    with pytest.raises(PlanFormatError, match="Truncated"):
+        PlanView(data[:len(data) // 2])
+
+    json_path = str(tmp_path / "commands.json")
+    with open(json_path, "w") as f:
+        json.dump(load_truth(1), f)
+    assert not is_binary_plan(json_path)
@@ -0,0 +1,68 @@
+"""
+Plan optimizer tests on the ground-truth plans (graph/plan_optimizer.py).
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from graph.plan_analysis import dependency_map, estimate_makespan, handoff_finish
+from graph.plan_optimizer import optimize_plan
+from robot.reachability import scene_positions
+from Task1.environment import Environment
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def load_truth(task):
+    with open(os.path.join(PROJECT_ROOT, "task_plan_truth", f"commands_task_{task}.json")) as f:
+        return json.load(f)
+
+
+def test_task1_handoffs_start_first():
+    plan = load_truth(1)
+    optimized, report = optimize_plan(plan, *scene_positions(Environment()))
+
+    assert report["reordered"]
+    assert estimate_makespan(optimized) == estimate_makespan(plan) == 1980
+    assert handoff_finish(plan) == 1320
+    assert handoff_finish(optimized) == 660
+    # Both handoff chains come first in each robot's pool order
+    first = {}
+    for cmd in optimized:
+        first.setdefault(cmd["agent"], (cmd["action"], cmd["object"]))
+    assert first == {"robot1": ("pick", "red_cube"), "robot2": ("pick", "green_cube_1")}
+
+
+def test_task1_keeps_placements_and_dependencies():
+    plan = load_truth(1)
+    optimized, _ = optimize_plan(plan, *scene_positions(Environment()))
+
+    placements = lambda cmds: sorted((c["agent"], c["action"], c["object"], c["destination"]) for c in cmds)
+    assert placements(optimized) == placements(plan)
+    # Every task still waits for the same tasks (compared by what they do, IDs are renumbered)
+    key = lambda cmds: {c["id"]: (c["agent"], c["action"], c["object"]) for c in cmds}
+    edges = lambda cmds: sorted((key(cmds)[d], key(cmds)[t]) for t, deps in dependency_map(cmds).items() for d in deps)
+    assert edges(optimized) == edges(plan)
+
+
+def test_estimate_takes_ready_task_instead_of_waiting():
+    # robot2 is free at 150 while robot1's handoff runs until 200: like the
+    # executor, it picks b meanwhile instead of idling for a
+    plan = [
+        {"id": 1, "agent": "robot1", "action": "pick", "object": "a", "destination": "", "node": "node[]"},
+        {"id": 2, "agent": "robot1", "action": "move", "object": "a", "destination": "robot2", "node": "node[1]"},
+        {"id": 3, "agent": "robot2", "action": "sweep", "object": "table", "destination": "", "node": "node[]"},
+        {"id": 4, "agent": "robot2", "action": "pick", "object": "a", "destination": "", "node": "node[2]"},
+        {"id": 5, "agent": "robot2", "action": "place", "object": "a", "destination": "bowl", "node": "node[4]"},
+        {"id": 6, "agent": "robot2", "action": "pick", "object": "b", "destination": "", "node": "node[]"},
+        {"id": 7, "agent": "robot2", "action": "place", "object": "b", "destination": "bowl", "node": "node[6]"},
+    ]
+    durations = {"pick": 100, "place": 100, "move": 100, "sweep": 150}
+    # robot2: sweep 0-150, b 150-350, a 350-550
+    assert estimate_makespan(plan, durations) == 550
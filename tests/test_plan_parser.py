@@ -0,0 +1,78 @@
+"""
+Plan parser tests (AI_module/plan_parser.py): one tokenizer for whole and streamed responses.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.plan_parser import PlanSyntaxError, StreamingPlanParser, parse_plan
+
+RESPONSE = '''Here is the plan:
+("Robot1", "Pick red_cube", "node[]"),
+(“robot2”, “place apple on the plate”, “node[]”)
+robot1: pick banana
+('robot1torobot2', 'move red_cube to robot2', 'node[1]')
+("robot2", "pick red_cube", "node[4]") ("robot2","place red_cube bowl","node[5]")'''
+
+MALFORMED = '''("robot1", "pick a", "node[]"),
+("robot1", "place a in bowl" "node[1]"),
+("robot2", "pick b", "node[]"),
+("robot2", "place b in bowl", "node[3]")'''
+
+
+def test_records():
+    records = parse_plan(RESPONSE)
+    assert [(r.index, r.agent, r.verb, r.object, r.destination, r.dependencies) for r in records] == [
+        (1, "robot1", "pick", "red_cube", "", ()),
+        (2, "robot2", "place", "apple", "plate", ()),
+        (3, "robot1", "pick", "banana", "", ()),
+        (4, "robot1torobot2", "move", "red_cube", "robot2", (1,)),
+        (5, "robot2", "pick", "red_cube", "", (4,)),
+        (6, "robot2", "place", "red_cube", "bowl", (5,)),
+    ]
+    assert (records[3].source, records[3].target) == ("robot1", "robot2")
+    assert [(r.line, r.column) for r in records] == [(2, 1), (3, 1), (4, 1), (5, 1), (6, 1), (6, 40)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 16, 1000])
+def test_streamed_chunks_match_whole_response(chunk_size):
+    for text in (RESPONSE, MALFORMED):
+        parser = StreamingPlanParser()
+        records = []
+        for i in range(0, len(text), chunk_size):
+            records += parser.feed(text[i:i + chunk_size])
+        records += parser.close()
+        assert records == parse_plan(text)
+
+
+def test_tuple_is_returned_when_it_closes():
+    parser = StreamingPlanParser()
+    assert parser.feed('("robot1", "pick a", "node[]") ("robot1", "pl') == [parse_plan('("robot1", "pick a", "node[]")')[0]]
+    assert [r.action for r in parser.feed('ace a in bowl", "node[1]")')] == ["place a in bowl"]
+    assert parser.close() == []
+
+
+def test_skipped_tuple_keeps_step_ids():
+    parser = StreamingPlanParser()
+    records = parser.feed(MALFORMED) + parser.close()
+    # Step 2 is missing its separator: steps 3 and 4 keep their IDs, so node[3] still means "pick b"
+    assert [(r.index, r.action, r.dependencies) for r in records] == [
+        (1, "pick a", ()), (3, "pick b", ()), (4, "place b in bowl", (3,))]
+    assert parser.skipped == [(2, 2, 30, "expected ',', got '\"node[1]\"'")]
+
+
+def test_strict_reports_position():
+    with pytest.raises(PlanSyntaxError) as error:
+        parse_plan(MALFORMED, strict=True)
+    assert (error.value.line, error.value.column) == (2, 30)
+
+    with pytest.raises(PlanSyntaxError) as error:
+        parse_plan('("robot1", "pick a", "node[]"),\n("robot1", "place a in bowl"', strict=True)
+    assert str(error.value) == "unterminated tuple (line 2, column 1)"
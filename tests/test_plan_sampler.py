@@ -0,0 +1,88 @@
+"""
+Plan sampler tests (graph/plan_sampler.py) with StubModel stand-ins for the LLM.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI_module.stub_model import StubModel
+from graph.plan_sampler import sample_plans, select_best_plan
+
+# Same placements; the second plan hands the cube over instead of letting robot1 do everything
+ONE_ROBOT = '''("robot1", "pick a", "node[]"),
+("robot1", "place a in bowl", "node[1]"),
+("robot1", "pick b", "node[2]"),
+("robot1", "place b in bowl", "node[3]")'''
+TWO_ROBOTS = '''("robot1", "pick a", "node[]"),
+("robot1", "place a in bowl", "node[1]"),
+("robot2", "pick b", "node[]"),
+("robot2", "place b in bowl", "node[3]")'''
+# Places a cube nobody picked up
+INVALID = '''("robot1", "place a in bowl", "node[]")'''
+
+
+class SlowModel(StubModel):
+    """StubModel whose calls take `delays[n]` seconds (by call order) and that counts calls in flight"""
+
+    def __init__(self, responses, delays):
+        super().__init__(responses)
+        self.delays = delays
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        with self.lock:
+            delay = self.delays[self.calls % len(self.delays)]
+            response = super().generate_content(prompt, **kwargs)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(delay)
+        with self.lock:
+            self.in_flight -= 1
+        return response
+
+
+def test_concurrency_limit():
+    model = SlowModel(TWO_ROBOTS, delays=[0.05])
+    candidates = sample_plans("prompt", k=6, model=model, max_concurrency=2)
+
+    assert model.calls == 6
+    assert model.max_in_flight == 2
+    assert all(c.valid for c in candidates)
+
+
+def test_late_candidate_is_dropped():
+    # The first request misses the deadline; the others answer right away
+    model = SlowModel(TWO_ROBOTS, delays=[1.0, 0.0, 0.0])
+    start = time.time()
+    candidates = sample_plans("prompt", k=3, model=model, max_concurrency=3, timeout=0.3)
+
+    assert time.time() - start < 0.9
+    assert [c.index for c in candidates if c.valid] == [1, 2]
+    late = [c for c in candidates if not c.valid]
+    assert [(c.index, c.error) for c in late] == [(0, "timed out after 0.3s")]
+    assert candidates[-1] is late[0]
+
+
+def test_selects_valid_plan_with_shortest_makespan():
+    # One request at a time, so candidate i gets response i
+    model = StubModel([ONE_ROBOT, INVALID, TWO_ROBOTS, "no plan here"])
+    best = select_best_plan("prompt", k=4, model=model, max_concurrency=1)
+
+    assert best.index == 2
+    assert {c["agent"] for c in best.commands} == {"robot1", "robot2"}
+
+
+def test_no_valid_candidate():
+    with pytest.raises(ValueError, match="best: #0 with 1 issues"):
+        select_best_plan("prompt", k=2, model=StubModel(INVALID), max_concurrency=1)
@@ -0,0 +1,86 @@
+"""
+End-state success evaluator tests (robot/success_eval.py) on synthetic scenes.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pybullet as p
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from robot.success_eval import check_goals, evaluate, goals_from_plan
+
+# A 0.2 x 0.2 m bowl, 0.05 m high, and 0.04 m cubes
+BOWL = [0.4, -0.1, 0.0, 0.6, 0.1, 0.05]
+
+
+def cube_aabb(x, y, bottom, size=0.04):
+    return [x - size / 2, y - size / 2, bottom, x + size / 2, y + size / 2, bottom + size]
+
+
+def check(cubes):
+    """check_goals for cubes (x, y, bottom), all with the bowl as destination"""
+    centers = np.array([cube[:2] for cube in cubes])
+    aabbs = np.array([cube_aabb(*cube) for cube in cubes])
+    return check_goals(centers, aabbs[:, 2], aabbs, np.array([BOWL] * len(cubes)),
+                       np.zeros(len(cubes), dtype=int)).tolist()
+
+
+def test_item_in_destination():
+    assert check([(0.5, 0.0, 0.01)]) == [True]
+
+
+def test_item_beside_or_above_destination():
+    # Next to the bowl, and held 0.2 m above it
+    assert check([(0.7, 0.0, 0.0), (0.5, 0.0, 0.25)]) == [False, False]
+
+
+def test_stack_counts_when_its_bottom_item_is_in():
+    # Second cube rests on the first; the third floats above the stack
+    assert check([(0.5, 0.0, 0.01), (0.5, 0.0, 0.05), (0.5, 0.0, 0.2)]) == [True, True, False]
+
+
+@pytest.fixture
+def scene():
+    """DIRECT server with a flat red_bowl and two cubes: red_cube on the bowl, green_cube on the floor"""
+    p.connect(p.DIRECT)
+
+    def box(half_extents, position):
+        shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=half_extents)
+        return p.createMultiBody(baseMass=0, baseCollisionShapeIndex=shape, basePosition=position)
+
+    objects = {
+        "red_bowl": box([0.1, 0.1, 0.025], [0.5, 0.0, 0.025]),
+        "red_cube": box([0.02, 0.02, 0.02], [0.5, 0.02, 0.07]),
+        "green_cube": box([0.02, 0.02, 0.02], [0.9, 0.0, 0.02]),
+    }
+    yield objects
+    p.disconnect()
+
+
+def test_evaluate_pass_and_fail(scene):
+    plan = [
+        {"id": 1, "agent": "robot1", "action": "pick", "object": "red_cube", "destination": "", "node": "node[]"},
+        {"id": 2, "agent": "robot1", "action": "place", "object": "red_cube", "destination": "red_bowl",
+         "node": "node[1]"},
+        {"id": 3, "agent": "robot1", "action": "place", "object": "green_cube", "destination": "red_bowl",
+         "node": "node[2]"},
+    ]
+    goals = goals_from_plan(plan)
+    assert goals == [("red_cube", "in", "red_bowl"), ("green_cube", "in", "red_bowl")]
+
+    passed = evaluate(goals[:1], scene)
+    assert (passed["success"], passed["met"], passed["total"]) == (True, 1, 1)
+
+    failed = evaluate(goals, scene)
+    assert (failed["success"], failed["met"], failed["total"]) == (False, 1, 2)
+    assert failed["unmet"] == [("green_cube", "in", "red_bowl")]
+
+    missing = evaluate(goals + [("blue_cube", "in", "red_bowl")], scene)
+    assert missing["success"] is False and missing["missing"] == ["blue_cube"]